@@ -1,14 +1,17 @@
-from pathlib import Path
-import pickle
 import mimetypes
+import pickle
+from pathlib import Path
 from typing import Optional
 
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+from slides_metrics import MeteredHttpRequest, report
 
+from llm_slide_deck.assets import crop_image, target_pixels
+from llm_slide_deck.layout import measure_label, radial_layout
 
 google_path = Path(__file__).parent
 repo_path = google_path.parent
@@ -37,6 +40,9 @@ WHITE_TEXT = {"red": 1.0, "green": 1.0, "blue": 1.0}
 PPT_WIDTH = 960
 PPT_HEIGHT = 540
 
+# Diameter of the central "Producteur" circle of slide 4, in points
+ACTORS_DIAMETER = 190
+
 
 def get_google_creds():
     """Authenticate and return Google API credentials, saving token if needed."""
@@ -60,13 +66,13 @@ def get_google_creds():
 def get_slides_service():
     """Return an authenticated Google Slides service object."""
     creds = get_google_creds()
-    return build("slides", "v1", credentials=creds)
+    return build("slides", "v1", credentials=creds, requestBuilder=MeteredHttpRequest)
 
 
 def get_drive_service():
     """Return an authenticated Google Drive service object."""
     creds = get_google_creds()
-    return build("drive", "v3", credentials=creds)
+    return build("drive", "v3", credentials=creds, requestBuilder=MeteredHttpRequest)
 
 
 def find_or_upload_image_to_drive(drive_service, file_path: Path) -> Optional[str]:
@@ -128,7 +134,12 @@ def find_or_upload_image_to_drive(drive_service, file_path: Path) -> Optional[st
 def upload_all_images(drive_service) -> dict[str, str]:
     """Upload all required images to Google Drive and return their IDs."""
     uploaded_images = {}
-    image_paths = {"edf_logo": edf_logo_path, "slide1_bg": slide1_bg_path, "slide3_acteurs": slide3_acteurs_path}
+    image_paths = {
+        "edf_logo": edf_logo_path,
+        "slide1_bg": slide1_bg_path,
+        # Pre-cropped to the circle of slide 4, the file name carries the source hash
+        "slide3_acteurs": crop_image(slide3_acteurs_path, "circle", target_pixels(ACTORS_DIAMETER, ACTORS_DIAMETER)),
+    }
 
     for key, path in image_paths.items():
         image_id = find_or_upload_image_to_drive(drive_service, path)
@@ -179,6 +190,54 @@ def execute_requests(service, presentation_id, requests):
     return response
 
 
+def _utf16_len(text: str) -> int:
+    """Length of a text in the UTF-16 code units used by Slides API text indexes."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def duplicate_requests(source_id: str, object_id: str, dx: float, dy: float):
+    """Requests copying the element `source_id`, with its style and text, to `object_id` moved by (dx, dy)."""
+    # The copy is created over the original: a relative translation keeps its size and only moves it
+    return [
+        {"duplicateObject": {"objectId": source_id, "objectIds": {source_id: object_id}}},
+        {
+            "updatePageElementTransform": {
+                "objectId": object_id,
+                "applyMode": "RELATIVE",
+                "transform": {"scaleX": 1, "scaleY": 1, "translateX": dx, "translateY": dy, "unit": "PT"},
+            }
+        },
+    ]
+
+
+def fill_request(object_id: str, color: dict):
+    return {
+        "updateShapeProperties": {
+            "objectId": object_id,
+            "shapeProperties": {"shapeBackgroundFill": {"solidFill": {"color": {"rgbColor": color}}}},
+            "fields": "shapeBackgroundFill",
+        }
+    }
+
+
+def replace_text_requests(object_id: str, text: str, start: int, end: int, new_text: str):
+    """Requests replacing `text[start:end]` of a shape with `new_text`, which keeps the style of the replaced text."""
+    # Inserted text takes the style of the character before it: insert after the old text, then delete it
+    return [
+        {"insertText": {"objectId": object_id, "insertionIndex": _utf16_len(text[:end]), "text": new_text}},
+        {
+            "deleteText": {
+                "objectId": object_id,
+                "textRange": {
+                    "type": "FIXED_RANGE",
+                    "startIndex": _utf16_len(text[:start]),
+                    "endIndex": _utf16_len(text[:end]),
+                },
+            }
+        },
+    ]
+
+
 def create_slide_1(slide_id: str, uploaded_images: dict[str, str]):
     """Generates requests for the title slide (Slide 1)."""
     # FIX: The `objectId` for page property updates and the `pageObjectId` for element
@@ -395,65 +454,54 @@ def create_slide_2(uploaded_images: dict[str, str]):
         ("Questions - Réponses", {"red": 0.96, "green": 0.49, "blue": 0.0}),
         ("Adresses utiles", {"red": 0.9, "green": 0.29, "blue": 0.1}),
     ]
-    y_pos = 140
-    for i, (text, color) in enumerate(items):
+    # The first item is the styled prototype of the others, which only change its position, colour and text
+    prototype_id = "s2_item_shape_0"
+    prototype_text, prototype_color = items[0]
+    requests.extend(
+        [
+            {
+                "createShape": {
+                    "objectId": prototype_id,
+                    "shapeType": "RECTANGLE",
+                    "elementProperties": {
+                        "pageObjectId": slide_id,
+                        "size": {"width": {"magnitude": 500, "unit": "PT"}, "height": {"magnitude": 40, "unit": "PT"}},
+                        "transform": {"scaleX": 1, "scaleY": 1, "translateX": 50, "translateY": 140, "unit": "PT"},
+                    },
+                }
+            },
+            fill_request(prototype_id, prototype_color),
+            {"insertText": {"objectId": prototype_id, "text": prototype_text}},
+            {
+                "updateTextStyle": {
+                    "objectId": prototype_id,
+                    "style": {
+                        "fontSize": {"magnitude": 16, "unit": "PT"},
+                        "foregroundColor": {"opaqueColor": {"rgbColor": WHITE_TEXT}},
+                        "bold": True,
+                        "fontFamily": "Open Sans",
+                    },
+                    "fields": "*",
+                }
+            },
+            {
+                "updateParagraphStyle": {
+                    "objectId": prototype_id,
+                    "style": {
+                        "alignment": "START",
+                        "indentStart": {"magnitude": 15, "unit": "PT"},
+                        "spaceAbove": {"magnitude": 8, "unit": "PT"},
+                    },
+                    "fields": "alignment,indentStart,spaceAbove",
+                }
+            },
+        ]
+    )
+    for i, (text, color) in enumerate(items[1:], start=1):
         shape_id = f"s2_item_shape_{i}"
-        requests.extend(
-            [
-                {
-                    "createShape": {
-                        "objectId": shape_id,
-                        "shapeType": "RECTANGLE",
-                        "elementProperties": {
-                            "pageObjectId": slide_id,
-                            "size": {
-                                "width": {"magnitude": 500, "unit": "PT"},
-                                "height": {"magnitude": 40, "unit": "PT"},
-                            },
-                            "transform": {
-                                "scaleX": 1,
-                                "scaleY": 1,
-                                "translateX": 50,
-                                "translateY": y_pos,
-                                "unit": "PT",
-                            },
-                        },
-                    }
-                },
-                {
-                    "updateShapeProperties": {
-                        "objectId": shape_id,
-                        "shapeProperties": {"shapeBackgroundFill": {"solidFill": {"color": {"rgbColor": color}}}},
-                        "fields": "shapeBackgroundFill",
-                    }
-                },
-                {"insertText": {"objectId": shape_id, "text": text}},
-                {
-                    "updateTextStyle": {
-                        "objectId": shape_id,
-                        "style": {
-                            "fontSize": {"magnitude": 16, "unit": "PT"},
-                            "foregroundColor": {"opaqueColor": {"rgbColor": WHITE_TEXT}},
-                            "bold": True,
-                            "fontFamily": "Open Sans",
-                        },
-                        "fields": "*",
-                    }
-                },
-                {
-                    "updateParagraphStyle": {
-                        "objectId": shape_id,
-                        "style": {
-                            "alignment": "START",
-                            "indentStart": {"magnitude": 15, "unit": "PT"},
-                            "spaceAbove": {"magnitude": 8, "unit": "PT"},
-                        },
-                        "fields": "alignment,indentStart,spaceAbove",
-                    }
-                },
-            ]
-        )
-        y_pos += 55
+        requests.extend(duplicate_requests(prototype_id, shape_id, 0, 55 * i))
+        requests.append(fill_request(shape_id, color))
+        requests.extend(replace_text_requests(shape_id, prototype_text, 0, len(prototype_text), text))
     return requests
 
 
@@ -689,20 +737,163 @@ def create_slide_4(uploaded_images: dict[str, str]):
             }
         },
     ]
+    # Central "Producteur" circle: the pre-cropped picture with a transparent ellipse carrying the label on top
+    center_x, center_y, radius = PPT_WIDTH / 2, 300, ACTORS_DIAMETER / 2
     if uploaded_images.get("slide3_acteurs"):
         requests.append(
             {
                 "createImage": {
-                    "objectId": "s4_diagram",
+                    "objectId": "s4_center_image",
                     "url": f"https://drive.google.com/uc?id={uploaded_images['slide3_acteurs']}",
                     "elementProperties": {
                         "pageObjectId": slide_id,
-                        "size": {"width": {"magnitude": 800, "unit": "PT"}, "height": {"magnitude": 400, "unit": "PT"}},
-                        "transform": {"scaleX": 1, "scaleY": 1, "translateX": 80, "translateY": 110, "unit": "PT"},
+                        "size": {
+                            "width": {"magnitude": radius * 2, "unit": "PT"},
+                            "height": {"magnitude": radius * 2, "unit": "PT"},
+                        },
+                        "transform": {
+                            "scaleX": 1,
+                            "scaleY": 1,
+                            "translateX": center_x - radius,
+                            "translateY": center_y - radius,
+                            "unit": "PT",
+                        },
                     },
                 }
             }
         )
+    requests.extend(
+        [
+            {
+                "createShape": {
+                    "objectId": "s4_center",
+                    "shapeType": "ELLIPSE",
+                    "elementProperties": {
+                        "pageObjectId": slide_id,
+                        "size": {
+                            "width": {"magnitude": radius * 2, "unit": "PT"},
+                            "height": {"magnitude": radius * 2, "unit": "PT"},
+                        },
+                        "transform": {
+                            "scaleX": 1,
+                            "scaleY": 1,
+                            "translateX": center_x - radius,
+                            "translateY": center_y - radius,
+                            "unit": "PT",
+                        },
+                    },
+                }
+            },
+            {
+                "updateShapeProperties": {
+                    "objectId": "s4_center",
+                    "shapeProperties": {
+                        "shapeBackgroundFill": {"propertyState": "NOT_RENDERED"},
+                        "outline": {"propertyState": "NOT_RENDERED"},
+                        "contentAlignment": "MIDDLE",
+                    },
+                    "fields": "shapeBackgroundFill,outline,contentAlignment",
+                }
+            },
+            {"insertText": {"objectId": "s4_center", "text": "Producteur"}},
+            {
+                "updateTextStyle": {
+                    "objectId": "s4_center",
+                    "style": {
+                        "fontSize": {"magnitude": 20, "unit": "PT"},
+                        "foregroundColor": {"opaqueColor": {"rgbColor": WHITE_TEXT}},
+                        "fontFamily": "Open Sans",
+                        "bold": True,
+                    },
+                    "fields": "*",
+                }
+            },
+            {
+                "updateParagraphStyle": {
+                    "objectId": "s4_center",
+                    "style": {"alignment": "CENTER"},
+                    "fields": "alignment",
+                }
+            },
+        ]
+    )
+
+    # Surrounding actors, laid out around the central circle between the header and the bottom margin
+    actors = [
+        "Commission de Régulation de l'Energie\nPour répondre à l'Appel d'Offres",
+        "Marché de l'électricité\nPour vendre mon énergie produite.\nSeul un contrat de complément de rémunération est signé avec EDF.",
+        "EDF OA (Obligations d'Achat)\nPour obtenir le contrat de complément de rémunération correspondant à l'appel d'offres.",
+        "Gestionnaire du Réseau de Distribution ou de Transport : Enedis, ELD ou RTE\nPour obtenir un contrat d'accès au réseau et mettre en service l'installation.",
+        "Préfet de Région / DGEC\nPour toute modification (d'exploitant, de puissance, …)",
+    ]
+    actor_font_size = 10
+    layout = radial_layout(
+        (center_x, center_y),
+        radius,
+        actors,
+        [measure_label(text, actor_font_size, 220, oval=True) for text in actors],
+        bounds=(30, 95, PPT_WIDTH - 30, PPT_HEIGHT - 15),
+    )
+    if not layout.fits:
+        print("Warning: the actor bubbles of slide 4 could not be laid out without overlaps.")
+    for i, placement in enumerate(layout.placements):
+        actor_id = f"s4_actor_{i}"
+        requests.extend(
+            [
+                {
+                    "createShape": {
+                        "objectId": actor_id,
+                        "shapeType": "ELLIPSE",
+                        "elementProperties": {
+                            "pageObjectId": slide_id,
+                            "size": {
+                                "width": {"magnitude": placement.width, "unit": "PT"},
+                                "height": {"magnitude": placement.height, "unit": "PT"},
+                            },
+                            "transform": {
+                                "scaleX": 1,
+                                "scaleY": 1,
+                                "translateX": placement.left,
+                                "translateY": placement.top,
+                                "unit": "PT",
+                            },
+                        },
+                    }
+                },
+                {
+                    "updateShapeProperties": {
+                        "objectId": actor_id,
+                        "shapeProperties": {
+                            "shapeBackgroundFill": {
+                                "solidFill": {"color": {"rgbColor": {"red": 0.96, "green": 0.96, "blue": 0.96}}}
+                            },
+                            "outline": {"outlineFill": {"solidFill": {"color": {"rgbColor": EDF_BLUE_DARK}}}},
+                            "contentAlignment": "MIDDLE",
+                        },
+                        "fields": "shapeBackgroundFill,outline,contentAlignment",
+                    }
+                },
+                {"insertText": {"objectId": actor_id, "text": placement.label}},
+                {
+                    "updateTextStyle": {
+                        "objectId": actor_id,
+                        "style": {
+                            "fontSize": {"magnitude": actor_font_size, "unit": "PT"},
+                            "foregroundColor": {"opaqueColor": {"rgbColor": TEXT_GRAY}},
+                            "fontFamily": "Open Sans",
+                        },
+                        "fields": "*",
+                    }
+                },
+                {
+                    "updateParagraphStyle": {
+                        "objectId": actor_id,
+                        "style": {"alignment": "CENTER"},
+                        "fields": "alignment",
+                    }
+                },
+            ]
+        )
     return requests
 
 
@@ -796,133 +987,109 @@ def create_slide_5(uploaded_images: dict[str, str]):
             {"red": 0.48, "green": 0.12, "blue": 0.64},
         ),
     ]
-    y_pos = 100
     row_height = 55
-    for i, (step_text, detail_text, color) in enumerate(steps):
-        step_box_id = f"s5_step_{i}"
-        detail_box_id = f"s5_detail_{i}"
-        step_number_str = str(i + 1)
-        # FIX: The end index for the number's style must be dynamic.
-        step_number_end_index = len(step_number_str)
-
-        requests.extend(
-            [
-                {
-                    "createShape": {
-                        "objectId": step_box_id,
-                        "shapeType": "RECTANGLE",
-                        "elementProperties": {
-                            "pageObjectId": slide_id,
-                            "size": {
-                                "width": {"magnitude": 350, "unit": "PT"},
-                                "height": {"magnitude": row_height, "unit": "PT"},
-                            },
-                            "transform": {
-                                "scaleX": 1,
-                                "scaleY": 1,
-                                "translateX": 50,
-                                "translateY": y_pos,
-                                "unit": "PT",
-                            },
-                        },
-                    }
-                },
-                {
-                    "updateShapeProperties": {
-                        "objectId": step_box_id,
-                        "shapeProperties": {"shapeBackgroundFill": {"solidFill": {"color": {"rgbColor": color}}}},
-                        "fields": "shapeBackgroundFill",
-                    }
-                },
-                {"insertText": {"objectId": step_box_id, "text": f"{step_number_str}   {step_text}"}},
-                {
-                    "updateTextStyle": {
-                        "objectId": step_box_id,
-                        "style": {
-                            "fontSize": {"magnitude": 12, "unit": "PT"},
-                            "foregroundColor": {"opaqueColor": {"rgbColor": WHITE_TEXT}},
-                            "bold": True,
-                        },
-                        "fields": "fontSize,foregroundColor,bold",
-                    }
-                },
-                {
-                    "updateTextStyle": {
-                        "objectId": step_box_id,
-                        "style": {"fontSize": {"magnitude": 24, "unit": "PT"}},
-                        "textRange": {"type": "FIXED_RANGE", "startIndex": 0, "endIndex": step_number_end_index},
-                        "fields": "fontSize",
-                    }
-                },  # FIX
-                {
-                    "updateParagraphStyle": {
-                        "objectId": step_box_id,
-                        "style": {
-                            "alignment": "START",
-                            "spaceAbove": {"magnitude": 15, "unit": "PT"},
-                            "indentStart": {"magnitude": 15, "unit": "PT"},
-                        },
-                        "fields": "*",
-                    }
-                },
-                {
-                    "createShape": {
-                        "objectId": detail_box_id,
-                        "shapeType": "RECTANGLE",
-                        "elementProperties": {
-                            "pageObjectId": slide_id,
-                            "size": {
-                                "width": {"magnitude": 500, "unit": "PT"},
-                                "height": {"magnitude": row_height, "unit": "PT"},
-                            },
-                            "transform": {
-                                "scaleX": 1,
-                                "scaleY": 1,
-                                "translateX": 405,
-                                "translateY": y_pos,
-                                "unit": "PT",
-                            },
-                        },
-                    }
-                },
-                {
-                    "updateShapeProperties": {
-                        "objectId": detail_box_id,
-                        "shapeProperties": {
-                            "shapeBackgroundFill": {
-                                "solidFill": {"color": {"rgbColor": {"red": 0.96, "green": 0.96, "blue": 0.96}}}
-                            }
-                        },
-                        "fields": "shapeBackgroundFill",
-                    }
-                },
-                {"insertText": {"objectId": detail_box_id, "text": detail_text}},
-                {
-                    "updateTextStyle": {
-                        "objectId": detail_box_id,
-                        "style": {
-                            "fontSize": {"magnitude": 10, "unit": "PT"},
-                            "foregroundColor": {"opaqueColor": {"rgbColor": TEXT_GRAY}},
+    # The first row is the styled prototype of the others, which only change its position, colours and texts
+    step_id, detail_id = "s5_step_0", "s5_detail_0"
+    step_text, detail_text, color = steps[0]
+    step_label = f"1   {step_text}"
+    requests.extend(
+        [
+            {
+                "createShape": {
+                    "objectId": step_id,
+                    "shapeType": "RECTANGLE",
+                    "elementProperties": {
+                        "pageObjectId": slide_id,
+                        "size": {
+                            "width": {"magnitude": 350, "unit": "PT"},
+                            "height": {"magnitude": row_height, "unit": "PT"},
                         },
-                        "fields": "*",
-                    }
-                },
-                {
-                    "updateParagraphStyle": {
-                        "objectId": detail_box_id,
-                        "style": {
-                            "alignment": "START",
-                            "spaceAbove": {"magnitude": 5, "unit": "PT"},
-                            "spaceBelow": {"magnitude": 5, "unit": "PT"},
-                            "indentStart": {"magnitude": 10, "unit": "PT"},
-                            "indentEnd": {"magnitude": 10, "unit": "PT"},
+                        "transform": {"scaleX": 1, "scaleY": 1, "translateX": 50, "translateY": 100, "unit": "PT"},
+                    },
+                }
+            },
+            fill_request(step_id, color),
+            {"insertText": {"objectId": step_id, "text": step_label}},
+            {
+                "updateTextStyle": {
+                    "objectId": step_id,
+                    "style": {
+                        "fontSize": {"magnitude": 12, "unit": "PT"},
+                        "foregroundColor": {"opaqueColor": {"rgbColor": WHITE_TEXT}},
+                        "bold": True,
+                    },
+                    "fields": "fontSize,foregroundColor,bold",
+                }
+            },
+            {
+                "updateTextStyle": {
+                    "objectId": step_id,
+                    "style": {"fontSize": {"magnitude": 24, "unit": "PT"}},
+                    "textRange": {"type": "FIXED_RANGE", "startIndex": 0, "endIndex": 1},
+                    "fields": "fontSize",
+                }
+            },
+            {
+                "updateParagraphStyle": {
+                    "objectId": step_id,
+                    "style": {
+                        "alignment": "START",
+                        "spaceAbove": {"magnitude": 15, "unit": "PT"},
+                        "indentStart": {"magnitude": 15, "unit": "PT"},
+                    },
+                    "fields": "*",
+                }
+            },
+            {
+                "createShape": {
+                    "objectId": detail_id,
+                    "shapeType": "RECTANGLE",
+                    "elementProperties": {
+                        "pageObjectId": slide_id,
+                        "size": {
+                            "width": {"magnitude": 500, "unit": "PT"},
+                            "height": {"magnitude": row_height, "unit": "PT"},
                         },
-                        "fields": "*",
-                    }
-                },
-            ]
-        )
-        y_pos += row_height + 4
+                        "transform": {"scaleX": 1, "scaleY": 1, "translateX": 405, "translateY": 100, "unit": "PT"},
+                    },
+                }
+            },
+            fill_request(detail_id, {"red": 0.96, "green": 0.96, "blue": 0.96}),
+            {"insertText": {"objectId": detail_id, "text": detail_text}},
+            {
+                "updateTextStyle": {
+                    "objectId": detail_id,
+                    "style": {
+                        "fontSize": {"magnitude": 10, "unit": "PT"},
+                        "foregroundColor": {"opaqueColor": {"rgbColor": TEXT_GRAY}},
+                    },
+                    "fields": "*",
+                }
+            },
+            {
+                "updateParagraphStyle": {
+                    "objectId": detail_id,
+                    "style": {
+                        "alignment": "START",
+                        "spaceAbove": {"magnitude": 5, "unit": "PT"},
+                        "spaceBelow": {"magnitude": 5, "unit": "PT"},
+                        "indentStart": {"magnitude": 10, "unit": "PT"},
+                        "indentEnd": {"magnitude": 10, "unit": "PT"},
+                    },
+                    "fields": "*",
+                }
+            },
+        ]
+    )
+    for i, (text, detail, color) in enumerate(steps[1:], start=1):
+        y_pos = 100 + i * (row_height + 4)
+        requests.extend(duplicate_requests(step_id, f"s5_step_{i}", 0, y_pos - 100))
+        requests.append(fill_request(f"s5_step_{i}", color))
+        # Replace the label first, then the number: the number keeps its larger font size
+        requests.extend(replace_text_requests(f"s5_step_{i}", step_label, 4, len(step_label), text))
+        requests.extend(replace_text_requests(f"s5_step_{i}", step_label, 0, 1, str(i + 1)))
+        requests.extend(duplicate_requests(detail_id, f"s5_detail_{i}", 0, y_pos - 100))
+        requests.extend(replace_text_requests(f"s5_detail_{i}", detail_text, 0, len(detail_text), detail))
     return requests
 
 
@@ -971,6 +1138,7 @@ def main():
 
     print("\n--- All Done! ---")
     print(f"You can view your presentation at: https://docs.google.com/presentation/d/{presentation_id}")
+    report(repo_path / "build" / "google_api_metrics.prom")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,358 @@
+"""
+Credential pool: spread high-volume Google Slides/Drive batches over several accounts' quotas.
+
+A single `token.pickle` ties every run to one user's per-minute quota. The pool loads every credential
+of a directory (service account keys, authorized-user JSON files and pickled OAuth tokens like
+`token.pickle`) and, for each job, picks the credential with the most headroom left in its per-minute
+budget. Every API call made with a credential is counted in a sliding one-minute window.
+
+A credential that gets a rate-limit error (429, or 403 rate limit) is cooled down for the `Retry-After`
+delay and the job is run again from the start on another credential, so jobs must leave nothing behind
+when they fail: the mail-merge job (`render_google`) deletes its copy of the template when filling it in
+fails. Tokens are refreshed by a background thread before they expire, so jobs never wait on a refresh,
+and refreshed OAuth tokens are written back to their files. With jobs spread this way, a batch scales
+with the number of credentials until another limit (per-project quota, bandwidth) is reached.
+
+Service accounts only see the files shared with them: share the template presentation with each of
+their e-mail addresses.
+
+Usage:
+    uv run python google/credential_pool.py TEMPLATE_ID recipients.csv --credentials-dir google/credentials
+"""
+
+import argparse
+import collections
+import copy
+import datetime
+import email.utils
+import json
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from google.auth.exceptions import RefreshError, TransportError
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from slides_metrics import MeteredHttpRequest, is_quota_error, report
+
+SCOPES = ["https://www.googleapis.com/auth/presentations", "https://www.googleapis.com/auth/drive"]
+
+# Per-user write quota of the Slides API (requests per minute); adjust to the project's quotas
+DEFAULT_LIMIT_PER_MINUTE = 60
+WINDOW = 60.0
+# Refresh tokens this long before they expire
+REFRESH_MARGIN = datetime.timedelta(minutes=5)
+REFRESH_INTERVAL = 30.0
+# Cool-down after a rate-limit error without a Retry-After header
+DEFAULT_COOLDOWN = 30.0
+
+
+def load_credentials(path: Path, scopes: list[str] = SCOPES):
+    """Load a service account key, an authorized-user JSON file or a pickled OAuth token."""
+    if path.suffix == ".pickle":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    info = json.loads(path.read_text(encoding="utf-8"))
+    if info.get("type") == "service_account":
+        from google.oauth2 import service_account
+
+        return service_account.Credentials.from_service_account_info(info, scopes=scopes)
+    from google.oauth2.credentials import Credentials
+
+    return Credentials.from_authorized_user_info(info, scopes)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a `Retry-After` header (delay in seconds or HTTP date), None if absent or invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+def save_credentials(credentials, path: Path):
+    """Write refreshed OAuth credentials back to their file, atomically. Service account keys are left as is."""
+    from google.oauth2.credentials import Credentials
+
+    if path.suffix == ".pickle":
+        data = pickle.dumps(credentials)
+    elif isinstance(credentials, Credentials):
+        data = credentials.to_json().encode()
+    else:
+        return
+    tmp_path = path.with_suffix(f".tmp{path.suffix}")
+    tmp_path.write_bytes(data)
+    os.chmod(tmp_path, 0o600)
+    tmp_path.replace(path)
+
+
+class PooledCredential:
+    """A credential with its sliding window of API calls, jobs in flight and rate-limit cool-down."""
+
+    def __init__(
+        self, name: str, credentials, limit_per_minute: int = DEFAULT_LIMIT_PER_MINUTE, path: Optional[Path] = None
+    ):
+        self.name = name
+        self.credentials = credentials
+        # File the credential was loaded from, where refreshed tokens are saved
+        self.path = path
+        self.limit_per_minute = limit_per_minute
+        self.calls: collections.deque[float] = collections.deque()
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.stats = {"jobs": 0, "calls": 0, "rate_limited": 0, "failed": 0}
+
+    def expected_calls_per_job(self) -> float:
+        return self.stats["calls"] / self.stats["jobs"] if self.stats["jobs"] else 2.0
+
+    def headroom(self, now: float) -> float:
+        """Calls left in the current window, after the expected calls of the jobs in flight."""
+        while self.calls and self.calls[0] <= now - WINDOW:
+            self.calls.popleft()
+        if now < self.cooldown_until:
+            return 0.0
+        return self.limit_per_minute - len(self.calls) - self.in_flight * self.expected_calls_per_job()
+
+    def next_slot(self, now: float) -> float:
+        """Time at which some headroom is expected to free up."""
+        if now < self.cooldown_until:
+            return self.cooldown_until
+        return self.calls[0] + WINDOW if self.calls else now + 1.0
+
+
+class CredentialPool:
+    """Assigns jobs to the credential with the most quota headroom, and keeps the tokens fresh."""
+
+    def __init__(self, credentials: list[PooledCredential], refresh_interval: float = REFRESH_INTERVAL):
+        if not credentials:
+            raise ValueError("the credential pool is empty")
+        self.credentials = credentials
+        self.refresh_interval = refresh_interval
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+        self._local = threading.local()
+
+    @classmethod
+    def from_directory(cls, directory: Path, limit_per_minute: int = DEFAULT_LIMIT_PER_MINUTE) -> "CredentialPool":
+        paths = sorted(p for p in directory.iterdir() if p.suffix in (".json", ".pickle"))
+        return cls([PooledCredential(path.stem, load_credentials(path), limit_per_minute, path) for path in paths])
+
+    # --- Token refresh ---
+
+    def _needs_refresh(self, credential: PooledCredential) -> bool:
+        credentials = credential.credentials
+        if not credentials.valid:
+            return True
+        expiry = getattr(credentials, "expiry", None)
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return expiry is not None and expiry - now < REFRESH_MARGIN
+
+    def refresh(self, force: bool = False):
+        """
+        Refresh the tokens that are invalid or about to expire, and save them to their files.
+
+        Worker threads may be sending requests with the current credentials, so a copy is refreshed and swapped
+        in: the services of each thread are rebuilt on the fresh copy on their next job.
+        """
+        for credential in self.credentials:
+            if force or self._needs_refresh(credential):
+                fresh = copy.copy(credential.credentials)
+                try:
+                    fresh.refresh(Request())
+                except (RefreshError, TransportError) as error:  # keep the other credentials running
+                    print(f"Warning: could not refresh credential {credential.name}: {error}")
+                    continue
+                credential.credentials = fresh
+                if credential.path is not None:
+                    try:
+                        save_credentials(fresh, credential.path)
+                    except OSError as error:
+                        print(f"Warning: could not save credential {credential.name}: {error}")
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def start(self):
+        """Refresh expired tokens now, then keep refreshing them in a background thread."""
+        self.refresh()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="credential-refresh", daemon=True)
+        self._refresher.start()
+
+    def close(self):
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+
+    def __enter__(self) -> "CredentialPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Scheduling ---
+
+    def acquire(self) -> PooledCredential:
+        """Reserve the credential with the most headroom, waiting while every credential is exhausted."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                best = max(self.credentials, key=lambda credential: credential.headroom(now))
+                if best.headroom(now) >= 1:
+                    best.in_flight += 1
+                    return best
+                wake_up = min(credential.next_slot(now) for credential in self.credentials)
+                self._condition.wait(timeout=max(0.05, wake_up - now))
+
+    def release(
+        self,
+        credential: PooledCredential,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+        failed: bool = False,
+    ):
+        with self._condition:
+            credential.in_flight -= 1
+            if failed:
+                credential.stats["failed"] += 1
+            elif rate_limited:
+                credential.stats["rate_limited"] += 1
+                credential.cooldown_until = time.monotonic() + (retry_after or DEFAULT_COOLDOWN)
+            else:
+                credential.stats["jobs"] += 1
+            self._condition.notify_all()
+
+    def record_call(self, credential: PooledCredential):
+        with self._condition:
+            credential.calls.append(time.monotonic())
+            credential.stats["calls"] += 1
+
+    def services(self, credential: PooledCredential) -> tuple[object, object]:
+        """Return the (slides, drive) services of a credential for the current thread."""
+        services = getattr(self._local, "services", None)
+        if services is None:
+            services = self._local.services = {}
+        # Read once: the refresh thread may swap in fresh credentials at any time
+        credentials = credential.credentials
+        if credential.name not in services or services[credential.name][0] is not credentials:
+            pool = self
+
+            class PooledHttpRequest(MeteredHttpRequest):
+                # Rate-limit errors fail over to another credential instead of being retried here
+                max_retries = 0
+
+                def execute(self, http=None, num_retries: int = 0):
+                    pool.record_call(credential)
+                    return super().execute(http=http, num_retries=num_retries)
+
+            services[credential.name] = (
+                credentials,
+                build("slides", "v1", credentials=credentials, requestBuilder=PooledHttpRequest),
+                build("drive", "v3", credentials=credentials, requestBuilder=PooledHttpRequest),
+            )
+        return services[credential.name][1:]
+
+    def run_job(self, job_fn: Callable, job, max_attempts: int = 3):
+        """
+        Run `job_fn(slides_service, drive_service, job)`, failing over to another credential on rate limits.
+
+        A failed-over job is run again from the start, so `job_fn` must undo its side effects when it fails.
+        """
+        for attempt in range(max_attempts):
+            credential = self.acquire()
+            # Whatever happens, the credential is released with the job's outcome
+            outcome = {"failed": True}
+            try:
+                result = job_fn(*self.services(credential), job)
+                outcome = {}
+                return result
+            except HttpError as error:
+                if not is_quota_error(error):
+                    raise
+                outcome = {"rate_limited": True, "retry_after": parse_retry_after(error.resp.get("retry-after"))}
+                if attempt == max_attempts - 1:
+                    raise
+                print(f"Credential {credential.name} rate limited, failing over.")
+            finally:
+                self.release(credential, **outcome)
+
+    def run(self, job_fn: Callable, jobs: Iterable, workers: int = 8) -> Iterator[tuple[object, object]]:
+        """Run jobs on a thread pool, yielding (job, future) pairs as they complete."""
+        import concurrent.futures
+
+        from llm_slide_deck._concurrency import submit_bounded
+
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            yield from submit_bounded(lambda job: pool.submit(self.run_job, job_fn, job), jobs, 4 * workers)
+
+    def summary(self) -> str:
+        lines = [f"{'credential':<24} {'jobs':>6} {'calls':>6} {'429s':>5} {'failed':>6}"]
+        for credential in self.credentials:
+            stats = credential.stats
+            lines.append(
+                f"{credential.name:<24} {stats['jobs']:>6} {stats['calls']:>6} "
+                f"{stats['rate_limited']:>5} {stats['failed']:>6}"
+            )
+        return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mail-merge a Google Slides template over a pool of credentials.")
+    parser.add_argument("template_id", help="ID of the template presentation, shared with every credential")
+    parser.add_argument("recipients", type=Path, help="CSV (with header) or JSONL file of recipients")
+    parser.add_argument("--credentials-dir", type=Path, default=Path(__file__).parent / "credentials")
+    parser.add_argument("--limit-per-minute", type=int, default=DEFAULT_LIMIT_PER_MINUTE)
+    parser.add_argument("--name-field", default="name")
+    parser.add_argument("-w", "--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    from create_slides import PRESENTATION_TITLE
+
+    from llm_slide_deck.merge import load_recipients, render_google, template_markers
+
+    template = {}
+
+    def merge(slides_service, drive_service, item):
+        index, record = item
+        if "markers" not in template:  # read once, by the first record
+            template["markers"] = template_markers(slides_service, args.template_id)
+        title = f"{PRESENTATION_TITLE} - {record.get(args.name_field) or index}"
+        return render_google(slides_service, drive_service, args.template_id, record, title, template["markers"])
+
+    start = time.perf_counter()
+    n_ok = n_failed = 0
+    with CredentialPool.from_directory(args.credentials_dir, args.limit_per_minute) as pool:
+        print(f"{len(pool.credentials)} credential(s) loaded from {args.credentials_dir}.")
+        for (index, _), future in pool.run(merge, enumerate(load_recipients(args.recipients)), args.workers):
+            if future.exception() is None:
+                n_ok += 1
+                print(f"Record {index}: https://docs.google.com/presentation/d/{future.result()}")
+            else:
+                n_failed += 1
+                print(f"Record {index} failed: {future.exception()}")
+        print(pool.summary())
+    elapsed = time.perf_counter() - start
+    print(
+        f"{n_ok} deck(s) created, {n_failed} failure(s) in {elapsed:.1f}s ({(n_ok + n_failed) / elapsed:.2f} decks/s)."
+    )
+    report()
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,703 @@
+"""
+Streaming converter from a .pptx deck to Google Slides `batchUpdate` requests.
+
+Uploading a .pptx with Drive conversion changes the layout in ways that are hard to predict. Here the
+deck is replayed with the Slides API instead:
+
+- the package is read slide part by slide part with `lxml.etree.iterparse`: each shape is converted
+  when its element ends and is then cleared, so only the current shape is held in memory, whatever
+  the size of the deck;
+- shapes (preset geometries, text boxes, lines, group transforms, rotation), fills and outlines
+  (RGB and theme colours), text (runs with their size, weight, style, colour and font, paragraph
+  alignment and bullets) and pictures are mapped to Slides requests;
+- object IDs are numbered by slide and shape ID, with a suffix for shape IDs repeated on a slide;
+- pictures are uploaded to Drive once per media part, when the first slide using them is converted;
+- requests are generated lazily and sent in chunked `batchUpdate` calls by `slides_requests.send_chunks`.
+
+Placeholders take their position from the slide layout (or master) when the slide does not set one, and
+their text style from the list styles of the layout and master placeholders, then from the master's title,
+body or other text style.
+Tables, charts and SmartArt (`graphicFrame`) are not converted and are counted as skipped.
+
+Usage:
+    cd google
+    python pptx_to_slides.py ../powerpoint/EDF_Presentation_powerpoint_slides.pptx
+    python pptx_to_slides.py deck.pptx --dry-run -o plan.jsonl
+"""
+
+import argparse
+import colorsys
+import contextlib
+import hashlib
+import math
+import posixpath
+import resource
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Sequence
+
+from create_slides import _utf16_len
+from lxml import etree
+from slides_requests import json_chunks
+
+repo_path = Path(__file__).parent.parent.resolve()
+MEDIA_CACHE_DIR = repo_path / ".cache" / "pptx_to_slides"
+
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+A, P, R = (f"{{{NS[prefix]}}}" for prefix in ("a", "p", "r"))
+
+# DrawingML preset geometries and their Slides shape types; other presets fall back to RECTANGLE
+SHAPE_TYPES = {
+    "rect": "RECTANGLE",
+    "roundRect": "ROUND_RECTANGLE",
+    "ellipse": "ELLIPSE",
+    "triangle": "TRIANGLE",
+    "rtTriangle": "RIGHT_TRIANGLE",
+    "diamond": "DIAMOND",
+    "parallelogram": "PARALLELOGRAM",
+    "trapezoid": "TRAPEZOID",
+    "pentagon": "PENTAGON",
+    "hexagon": "HEXAGON",
+    "octagon": "OCTAGON",
+    "homePlate": "HOME_PLATE",
+    "chevron": "CHEVRON",
+    "rightArrow": "RIGHT_ARROW",
+    "leftArrow": "LEFT_ARROW",
+    "upArrow": "UP_ARROW",
+    "downArrow": "DOWN_ARROW",
+    "star5": "STAR_5",
+    "plus": "PLUS",
+    "donut": "DONUT",
+    "cloud": "CLOUD",
+    "heart": "HEART",
+    "snip1Rect": "SNIP_1_RECTANGLE",
+    "round1Rect": "ROUND_1_RECTANGLE",
+    "round2SameRect": "ROUND_2_SAME_RECTANGLE",
+    "flowChartProcess": "FLOW_CHART_PROCESS",
+    "flowChartDecision": "FLOW_CHART_DECISION",
+    "flowChartTerminator": "FLOW_CHART_TERMINATOR",
+}
+ALIGNMENTS = {"l": "START", "ctr": "CENTER", "r": "END", "just": "JUSTIFIED", "dist": "JUSTIFIED"}
+ANCHORS = {"t": "TOP", "ctr": "MIDDLE", "b": "BOTTOM"}
+SCHEME_ALIASES = {"bg1": "lt1", "tx1": "dk1", "bg2": "lt2", "tx2": "dk2"}
+# Outline width of theme-styled shapes without an explicit one (0.75 pt)
+DEFAULT_LINE_WIDTH = 9525
+# Size of text without an explicit size in PowerPoint's default master, in points
+DEFAULT_FONT_SIZE = 18.0
+NOT_RENDERED = {"propertyState": "NOT_RENDERED"}
+# Master placeholder types that slide and layout placeholder types fall back to
+PLACEHOLDER_TYPES = {"ctrTitle": "title", "subTitle": "body", "obj": "body"}
+# Master text style (p:txStyles child) of each placeholder type, bodyStyle otherwise
+TEXT_STYLES = {
+    "title": "titleStyle",
+    "ctrTitle": "titleStyle",
+    "dt": "otherStyle",
+    "ftr": "otherStyle",
+    "sldNum": "otherStyle",
+    "hdr": "otherStyle",
+}
+
+
+def _resolve(part: str, target: str) -> str:
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part), target))
+
+
+def _rels_name(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+class PptxPackage:
+    """Read access to the parts of a .pptx package, parsed on demand and only the small ones kept."""
+
+    def __init__(self, path: Path):
+        self.zip = zipfile.ZipFile(path)
+        presentation = etree.fromstring(self.zip.read("ppt/presentation.xml"))
+        rels = self.rels("ppt/presentation.xml")
+        self.slide_parts = [rels[sld.get(f"{R}id")] for sld in presentation.iterfind("p:sldIdLst/p:sldId", NS)]
+        size = presentation.find("p:sldSz", NS)
+        self.size = (int(size.get("cx")), int(size.get("cy")))
+        masters = [target for target in rels.values() if "/slideMasters/" in target]
+        self.theme = self._theme(masters[0]) if masters else {}
+        self._placeholders: dict[str, dict] = {}
+        self._text_styles: dict[str, object] = {}
+
+    def rels(self, part: str) -> dict[str, str]:
+        """Return the {relationship ID: resolved part name} of a part."""
+        name = _rels_name(part)
+        if name not in self.zip.NameToInfo:
+            return {}
+        root = etree.fromstring(self.zip.read(name))
+        return {
+            rel.get("Id"): _resolve(part, rel.get("Target"))
+            for rel in root.iterfind("rel:Relationship", NS)
+            if rel.get("TargetMode") != "External"
+        }
+
+    def _theme(self, master: str) -> dict[str, str]:
+        themes = [target for target in self.rels(master).values() if "/theme/" in target]
+        if not themes:
+            return {}
+        scheme = etree.fromstring(self.zip.read(themes[0])).find("a:themeElements/a:clrScheme", NS)
+        colors = {}
+        for entry in scheme if scheme is not None else ():
+            value = entry.find("a:srgbClr", NS)
+            if value is not None:
+                colors[etree.QName(entry).localname] = value.get("val")
+            elif (value := entry.find("a:sysClr", NS)) is not None:
+                colors[etree.QName(entry).localname] = value.get("lastClr")
+        return colors
+
+    def placeholders(self, part: str) -> dict:
+        """Return the placeholder shapes of a layout or master part, keyed by idx and type."""
+        if part not in self._placeholders:
+            root = etree.fromstring(self.zip.read(part))
+            shapes = {}
+            for shape in root.iter(f"{P}sp"):
+                ph = shape.find("p:nvSpPr/p:nvPr/p:ph", NS)
+                if ph is not None:
+                    if ph.get("idx") is not None:
+                        shapes.setdefault(("idx", ph.get("idx")), shape)
+                    shapes.setdefault(("type", ph.get("type", "body")), shape)
+            self._placeholders[part] = shapes
+            self._text_styles[part] = root.find("p:txStyles", NS)
+        return self._placeholders[part]
+
+    def placeholder_inheritance(self, slide_rels: dict[str, str], ph) -> tuple[list, list]:
+        """
+        Return the layout and master placeholder shapes a slide placeholder inherits from, and the list styles
+        of its text: those of the placeholder shapes, then the master's title, body or other text style.
+        """
+        layouts = [target for target in slide_rels.values() if "/slideLayouts/" in target]
+        masters = [target for layout in layouts for target in self.rels(layout).values() if "/slideMasters/" in target]
+        ph_type = ph.get("type", "body")
+        keys = [("idx", ph.get("idx")), ("type", ph_type), ("type", PLACEHOLDER_TYPES.get(ph_type))]
+        shapes = []
+        for part in layouts + masters:
+            placeholders = self.placeholders(part)
+            shape = next((placeholders[key] for key in keys if key in placeholders), None)
+            if shape is not None:
+                shapes.append(shape)
+        styles = [shape.find("p:txBody/a:lstStyle", NS) for shape in shapes]
+        for master in masters:
+            if (text_styles := self._text_styles[master]) is not None:
+                styles.append(text_styles.find(f"p:{TEXT_STYLES.get(ph_type, 'bodyStyle')}", NS))
+        return shapes, [style for style in styles if style is not None]
+
+    def close(self):
+        self.zip.close()
+
+
+# --- Colours ---
+
+
+def _hex_rgb(value: str) -> dict:
+    return {"red": int(value[0:2], 16) / 255, "green": int(value[2:4], 16) / 255, "blue": int(value[4:6], 16) / 255}
+
+
+def color_of(element, theme: dict[str, str]) -> Optional[dict]:
+    """Return the RGB colour of a colour choice element (srgbClr, schemeClr or sysClr), with luminance mods."""
+    if element is None:
+        return None
+    for child in element:
+        name = etree.QName(child).localname
+        if name == "srgbClr":
+            value = child.get("val")
+        elif name == "schemeClr":
+            value = theme.get(SCHEME_ALIASES.get(child.get("val"), child.get("val")))
+        elif name == "sysClr":
+            value = child.get("lastClr")
+        else:
+            continue
+        if value is None:
+            return None
+        rgb = _hex_rgb(value)
+        mod = child.find("a:lumMod", NS)
+        off = child.find("a:lumOff", NS)
+        if mod is not None or off is not None:
+            hue, lightness, saturation = colorsys.rgb_to_hls(rgb["red"], rgb["green"], rgb["blue"])
+            lightness = lightness * (int(mod.get("val")) / 100000 if mod is not None else 1)
+            lightness = min(1.0, lightness + (int(off.get("val")) / 100000 if off is not None else 0))
+            red, green, blue = colorsys.hls_to_rgb(hue, lightness, saturation)
+            rgb = {"red": red, "green": green, "blue": blue}
+        return rgb
+    return None
+
+
+def _solid_color(parent, theme: dict[str, str]) -> Optional[dict]:
+    if parent is None:
+        return None
+    fill = parent.find("a:solidFill", NS)
+    if fill is None and (gradient := parent.find("a:gradFill/a:gsLst/a:gs", NS)) is not None:
+        fill = gradient  # first gradient stop, as an approximation
+    return color_of(fill, theme)
+
+
+# --- Geometry ---
+
+
+def _xfrm_box(xfrm) -> tuple[int, int, int, int, int]:
+    """(x, y, cx, cy, rotation in 60000ths of a degree) of an a:xfrm or p:xfrm element."""
+    off, ext = xfrm.find("a:off", NS), xfrm.find("a:ext", NS)
+    return (
+        int(off.get("x")) if off is not None else 0,
+        int(off.get("y")) if off is not None else 0,
+        int(ext.get("cx")) if ext is not None else 0,
+        int(ext.get("cy")) if ext is not None else 0,
+        int(xfrm.get("rot", "0")),
+    )
+
+
+def _group_mapping(xfrm) -> tuple[float, float, float, float, float, float]:
+    x, y, cx, cy, _ = _xfrm_box(xfrm)
+    child_off, child_ext = xfrm.find("a:chOff", NS), xfrm.find("a:chExt", NS)
+    ch_x, ch_y = (int(child_off.get("x")), int(child_off.get("y"))) if child_off is not None else (x, y)
+    ch_cx, ch_cy = (int(child_ext.get("cx")), int(child_ext.get("cy"))) if child_ext is not None else (cx, cy)
+    return x, y, ch_x, ch_y, cx / ch_cx if ch_cx else 1.0, cy / ch_cy if ch_cy else 1.0
+
+
+def _to_slide(box: tuple, groups: list[tuple]) -> tuple[int, int, int, int, int]:
+    x, y, cx, cy, rotation = box
+    for off_x, off_y, ch_x, ch_y, scale_x, scale_y in (group for group in reversed(groups) if group is not None):
+        x, y = off_x + (x - ch_x) * scale_x, off_y + (y - ch_y) * scale_y
+        cx, cy = cx * scale_x, cy * scale_y
+    return round(x), round(y), round(cx), round(cy), rotation
+
+
+def element_properties(page_id: str, box: tuple) -> dict:
+    """Slides element properties (in EMU) of a box, rotated about its centre like in PowerPoint."""
+    x, y, cx, cy, rotation = box
+    cx, cy = max(cx, 1), max(cy, 1)
+    transform = {"scaleX": 1, "scaleY": 1, "translateX": x, "translateY": y, "unit": "EMU"}
+    if rotation:
+        angle = math.radians(rotation / 60000)
+        cos, sin = math.cos(angle), math.sin(angle)
+        transform = {
+            "scaleX": cos,
+            "scaleY": cos,
+            "shearX": -sin,
+            "shearY": sin,
+            "translateX": x + cx / 2 - (cos * cx / 2 - sin * cy / 2),
+            "translateY": y + cy / 2 - (sin * cx / 2 + cos * cy / 2),
+            "unit": "EMU",
+        }
+    return {
+        "pageObjectId": page_id,
+        "size": {"width": {"magnitude": cx, "unit": "EMU"}, "height": {"magnitude": cy, "unit": "EMU"}},
+        "transform": transform,
+    }
+
+
+# --- Shapes ---
+
+
+def _shape_properties(shape, theme: dict[str, str], placeholders: Sequence = ()) -> tuple[dict, list[str]]:
+    """
+    Slides properties of a shape: fill, outline and vertical text anchor, the anchor being inherited from the
+    layout and master `placeholders` (see `placeholder_inheritance`) when the shape does not set it.
+    """
+    sp_pr = shape.find("p:spPr", NS)
+    style = shape.find("p:style", NS)
+    properties, fields = {}, []
+
+    if sp_pr is not None and sp_pr.find("a:noFill", NS) is not None:
+        fill = None
+    else:
+        fill = _solid_color(sp_pr, theme)
+        if fill is None and style is not None and style.find("a:fillRef", NS) is not None:
+            if style.find("a:fillRef", NS).get("idx") != "0":
+                fill = color_of(style.find("a:fillRef", NS), theme)
+    properties["shapeBackgroundFill"] = {"solidFill": {"color": {"rgbColor": fill}}} if fill else NOT_RENDERED
+    fields.append("shapeBackgroundFill")
+
+    line = sp_pr.find("a:ln", NS) if sp_pr is not None else None
+    outline_color = None
+    if line is None or line.find("a:noFill", NS) is None:
+        outline_color = _solid_color(line, theme)
+        line_ref = style.find("a:lnRef", NS) if style is not None else None
+        if outline_color is None and line_ref is not None and line_ref.get("idx") != "0":
+            outline_color = color_of(line_ref, theme)
+    if outline_color is not None:
+        width = int(line.get("w", DEFAULT_LINE_WIDTH)) if line is not None else DEFAULT_LINE_WIDTH
+        properties["outline"] = {
+            "outlineFill": {"solidFill": {"color": {"rgbColor": outline_color}}},
+            "weight": {"magnitude": width, "unit": "EMU"},
+        }
+    else:
+        properties["outline"] = NOT_RENDERED
+    fields.append("outline")
+
+    body_properties = [
+        body_pr for source in (shape, *placeholders) if (body_pr := source.find("p:txBody/a:bodyPr", NS)) is not None
+    ]
+    if body_properties:
+        # Text is anchored at the top unless stated otherwise, whereas Slides centres it in shapes
+        anchor = next((body_pr.get("anchor") for body_pr in body_properties if body_pr.get("anchor")), "t")
+        properties["contentAlignment"] = ANCHORS.get(anchor, "TOP")
+        fields.append("contentAlignment")
+    return properties, fields
+
+
+def _run_style(layers: list, theme: dict[str, str], default_color: Optional[dict]) -> tuple[dict, list[str]]:
+    """
+    Slides text style of a run, from its character properties `layers` (the run's a:rPr first, then the
+    paragraph and list-style defaults), over the PowerPoint defaults that Slides does not share.
+    """
+    layers = [layer for layer in layers if layer is not None]
+
+    def first(attribute: str) -> Optional[str]:
+        return next((layer.get(attribute) for layer in layers if layer.get(attribute) is not None), None)
+
+    size = first("sz")
+    style = {"fontSize": {"magnitude": int(size) / 100 if size else DEFAULT_FONT_SIZE, "unit": "PT"}}
+    fields = ["fontSize"]
+    color = next((color for layer in layers if (color := _solid_color(layer, theme)) is not None), default_color)
+    if color is not None:
+        style["foregroundColor"] = {"opaqueColor": {"rgbColor": color}}
+        fields.append("foregroundColor")
+    for attribute, key in (("b", "bold"), ("i", "italic")):
+        if (value := first(attribute)) is not None:
+            style[key] = value in ("1", "true")
+            fields.append(key)
+    if (value := first("u")) is not None:
+        style["underline"] = value != "none"
+        fields.append("underline")
+    typeface = next(
+        (latin.get("typeface") for layer in layers if (latin := layer.find("a:latin", NS)) is not None), None
+    )
+    if typeface and not typeface.startswith("+"):  # "+mn-lt" and the like refer to the theme fonts
+        style["fontFamily"] = typeface
+        fields.append("fontFamily")
+    return style, fields
+
+
+def _bullet_preset(layers: list) -> Optional[str]:
+    """Slides bullet preset of the first paragraph property layer that sets or removes bullets."""
+    for layer in layers:
+        if layer.find("a:buNone", NS) is not None:
+            return None
+        if layer.find("a:buChar", NS) is not None:
+            return "BULLET_DISC_CIRCLE_SQUARE"
+        if layer.find("a:buAutoNum", NS) is not None:
+            return "NUMBERED_DIGIT_ALPHA_ROMAN"
+    return None
+
+
+def text_requests(
+    object_id: str,
+    tx_body,
+    theme: dict[str, str],
+    default_color: Optional[dict] = None,
+    inherited_styles: list = (),
+) -> Iterator[dict]:
+    """
+    Insert the text of a text body, then style its runs and paragraphs by UTF-16 range.
+
+    `inherited_styles` are the list styles (a:lstStyle or p:txStyles children) below the body's own one,
+    closest first, e.g. those of the layout and master placeholders of a placeholder.
+    """
+    list_styles = [style for style in (tx_body.find("a:lstStyle", NS), *inherited_styles) if style is not None]
+    paragraphs = []  # (text, [(start, end, character property layers)], pPr layers), offsets relative to the paragraph
+    for paragraph in tx_body.iterfind("a:p", NS):
+        text, runs = "", []
+        for child in paragraph:
+            name = etree.QName(child).localname
+            if name in ("r", "fld"):
+                run_text = child.findtext("a:t", default="", namespaces=NS)
+                runs.append((_utf16_len(text), _utf16_len(text) + _utf16_len(run_text), child.find("a:rPr", NS)))
+                text += run_text
+            elif name == "br":
+                text += "\v"  # line break within the paragraph
+        paragraph_properties = paragraph.find("a:pPr", NS)
+        level = int(paragraph_properties.get("lvl", "0")) + 1 if paragraph_properties is not None else 1
+        layers = [paragraph_properties] + [style.find(f"a:lvl{level}pPr", NS) for style in list_styles]
+        layers = [layer for layer in layers if layer is not None]
+        defaults = [layer.find("a:defRPr", NS) for layer in layers]
+        runs = [(run_start, run_end, [run_properties] + defaults) for run_start, run_end, run_properties in runs]
+        paragraphs.append((text, runs, layers))
+    full_text = "\n".join(text for text, _, _ in paragraphs)
+    if not full_text.strip():
+        return
+    yield {"insertText": {"objectId": object_id, "text": full_text}}
+
+    start = 0
+    for text, runs, layers in paragraphs:
+        end = start + _utf16_len(text)
+        for run_start, run_end, run_layers in runs:
+            style, fields = _run_style(run_layers, theme, default_color)
+            if fields and run_end > run_start:
+                yield {
+                    "updateTextStyle": {
+                        "objectId": object_id,
+                        "textRange": {
+                            "type": "FIXED_RANGE",
+                            "startIndex": start + run_start,
+                            "endIndex": start + run_end,
+                        },
+                        "style": style,
+                        "fields": ",".join(fields),
+                    }
+                }
+        if layers and end > start:
+            text_range = {"type": "FIXED_RANGE", "startIndex": start, "endIndex": end}
+            alignment = next((layer.get("algn") for layer in layers if layer.get("algn") is not None), None)
+            if alignment in ALIGNMENTS:
+                yield {
+                    "updateParagraphStyle": {
+                        "objectId": object_id,
+                        "textRange": text_range,
+                        "style": {"alignment": ALIGNMENTS[alignment]},
+                        "fields": "alignment",
+                    }
+                }
+            preset = _bullet_preset(layers)
+            if preset:
+                yield {
+                    "createParagraphBullets": {"objectId": object_id, "textRange": text_range, "bulletPreset": preset}
+                }
+        start = end + 1  # the paragraph separator
+
+
+# --- Slides ---
+
+
+def slide_requests(
+    package: PptxPackage, number: int, part: str, media_url: Callable[[str], Optional[str]], stats: dict
+) -> Iterator[dict]:
+    """Yield the requests that recreate one slide, converting each shape as the parser reaches its end."""
+    page_id = f"slide{number}"
+    rels = package.rels(part)
+    theme = package.theme
+    yield {"createSlide": {"objectId": page_id, "slideLayoutReference": {"predefinedLayout": "BLANK"}}}
+
+    # Mapping of each enclosing group (None without a transform); the slide's p:spTree is not a p:grpSp
+    groups: list[Optional[tuple]] = []
+    # Occurrences of each shape ID: they are meant to be unique on a slide, but copied shapes may repeat them
+    occurrences: dict[str, int] = {}
+    with package.zip.open(part) as stream:
+        for event, element in etree.iterparse(stream, events=("start", "end")):
+            tag = element.tag
+            if tag == f"{P}grpSp":
+                if event == "start":
+                    groups.append(None)
+                else:
+                    groups.pop()
+                continue
+            if event != "end":
+                continue
+            if tag == f"{P}grpSpPr" and element.getparent().tag == f"{P}grpSp":
+                xfrm = element.find("a:xfrm", NS)
+                if xfrm is not None:
+                    groups[-1] = _group_mapping(xfrm)
+            elif tag in (f"{P}sp", f"{P}pic", f"{P}cxnSp", f"{P}graphicFrame"):
+                shape_id = element.find("*/p:cNvPr", NS).get("id")
+                occurrences[shape_id] = occurrences.get(shape_id, 0) + 1
+                object_id = f"{page_id}_e{shape_id}"
+                if occurrences[shape_id] > 1:
+                    object_id += f"_{occurrences[shape_id]}"
+                yield from _element_requests(
+                    package, page_id, object_id, element, rels, groups, media_url, theme, stats
+                )
+                # Drop the converted shape and the siblings before it
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+    stats["slides"] += 1
+
+
+def _element_requests(package, page_id, object_id, element, rels, groups, media_url, theme, stats) -> Iterator[dict]:
+    tag = etree.QName(element).localname
+    if tag == "graphicFrame":
+        stats["skipped"] += 1
+        return
+    ph = element.find("*/p:nvPr/p:ph", NS)
+    placeholders, inherited_styles = package.placeholder_inheritance(rels, ph) if ph is not None else ([], [])
+    xfrm = element.find("p:spPr/a:xfrm", NS)
+    if xfrm is None:
+        xfrm = next((x for shape in placeholders if (x := shape.find("p:spPr/a:xfrm", NS)) is not None), None)
+    if xfrm is None:
+        stats["skipped"] += 1
+        return
+    box = _xfrm_box(xfrm)
+    box = _to_slide(box, groups)
+
+    if tag == "pic":
+        blip = element.find("p:blipFill/a:blip", NS)
+        media = rels.get(blip.get(f"{R}embed")) if blip is not None else None
+        url = media_url(media) if media else None
+        if url is None:
+            stats["skipped"] += 1
+            return
+        yield {
+            "createImage": {"objectId": object_id, "url": url, "elementProperties": element_properties(page_id, box)}
+        }
+        stats["pictures"] += 1
+        return
+
+    if tag == "cxnSp":
+        yield {
+            "createLine": {
+                "objectId": object_id,
+                "lineCategory": "STRAIGHT",
+                "elementProperties": element_properties(page_id, box),
+            }
+        }
+        line = element.find("p:spPr/a:ln", NS)
+        color = _solid_color(line, theme)
+        if color is not None:
+            yield {
+                "updateLineProperties": {
+                    "objectId": object_id,
+                    "lineProperties": {
+                        "lineFill": {"solidFill": {"color": {"rgbColor": color}}},
+                        "weight": {"magnitude": int(line.get("w", DEFAULT_LINE_WIDTH)), "unit": "EMU"},
+                    },
+                    "fields": "lineFill,weight",
+                }
+            }
+        stats["shapes"] += 1
+        return
+
+    tx_body = element.find("p:txBody", NS)
+    is_text_box = element.find("p:nvSpPr/p:cNvSpPr", NS) is not None and (
+        element.find("p:nvSpPr/p:cNvSpPr", NS).get("txBox") == "1"
+    )
+    geometry = element.find("p:spPr/a:prstGeom", NS)
+    if is_text_box:
+        shape_type = "TEXT_BOX"
+    elif geometry is not None and geometry.get("prst") in SHAPE_TYPES:
+        shape_type = SHAPE_TYPES[geometry.get("prst")]
+    else:
+        shape_type = "RECTANGLE"
+        if geometry is not None:
+            stats["approximated"] += 1
+    if ph is not None and (tx_body is None or not "".join(tx_body.itertext()).strip()):
+        return  # empty placeholder, only visible while editing
+    yield {
+        "createShape": {
+            "objectId": object_id,
+            "shapeType": shape_type,
+            "elementProperties": element_properties(page_id, box),
+        }
+    }
+    properties, fields = _shape_properties(element, theme, placeholders)
+    yield {"updateShapeProperties": {"objectId": object_id, "shapeProperties": properties, "fields": ",".join(fields)}}
+    if tx_body is not None:
+        # Text of theme-styled shapes takes the colour of their font reference (white on python-pptx shapes)
+        default_color = color_of(element.find("p:style/a:fontRef", NS), theme)
+        yield from text_requests(object_id, tx_body, theme, default_color, inherited_styles)
+    stats["shapes"] += 1
+
+
+def convert(
+    path: Path, media_url: Callable[[str, bytes], Optional[str]], delete_slide_id: Optional[str] = None
+) -> tuple[Iterator[dict], dict]:
+    """
+    Return a lazy stream of the requests recreating the deck of `path`, and its (live) statistics.
+
+    `media_url(part name, data)` uploads a media part and returns its URL; it is called once per part.
+    `delete_slide_id`, e.g. the default slide of a new presentation, is deleted after the last slide.
+    """
+    stats = {"slides": 0, "shapes": 0, "pictures": 0, "approximated": 0, "skipped": 0, "requests": 0}
+
+    def requests() -> Iterator[dict]:
+        package = PptxPackage(path)
+        urls: dict[str, Optional[str]] = {}
+
+        def url_of(part: str) -> Optional[str]:
+            if part not in urls:
+                urls[part] = media_url(part, package.zip.read(part)) if part in package.zip.NameToInfo else None
+            return urls[part]
+
+        try:
+            for number, part in enumerate(package.slide_parts, start=1):
+                for request in slide_requests(package, number, part, url_of, stats):
+                    stats["requests"] += 1
+                    yield request
+        finally:
+            package.close()
+        if delete_slide_id:
+            yield {"deleteObject": {"objectId": delete_slide_id}}
+
+    return requests(), stats
+
+
+def drive_media_url(drive_service) -> Callable[[str, bytes], Optional[str]]:
+    """Upload media parts to Drive, by content hash so that unchanged media are found instead of re-uploaded."""
+    from create_slides import find_or_upload_image_to_drive
+
+    def media_url(part: str, data: bytes) -> Optional[str]:
+        MEDIA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = MEDIA_CACHE_DIR / f"{hashlib.sha1(data).hexdigest()[:16]}{posixpath.splitext(part)[1]}"
+        if not path.exists():
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        file_id = find_or_upload_image_to_drive(drive_service, path)
+        return f"https://drive.google.com/uc?id={file_id}" if file_id else None
+
+    return media_url
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recreate a .pptx deck in Google Slides with batchUpdate requests.")
+    parser.add_argument("pptx", type=Path)
+    parser.add_argument("--title", default=None, help="title of the new presentation (default: the file name)")
+    parser.add_argument("--dry-run", action="store_true", help="only generate the requests, nothing is sent")
+    parser.add_argument(
+        "-o", "--output", type=Path, default=None, help="with --dry-run, write the request chunks as JSON lines"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.dry_run:
+        requests, stats = convert(args.pptx, lambda part, data: f"https://example.invalid/{posixpath.basename(part)}")
+        n_bytes = 0
+        with open(args.output, "w", encoding="utf-8") if args.output else contextlib.nullcontext() as output:
+            for chunk in json_chunks(requests):
+                n_bytes += len(chunk)
+                if output is not None:
+                    output.write(chunk.decode() + "\n")
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(
+            f"{stats['slides']} slide(s), {stats['shapes']} shape(s), {stats['pictures']} picture(s) "
+            f"({stats['approximated']} approximated, {stats['skipped']} skipped): {stats['requests']} request(s), "
+            f"{n_bytes / 1024:.0f} KiB in {time.perf_counter() - start:.2f}s, peak RSS {peak_rss:.0f} MiB."
+        )
+        if args.output:
+            print(f"Request chunks written to {args.output}, one batchUpdate body per line.")
+        return 0
+
+    from create_slides import get_drive_service, get_slides_service
+    from slides_metrics import report
+    from slides_requests import send_chunks
+
+    slides_service = get_slides_service()
+    package = PptxPackage(args.pptx)
+    width, height = package.size
+    package.close()
+    body = {
+        "title": args.title or args.pptx.stem,
+        "pageSize": {"width": {"magnitude": width, "unit": "EMU"}, "height": {"magnitude": height, "unit": "EMU"}},
+    }
+    presentation = slides_service.presentations().create(body=body).execute()
+    presentation_id = presentation["presentationId"]
+    requests, stats = convert(args.pptx, drive_media_url(get_drive_service()), presentation["slides"][0]["objectId"])
+    calls = send_chunks(slides_service, presentation_id, json_chunks(requests))
+    print(
+        f"{stats['slides']} slide(s) converted in {calls} batchUpdate call(s) ({stats['approximated']} approximated, "
+        f"{stats['skipped']} skipped shape(s)) in {time.perf_counter() - start:.1f}s: "
+        f"https://docs.google.com/presentation/d/{presentation_id}"
+    )
+    report()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
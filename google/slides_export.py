@@ -0,0 +1,258 @@
+"""
+Export stage: slide thumbnails and PDF of a Google Slides presentation, cached by revision.
+
+The thumbnails of all slides are fetched concurrently (`pages.getThumbnail`, then a download of each
+returned content URL), and the PDF export of Drive is streamed to disk in chunks. Both are cached under
+`.cache/slides_export/<presentation ID>/<revision ID>/`: an unchanged presentation keeps its revision ID,
+so exporting it again costs a single `presentations.get`.
+
+Each thumbnail gets a perceptual hash (dHash: a 9x8 grayscale reduction, one bit per horizontal
+gradient). The hashes are compared with the previous export of a presentation with the same title,
+by slide object ID, and the slides whose hash moved by more than `--threshold` bits are reported as
+visually changed, together with the added and removed slides. The title rather than the ID identifies
+the previous export, because `create_slides.py` recreates the deck, under a new ID, on every run; its
+slide object IDs are fixed, so the slides still match. `--previous` compares with a given manifest.
+
+Usage:
+    cd google
+    python slides_export.py [PRESENTATION_ID] --pdf EDF_Presentation_google_slides.pdf
+"""
+
+import argparse
+import concurrent.futures
+import json
+import re
+import shutil
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Callable, Optional
+
+from googleapiclient.http import MediaIoBaseDownload
+from PIL import Image
+
+repo_path = Path(__file__).parent.parent.resolve()
+CACHE_DIR = repo_path / ".cache" / "slides_export"
+
+# pages.getThumbnail sizes: SMALL (200 px), MEDIUM (800 px) or LARGE (1600 px wide)
+THUMBNAIL_SIZE = "LARGE"
+PDF_CHUNK_SIZE = 1 << 20
+# Hamming distance between dHashes above which a slide is reported as changed
+DEFAULT_THRESHOLD = 4
+
+
+def dhash(path: Path, size: int = 8) -> int:
+    """Return the 64-bit difference hash of an image."""
+    with Image.open(path) as image:
+        pixels = list(image.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS).getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left, right = pixels[row * (size + 1) + col], pixels[row * (size + 1) + col + 1]
+            bits = bits << 1 | (left > right)
+    return bits
+
+
+def _write_atomic(path: Path, write: Callable):
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        write(f)
+    tmp_path.replace(path)
+
+
+def export_pdf(drive_service, presentation_id: str, path: Path, chunk_size: int = PDF_CHUNK_SIZE):
+    """Stream the PDF export of a presentation to `path`, one chunk at a time."""
+
+    def write(f):
+        request = drive_service.files().export_media(fileId=presentation_id, mimeType="application/pdf")
+        downloader = MediaIoBaseDownload(f, request, chunksize=chunk_size)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+
+    _write_atomic(path, write)
+
+
+def export_thumbnails(
+    service_factory: Callable[[], object], presentation_id: str, slide_ids: list[str], output_dir: Path, workers: int
+) -> list[Path]:
+    """
+    Download the thumbnails of `slide_ids` concurrently, as `slide-NNN-<object ID>.png` in `output_dir`.
+
+    `service_factory` returns a Slides service; it is called once per worker thread because the API
+    client objects are not thread-safe.
+    """
+    local = threading.local()
+
+    def fetch(index: int, slide_id: str) -> Path:
+        if not hasattr(local, "service"):
+            local.service = service_factory()
+        thumbnail = (
+            local.service.presentations()
+            .pages()
+            .getThumbnail(
+                presentationId=presentation_id,
+                pageObjectId=slide_id,
+                thumbnailProperties_thumbnailSize=THUMBNAIL_SIZE,
+                thumbnailProperties_mimeType="PNG",
+            )
+            .execute()
+        )
+        path = output_dir / f"slide-{index:03d}-{slide_id}.png"
+        with urllib.request.urlopen(thumbnail["contentUrl"], timeout=60) as response:
+            _write_atomic(path, lambda f: shutil.copyfileobj(response, f))
+        return path
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(fetch, range(1, len(slide_ids) + 1), slide_ids))
+
+
+def compare(previous: dict[str, str], current: dict[str, str], threshold: int = DEFAULT_THRESHOLD) -> dict:
+    """Compare two {slide ID: hex dHash} maps. Returns the changed, added and removed slide IDs."""
+    changed = {
+        slide_id: bin(int(digest, 16) ^ int(previous[slide_id], 16)).count("1")
+        for slide_id, digest in current.items()
+        if slide_id in previous
+    }
+    return {
+        "changed": {slide_id: distance for slide_id, distance in changed.items() if distance > threshold},
+        "added": [slide_id for slide_id in current if slide_id not in previous],
+        "removed": [slide_id for slide_id in previous if slide_id not in current],
+    }
+
+
+def latest_path(cache_dir: Path, title: str) -> Path:
+    """Path of the manifest of the last export of the presentations titled `title`."""
+    return cache_dir / "latest" / f"{re.sub(r'[^\w.-]+', '_', title)}.json"
+
+
+def export(
+    slides_service,
+    drive_service,
+    service_factory: Callable[[], object],
+    presentation_id: str,
+    workers: int = 8,
+    threshold: int = DEFAULT_THRESHOLD,
+    cache_dir: Path = CACHE_DIR,
+    previous_path: Optional[Path] = None,
+) -> dict:
+    """
+    Export the thumbnails and PDF of the current revision of a presentation, unless already cached.
+
+    Returns the manifest of the revision: its ID, the PDF path, the thumbnails and dHashes of the slides
+    and, when a previous export is found (`previous_path`, or else the last export of a presentation with
+    the same title), the comparison with it.
+    """
+    presentation = (
+        slides_service.presentations()
+        .get(presentationId=presentation_id, fields="title,revisionId,slides(objectId)")
+        .execute()
+    )
+    revision_id = presentation["revisionId"]
+    revision_dir = cache_dir / presentation_id / revision_id
+    manifest_path = revision_dir / "manifest.json"
+    if manifest_path.exists():
+        print(f"Revision {revision_id} already exported.")
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    slide_ids = [slide["objectId"] for slide in presentation.get("slides", [])]
+    revision_dir.mkdir(parents=True, exist_ok=True)
+    with concurrent.futures.ThreadPoolExecutor(1) as pdf_pool:
+        # The PDF export streams in the background while the thumbnails are fetched
+        pdf_path = revision_dir / "presentation.pdf"
+        pdf_future = pdf_pool.submit(export_pdf, drive_service, presentation_id, pdf_path)
+        thumbnails = export_thumbnails(service_factory, presentation_id, slide_ids, revision_dir, workers)
+        pdf_future.result()
+
+    manifest = {
+        "presentation_id": presentation_id,
+        "title": presentation.get("title", ""),
+        "revision_id": revision_id,
+        "pdf": str(pdf_path),
+        "slides": [
+            {"object_id": slide_id, "thumbnail": str(path), "dhash": f"{dhash(path):016x}"}
+            for slide_id, path in zip(slide_ids, thumbnails)
+        ],
+    }
+    # Keyed by title: rebuilding the deck gives it a new ID, but the same title and slide object IDs
+    title_latest_path = latest_path(cache_dir, manifest["title"])
+    title_latest_path.parent.mkdir(parents=True, exist_ok=True)
+    if previous_path is None and title_latest_path.exists():
+        previous_path = title_latest_path
+    if previous_path is not None:
+        previous = json.loads(previous_path.read_text(encoding="utf-8"))
+        manifest["previous_presentation_id"] = previous["presentation_id"]
+        manifest["previous_revision_id"] = previous["revision_id"]
+        manifest["comparison"] = compare(
+            {slide["object_id"]: slide["dhash"] for slide in previous["slides"]},
+            {slide["object_id"]: slide["dhash"] for slide in manifest["slides"]},
+            threshold,
+        )
+    text = json.dumps(manifest, indent=2)
+    _write_atomic(manifest_path, lambda f: f.write(text.encode()))
+    _write_atomic(title_latest_path, lambda f: f.write(text.encode()))
+    return manifest
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the thumbnails and PDF of a Google Slides presentation.")
+    parser.add_argument("presentation_id", nargs="?", help="defaults to the presentation built by create_slides.py")
+    parser.add_argument("--pdf", type=Path, default=None, help="also copy the PDF to this path")
+    parser.add_argument("-w", "--workers", type=int, default=8)
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="dHash bits for a visual change")
+    parser.add_argument(
+        "--previous", type=Path, default=None, help="manifest to compare with (default: last export of the same title)"
+    )
+    args = parser.parse_args(argv)
+
+    from create_slides import PRESENTATION_TITLE, get_google_creds
+    from googleapiclient.discovery import build
+    from slides_metrics import MeteredHttpRequest, report
+
+    creds = get_google_creds()
+
+    def slides_factory():
+        return build("slides", "v1", credentials=creds, requestBuilder=MeteredHttpRequest)
+
+    slides_service = slides_factory()
+    drive_service = build("drive", "v3", credentials=creds, requestBuilder=MeteredHttpRequest)
+
+    presentation_id = args.presentation_id
+    if presentation_id is None:
+        safe_title = PRESENTATION_TITLE.replace("'", "\\'")
+        query = f"name='{safe_title}' and mimeType='application/vnd.google-apps.presentation' and trashed=false"
+        files = drive_service.files().list(q=query, fields="files(id)").execute().get("files", [])
+        if not files:
+            print(f"No presentation titled '{PRESENTATION_TITLE}' found.")
+            return 1
+        presentation_id = files[0]["id"]
+
+    manifest = export(
+        slides_service,
+        drive_service,
+        slides_factory,
+        presentation_id,
+        args.workers,
+        args.threshold,
+        previous_path=args.previous,
+    )
+    print(f"Revision {manifest['revision_id']}: {len(manifest['slides'])} thumbnail(s), PDF {manifest['pdf']}")
+    comparison = manifest.get("comparison")
+    if comparison is not None:
+        print(f"Compared with revision {manifest['previous_revision_id']}:")
+        for slide_id, distance in comparison["changed"].items():
+            print(f"  changed: {slide_id} ({distance} bits)")
+        for key in ("added", "removed"):
+            for slide_id in comparison[key]:
+                print(f"  {key}: {slide_id}")
+        if not any(comparison.values()):
+            print("  no visual change")
+    if args.pdf is not None:
+        shutil.copyfile(manifest["pdf"], args.pdf)
+        print(f"PDF copied to {args.pdf}")
+    report()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
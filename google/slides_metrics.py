@@ -0,0 +1,217 @@
+"""
+Call metrics for the Google Slides and Drive APIs.
+
+`MeteredHttpRequest` replaces the request class of the API clients (`build(..., requestBuilder=...)`),
+so every `.execute()` of the generator (files.list/create/delete, permissions.create,
+presentations.create/batchUpdate) is measured without changing the call sites. For each API method it
+records the number of calls by outcome, the request and response bytes, a latency histogram, the
+retries and the quota errors. Rate-limit errors, which are rejected before the call has any effect, are
+retried with exponential backoff; server errors only for idempotent HTTP methods, since a failed
+files.copy or batchUpdate may still have been applied. Callers keep the `num_retries` of the client
+library for anything else.
+
+The metrics are kept in the process-wide `METRICS` registry, which renders a per-run summary and the
+Prometheus text exposition format (for a node exporter textfile collector or a Pushgateway).
+"""
+
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Latencies kept per method for the p50/p95 of the summary: a uniform sample once more calls were made
+LATENCY_SAMPLE_SIZE = 1024
+# Retries of rate-limited (429, 403 rate limit) errors, and of server (5xx) errors of idempotent methods
+MAX_RETRIES = 4
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+MAX_BACKOFF = 32.0
+QUOTA_REASONS = (b"rateLimitExceeded", b"userRateLimitExceeded", b"quotaExceeded", b"RATE_LIMIT_EXCEEDED")
+
+
+def is_quota_error(error: HttpError) -> bool:
+    """Whether an API error is a rate limit or quota error."""
+    if error.resp.status == 429:
+        return True
+    return error.resp.status == 403 and any(reason in (error.content or b"") for reason in QUOTA_REASONS)
+
+
+class ApiMetrics:
+    """Thread-safe registry of per-method call metrics for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget all recorded calls and restart the run clock."""
+        with self._lock:
+            self.started = time.perf_counter()
+            self.methods: dict[str, dict] = {}
+
+    def _method(self, method: str) -> dict:
+        if method not in self.methods:
+            self.methods[method] = {
+                "calls": {},
+                "request_bytes": 0,
+                "response_bytes": 0,
+                "retries": 0,
+                "quota_errors": 0,
+                "buckets": [0] * len(LATENCY_BUCKETS),
+                "count": 0,
+                "seconds": 0.0,
+                "latencies": [],  # reservoir sample of at most LATENCY_SAMPLE_SIZE latencies
+            }
+        return self.methods[method]
+
+    def record(self, method: str, seconds: float, status: str, request_bytes: int = 0, response_bytes: int = 0):
+        """Record one HTTP attempt of `method` ("ok", "error" or "quota_error")."""
+        with self._lock:
+            metrics = self._method(method)
+            metrics["calls"][status] = metrics["calls"].get(status, 0) + 1
+            metrics["request_bytes"] += request_bytes
+            metrics["response_bytes"] += response_bytes
+            metrics["quota_errors"] += status == "quota_error"
+            metrics["count"] += 1
+            metrics["seconds"] += seconds
+            # Reservoir sampling keeps memory bounded in long-running processes (service, credential pool)
+            if len(metrics["latencies"]) < LATENCY_SAMPLE_SIZE:
+                metrics["latencies"].append(seconds)
+            elif (slot := random.randrange(metrics["count"])) < LATENCY_SAMPLE_SIZE:
+                metrics["latencies"][slot] = seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    metrics["buckets"][i] += 1
+                    break
+
+    def record_retry(self, method: str):
+        with self._lock:
+            self._method(method)["retries"] += 1
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        with self._lock:
+            methods = sorted(self.methods.items())
+            lines = [
+                "# HELP google_api_requests_total HTTP attempts of Google API methods, by outcome.",
+                "# TYPE google_api_requests_total counter",
+            ]
+            for method, metrics in methods:
+                for status, count in sorted(metrics["calls"].items()):
+                    lines.append(f'google_api_requests_total{{method="{method}",status="{status}"}} {count}')
+            for name, key, help_text in [
+                ("google_api_request_bytes_total", "request_bytes", "Bytes sent in request bodies."),
+                ("google_api_response_bytes_total", "response_bytes", "Bytes received in response bodies."),
+                ("google_api_retries_total", "retries", "Retried attempts after rate limit or server errors."),
+                ("google_api_quota_errors_total", "quota_errors", "Rate limit and quota errors."),
+            ]:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                lines += [f'{name}{{method="{method}"}} {metrics[key]}' for method, metrics in methods]
+            lines += [
+                "# HELP google_api_request_duration_seconds Latency of HTTP attempts of Google API methods.",
+                "# TYPE google_api_request_duration_seconds histogram",
+            ]
+            for method, metrics in methods:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, metrics["buckets"]):
+                    cumulative += count
+                    lines.append(
+                        f'google_api_request_duration_seconds_bucket{{method="{method}",le="{bound}"}} {cumulative}'
+                    )
+                total = metrics["count"]
+                lines.append(f'google_api_request_duration_seconds_bucket{{method="{method}",le="+Inf"}} {total}')
+                lines.append(
+                    f'google_api_request_duration_seconds_sum{{method="{method}"}} {metrics["seconds"]:.6f}'
+                )
+                lines.append(f'google_api_request_duration_seconds_count{{method="{method}"}} {total}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path):
+        """Write the Prometheus metrics atomically, as expected by textfile collectors."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(self.to_prometheus(), encoding="utf-8")
+        tmp_path.replace(path)
+
+    def summary(self) -> str:
+        """Return a per-method table of calls, bytes and latencies, and the share of the run spent in API calls."""
+        with self._lock:
+            wall = time.perf_counter() - self.started
+            lines = [
+                f"{'method':<32} {'calls':>5} {'errors':>6} {'retries':>7} {'sent KiB':>9} {'recv KiB':>9} "
+                f"{'p50 ms':>7} {'p95 ms':>7} {'total s':>7}"
+            ]
+            api_seconds = 0.0
+            for method, metrics in sorted(self.methods.items(), key=lambda item: -item[1]["seconds"]):
+                latencies = sorted(metrics["latencies"])
+                calls = sum(metrics["calls"].values())
+                errors = calls - metrics["calls"].get("ok", 0)
+                p50 = latencies[len(latencies) // 2] if latencies else 0.0
+                p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else 0.0
+                api_seconds += metrics["seconds"]
+                lines.append(
+                    f"{method:<32} {calls:>5} {errors:>6} {metrics['retries']:>7} "
+                    f"{metrics['request_bytes'] / 1024:>9.1f} {metrics['response_bytes'] / 1024:>9.1f} "
+                    f"{p50 * 1000:>7.0f} {p95 * 1000:>7.0f} {metrics['seconds']:>7.2f}"
+                )
+        lines.append(f"API calls took {api_seconds:.2f}s of the {wall:.2f}s run ({api_seconds / wall:.0%}).")
+        return "\n".join(lines)
+
+
+METRICS = ApiMetrics()
+
+
+class MeteredHttpRequest(HttpRequest):
+    """HttpRequest that records its attempts in `METRICS` and retries the errors that are safe to retry."""
+
+    max_retries = MAX_RETRIES
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._response_bytes = 0
+        postproc = self.postproc
+
+        def measured_postproc(resp, content):
+            self._response_bytes = len(content or b"")
+            return postproc(resp, content)
+
+        self.postproc = measured_postproc
+
+    def execute(self, http=None, num_retries: int = 0):
+        method = self.methodId or self.method
+        request_bytes = self.body_size + (self.resumable.size() if self.resumable else 0)
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                result = super().execute(http=http, num_retries=num_retries)
+            except HttpError as error:
+                quota = is_quota_error(error)
+                METRICS.record(
+                    method,
+                    time.perf_counter() - start,
+                    "quota_error" if quota else "error",
+                    request_bytes,
+                    len(error.content or b""),
+                )
+                retryable = quota or (error.resp.status >= 500 and self.method.upper() in IDEMPOTENT_METHODS)
+                if attempt == self.max_retries or not retryable:
+                    raise
+                METRICS.record_retry(method)
+                time.sleep(min(MAX_BACKOFF, 2**attempt + random.random()))
+                continue
+            METRICS.record(method, time.perf_counter() - start, "ok", request_bytes, self._response_bytes)
+            return result
+
+
+def report(prometheus_path: Optional[Path] = None):
+    """Print the run summary and optionally write the Prometheus metrics file."""
+    print("\n--- Google API calls ---")
+    print(METRICS.summary())
+    if prometheus_path is not None:
+        METRICS.write_prometheus(prometheus_path)
+        print(f"Prometheus metrics written to {prometheus_path}")
@@ -0,0 +1,503 @@
+"""
+Compact Slides API requests, serialised lazily to JSON chunks, for decks of thousands of slides.
+
+The `create_slide_N` builders of `create_slides.py` return nested dicts that each repeat the same
+`elementProperties`, `"unit": "PT"` and colour dicts, and the whole plan is kept in one list before it
+is sent. That is fine for five slides, but for generated decks of 1000+ slides the plan dominates
+memory. Here instead:
+
+- requests are small `__slots__` objects holding only their IDs, text and references to shared,
+  immutable fragments (sizes, transforms, colours and styles), which are cached and pre-serialised,
+- slides are produced by generators, so requests only exist while their chunk is serialised,
+- `json_chunks` writes the requests straight to `{"requests": [...]}` JSON bodies of bounded size,
+  sent as raw bytes by `send_chunks`.
+
+Each chunk is one `batchUpdate` call: chunks are applied atomically, but a deck sent in several chunks
+is not.
+
+Usage:
+    uv run python google/slides_requests.py build/ingest/slides.jsonl --repeat 200 --bench
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from create_slides import HEADER_ORANGE, PPT_WIDTH, TEXT_GRAY, WHITE_TEXT
+
+from llm_slide_deck.pagination import DEFAULT_FONT_SIZE, column_widths, paginate
+
+# Limits of one batchUpdate body
+MAX_CHUNK_REQUESTS = 500
+MAX_CHUNK_BYTES = 2 << 20
+
+# Area of the table slides (left, top, width, height), in points: below the header, above the logo
+TABLE_AREA = (50.0, 100.0, 860.0, 380.0)
+ROW_GRAY = (0.95, 0.95, 0.95)
+# Entries of each fragment cache: a deck uses a few dozen sizes, positions and styles, while the bound keeps
+# long-running processes (service, batch generation) from growing with every distinct value
+FRAGMENT_CACHE_SIZE = 1024
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class Fragment:
+    """An immutable JSON value, serialised once and shared by every request that uses it."""
+
+    __slots__ = ("json",)
+
+    def __init__(self, value):
+        self.json = _dumps(value)
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def element_size(width: float, height: float) -> Fragment:
+    return Fragment({"width": {"magnitude": width, "unit": "PT"}, "height": {"magnitude": height, "unit": "PT"}})
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def element_transform(x: float, y: float) -> Fragment:
+    return Fragment({"scaleX": 1, "scaleY": 1, "translateX": x, "translateY": y, "unit": "PT"})
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def solid_shape(red: float, green: float, blue: float) -> Fragment:
+    """Shape properties with the same solid fill and outline colour."""
+    fill = {"solidFill": {"color": {"rgbColor": {"red": red, "green": green, "blue": blue}}}}
+    return Fragment({"shapeBackgroundFill": fill, "outline": {"outlineFill": fill}})
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def text_style(font_size: float, color: tuple[float, float, float], bold: bool = False) -> Fragment:
+    red, green, blue = color
+    style = {
+        "fontSize": {"magnitude": font_size, "unit": "PT"},
+        "foregroundColor": {"opaqueColor": {"rgbColor": {"red": red, "green": green, "blue": blue}}},
+        "fontFamily": "Open Sans",
+    }
+    if bold:
+        style["bold"] = True
+    return Fragment(style)
+
+
+def _rgb(color: dict) -> tuple[float, float, float]:
+    return color["red"], color["green"], color["blue"]
+
+
+# --- Requests ---
+
+
+class CreateSlide:
+    __slots__ = ("object_id",)
+
+    def __init__(self, object_id: str):
+        self.object_id = object_id
+
+    def __bytes__(self) -> bytes:
+        return b'{"createSlide":{"objectId":%s,"slideLayoutReference":{"predefinedLayout":"BLANK"}}}' % _dumps(
+            self.object_id
+        )
+
+
+class CreateShape:
+    __slots__ = ("object_id", "page_id", "shape_type", "size", "transform")
+
+    def __init__(self, object_id: str, page_id: str, shape_type: str, x: float, y: float, width: float, height: float):
+        self.object_id = object_id
+        self.page_id = page_id
+        self.shape_type = shape_type
+        self.size = element_size(width, height)
+        self.transform = element_transform(x, y)
+
+    def __bytes__(self) -> bytes:
+        return (
+            b'{"createShape":{"objectId":%s,"shapeType":"%s",'
+            b'"elementProperties":{"pageObjectId":%s,"size":%s,"transform":%s}}}'
+            % (
+                _dumps(self.object_id),
+                self.shape_type.encode(),
+                _dumps(self.page_id),
+                self.size.json,
+                self.transform.json,
+            )
+        )
+
+
+class CreateImage:
+    __slots__ = ("object_id", "page_id", "url", "size", "transform")
+
+    def __init__(self, object_id: str, page_id: str, url: str, x: float, y: float, width: float, height: float):
+        self.object_id = object_id
+        self.page_id = page_id
+        self.url = url
+        self.size = element_size(width, height)
+        self.transform = element_transform(x, y)
+
+    def __bytes__(self) -> bytes:
+        return (
+            b'{"createImage":{"objectId":%s,"url":%s,'
+            b'"elementProperties":{"pageObjectId":%s,"size":%s,"transform":%s}}}'
+            % (
+                _dumps(self.object_id),
+                _dumps(self.url),
+                _dumps(self.page_id),
+                self.size.json,
+                self.transform.json,
+            )
+        )
+
+
+class UpdateShapeProperties:
+    __slots__ = ("object_id", "properties")
+
+    def __init__(self, object_id: str, properties: Fragment):
+        self.object_id = object_id
+        self.properties = properties
+
+    def __bytes__(self) -> bytes:
+        return (
+            b'{"updateShapeProperties":{"objectId":%s,"shapeProperties":%s,"fields":"shapeBackgroundFill,outline"}}'
+            % (
+                _dumps(self.object_id),
+                self.properties.json,
+            )
+        )
+
+
+class InsertText:
+    __slots__ = ("object_id", "text")
+
+    def __init__(self, object_id: str, text: str):
+        self.object_id = object_id
+        self.text = text
+
+    def __bytes__(self) -> bytes:
+        return b'{"insertText":{"objectId":%s,"text":%s}}' % (_dumps(self.object_id), _dumps(self.text))
+
+
+class UpdateTextStyle:
+    __slots__ = ("object_id", "style")
+
+    def __init__(self, object_id: str, style: Fragment):
+        self.object_id = object_id
+        self.style = style
+
+    def __bytes__(self) -> bytes:
+        return b'{"updateTextStyle":{"objectId":%s,"style":%s,"fields":"*"}}' % (
+            _dumps(self.object_id),
+            self.style.json,
+        )
+
+
+class CreateParagraphBullets:
+    __slots__ = ("object_id",)
+
+    def __init__(self, object_id: str):
+        self.object_id = object_id
+
+    def __bytes__(self) -> bytes:
+        return (
+            b'{"createParagraphBullets":{"objectId":%s,'
+            b'"bulletPreset":"BULLET_DISC_CIRCLE_SQUARE","textRange":{"type":"ALL"}}}' % _dumps(self.object_id)
+        )
+
+
+Request = Union[
+    CreateSlide, CreateShape, CreateImage, UpdateShapeProperties, InsertText, UpdateTextStyle, CreateParagraphBullets
+]
+
+
+# --- Slides ---
+
+
+def content_slide(index: int, slide: dict, logo_url: Optional[str] = None) -> Iterator[Request]:
+    """Yield the requests of a content slide (orange header, title, bullet list), in the style of slide 3."""
+    slide_id = f"slide_{index}"
+    yield CreateSlide(slide_id)
+    yield CreateShape(f"{slide_id}_header", slide_id, "RECTANGLE", 0, 0, PPT_WIDTH, 80)
+    yield UpdateShapeProperties(f"{slide_id}_header", solid_shape(*_rgb(HEADER_ORANGE)))
+    if slide.get("title"):
+        yield CreateShape(f"{slide_id}_title", slide_id, "TEXT_BOX", 50, 15, 860, 50)
+        yield InsertText(f"{slide_id}_title", slide["title"])
+        yield UpdateTextStyle(f"{slide_id}_title", text_style(36, _rgb(WHITE_TEXT), bold=True))
+    if slide.get("paragraphs"):
+        yield CreateShape(f"{slide_id}_body", slide_id, "TEXT_BOX", 50, 120, 860, 360)
+        yield InsertText(f"{slide_id}_body", "\n".join(slide["paragraphs"]))
+        yield UpdateTextStyle(f"{slide_id}_body", text_style(14, _rgb(TEXT_GRAY)))
+        yield CreateParagraphBullets(f"{slide_id}_body")
+    if logo_url:
+        yield CreateImage(f"{slide_id}_logo", slide_id, logo_url, 860, 490, 80, 32)
+
+
+def deck_requests(slides: Iterable[dict], logo_url: Optional[str] = None) -> Iterator[Request]:
+    """Yield the requests of a deck of content slides, one slide at a time."""
+    for index, slide in enumerate(slides, start=1):
+        yield from content_slide(index, slide, logo_url)
+
+
+def table_slides(
+    title: str,
+    rows: Iterable[Sequence[str]],
+    header: Optional[Sequence[str]] = None,
+    weights: Optional[Sequence[float]] = None,
+    font_size: float = DEFAULT_FONT_SIZE,
+    logo_url: Optional[str] = None,
+    prefix: str = "table",
+) -> Iterator[Request]:
+    """
+    Yield the requests of a table (or a list, with a single column and no header) over as many slides as needed.
+
+    Continuation slides are titled "<title> (suite)" and repeat the header row. Rows are read as the
+    requests are consumed, so a long table streams into `json_chunks` in bounded memory.
+    """
+    left, top, width, height = TABLE_AREA
+    n_columns = len(header) if header is not None else 1
+    widths = column_widths(weights or [1.0] * n_columns, width)
+    lefts = [left + sum(widths[:i]) for i in range(n_columns)]
+    header_fill, row_fills = solid_shape(*_rgb(TEXT_GRAY)), (solid_shape(1.0, 1.0, 1.0), solid_shape(*ROW_GRAY))
+    header_style = text_style(font_size, _rgb(WHITE_TEXT), bold=True)
+    row_style = text_style(font_size, _rgb(TEXT_GRAY))
+    for page in paginate(rows, widths, height, font_size, header):
+        slide_id = f"{prefix}_{page.number}"
+        yield CreateSlide(slide_id)
+        yield CreateShape(f"{slide_id}_header", slide_id, "RECTANGLE", 0, 0, PPT_WIDTH, 80)
+        yield UpdateShapeProperties(f"{slide_id}_header", solid_shape(*_rgb(HEADER_ORANGE)))
+        yield CreateShape(f"{slide_id}_title", slide_id, "TEXT_BOX", 50, 15, 860, 50)
+        yield InsertText(f"{slide_id}_title", f"{title} (suite)" if page.continued else title)
+        yield UpdateTextStyle(f"{slide_id}_title", text_style(36, _rgb(WHITE_TEXT), bold=True))
+        for position, row in enumerate(([page.header] if page.header else []) + page.rows):
+            is_header = row.index < 0
+            for column, (cell_left, cell_width, text) in enumerate(zip(lefts, widths, row.cells)):
+                cell_id = f"{slide_id}_r{position}_c{column}"
+                yield CreateShape(cell_id, slide_id, "TEXT_BOX", cell_left, top + row.top, cell_width, row.height)
+                yield UpdateShapeProperties(cell_id, header_fill if is_header else row_fills[row.index % 2])
+                if text:
+                    yield InsertText(cell_id, text)
+                    yield UpdateTextStyle(cell_id, header_style if is_header else row_style)
+        if logo_url:
+            yield CreateImage(f"{slide_id}_logo", slide_id, logo_url, 860, 490, 80, 32)
+
+
+def content_slide_dicts(index: int, slide: dict, logo_url: Optional[str] = None) -> list[dict]:
+    """The requests of `content_slide`, built as nested dicts like the `create_slide_N` builders (for benchmarks)."""
+    slide_id = f"slide_{index}"
+
+    def properties(x, y, width, height):
+        return {
+            "pageObjectId": slide_id,
+            "size": {"width": {"magnitude": width, "unit": "PT"}, "height": {"magnitude": height, "unit": "PT"}},
+            "transform": {"scaleX": 1, "scaleY": 1, "translateX": x, "translateY": y, "unit": "PT"},
+        }
+
+    def style(font_size, color, bold=False):
+        result = {
+            "fontSize": {"magnitude": font_size, "unit": "PT"},
+            "foregroundColor": {"opaqueColor": {"rgbColor": dict(color)}},
+            "fontFamily": "Open Sans",
+        }
+        if bold:
+            result["bold"] = True
+        return result
+
+    fill = {"solidFill": {"color": {"rgbColor": dict(HEADER_ORANGE)}}}
+    requests = [
+        {"createSlide": {"objectId": slide_id, "slideLayoutReference": {"predefinedLayout": "BLANK"}}},
+        {
+            "createShape": {
+                "objectId": f"{slide_id}_header",
+                "shapeType": "RECTANGLE",
+                "elementProperties": properties(0, 0, PPT_WIDTH, 80),
+            }
+        },
+        {
+            "updateShapeProperties": {
+                "objectId": f"{slide_id}_header",
+                "shapeProperties": {"shapeBackgroundFill": fill, "outline": {"outlineFill": fill}},
+                "fields": "shapeBackgroundFill,outline",
+            }
+        },
+    ]
+    if slide.get("title"):
+        requests += [
+            {
+                "createShape": {
+                    "objectId": f"{slide_id}_title",
+                    "shapeType": "TEXT_BOX",
+                    "elementProperties": properties(50, 15, 860, 50),
+                }
+            },
+            {"insertText": {"objectId": f"{slide_id}_title", "text": slide["title"]}},
+            {
+                "updateTextStyle": {
+                    "objectId": f"{slide_id}_title",
+                    "style": style(36, WHITE_TEXT, bold=True),
+                    "fields": "*",
+                }
+            },
+        ]
+    if slide.get("paragraphs"):
+        requests += [
+            {
+                "createShape": {
+                    "objectId": f"{slide_id}_body",
+                    "shapeType": "TEXT_BOX",
+                    "elementProperties": properties(50, 120, 860, 360),
+                }
+            },
+            {"insertText": {"objectId": f"{slide_id}_body", "text": "\n".join(slide["paragraphs"])}},
+            {"updateTextStyle": {"objectId": f"{slide_id}_body", "style": style(14, TEXT_GRAY), "fields": "*"}},
+            {
+                "createParagraphBullets": {
+                    "objectId": f"{slide_id}_body",
+                    "bulletPreset": "BULLET_DISC_CIRCLE_SQUARE",
+                    "textRange": {"type": "ALL"},
+                }
+            },
+        ]
+    if logo_url:
+        requests.append(
+            {
+                "createImage": {
+                    "objectId": f"{slide_id}_logo",
+                    "url": logo_url,
+                    "elementProperties": properties(860, 490, 80, 32),
+                }
+            }
+        )
+    return requests
+
+
+# --- Serialisation ---
+
+
+def json_chunks(
+    requests: Iterable[Union[Request, dict]], max_requests: int = MAX_CHUNK_REQUESTS, max_bytes: int = MAX_CHUNK_BYTES
+) -> Iterator[bytes]:
+    """Serialise requests (objects or plain dicts) to `{"requests": [...]}` bodies of bounded size."""
+    parts: list[bytes] = []
+    size = 0
+    for request in requests:
+        data = _dumps(request) if isinstance(request, dict) else bytes(request)
+        if parts and (len(parts) >= max_requests or size + len(data) > max_bytes):
+            yield b'{"requests":[' + b",".join(parts) + b"]}"
+            parts, size = [], 0
+        parts.append(data)
+        size += len(data) + 1
+    if parts:
+        yield b'{"requests":[' + b",".join(parts) + b"]}"
+
+
+def send_chunks(service, presentation_id: str, chunks: Iterable[bytes]) -> int:
+    """Send pre-serialised batchUpdate bodies as they are produced. Returns the number of calls."""
+    calls = 0
+    for chunk in chunks:
+        request = service.presentations().batchUpdate(presentationId=presentation_id, body={})
+        # Replace the serialised placeholder body with the chunk, without decoding it back to dicts
+        request.body = chunk
+        request.body_size = len(chunk)
+        request.headers["content-length"] = str(len(chunk))
+        request.execute()
+        calls += 1
+    return calls
+
+
+# --- Benchmark ---
+
+
+def _measure(function) -> tuple[float, int, object]:
+    tracemalloc.start()
+    start = time.process_time()
+    result = function()
+    seconds = time.process_time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def benchmark(slides: list[dict], logo_url: str) -> dict:
+    """Compare the peak memory and CPU time of the dict plan and of the streamed chunks, for the same requests."""
+
+    def dict_plan():
+        # As in `create_slides.main`: the whole plan as dicts, then one serialised body
+        all_requests = []
+        for index, slide in enumerate(slides, start=1):
+            all_requests.extend(content_slide_dicts(index, slide, logo_url))
+        return [
+            _dumps({"requests": all_requests[i : i + MAX_CHUNK_REQUESTS]})
+            for i in range(0, len(all_requests), MAX_CHUNK_REQUESTS)
+        ]
+
+    def streamed():
+        # Each chunk is dropped once counted, as it would be once sent
+        digest, n_bytes = 0, 0
+        for chunk in json_chunks(deck_requests(slides, logo_url)):
+            digest = hash((digest, chunk))
+            n_bytes += len(chunk)
+        return digest, n_bytes
+
+    dict_seconds, dict_peak, dict_chunks = _measure(dict_plan)
+    stream_seconds, stream_peak, (digest, n_bytes) = _measure(streamed)
+    expected = 0
+    for chunk in dict_chunks:
+        expected = hash((expected, chunk))
+    return {
+        "slides": len(slides),
+        "bytes": n_bytes,
+        "identical": digest == expected,
+        "dict_seconds": dict_seconds,
+        "dict_peak": dict_peak,
+        "stream_seconds": stream_seconds,
+        "stream_peak": stream_peak,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build a Google Slides deck from slide content, in streamed chunks.")
+    parser.add_argument("slides", type=Path, help="slide content JSONL (from llm_slide_deck.ingest)")
+    parser.add_argument("--repeat", type=int, default=1, help="repeat the slides, to try out long decks")
+    parser.add_argument("--bench", action="store_true", help="compare with dict requests instead of sending")
+    parser.add_argument("--title", default="EDF - Deck généré")
+    args = parser.parse_args(argv)
+
+    from llm_slide_deck.html_deck import load_slides
+
+    slides = [slide for _ in range(args.repeat) for slide in load_slides(args.slides)]
+    if args.bench:
+        result = benchmark(slides, "https://drive.google.com/uc?id=logo")
+        print(
+            f"{result['slides']} slides, {result['bytes'] / 1024:.0f} KiB of JSON "
+            f"(identical output: {result['identical']})\n"
+            f"  dict plan: {result['dict_seconds'] * 1000:.0f} ms CPU, peak {result['dict_peak'] / 2**20:.1f} MiB\n"
+            f"  streamed:  {result['stream_seconds'] * 1000:.0f} ms CPU, peak {result['stream_peak'] / 2**20:.1f} MiB"
+        )
+        return 0
+
+    from create_slides import (
+        create_presentation,
+        edf_logo_path,
+        find_or_upload_image_to_drive,
+        get_drive_service,
+        get_slides_service,
+    )
+    from slides_metrics import report
+
+    slides_service = get_slides_service()
+    logo_id = find_or_upload_image_to_drive(get_drive_service(), edf_logo_path)
+    presentation_id = create_presentation(slides_service, args.title)["presentationId"]
+    logo_url = f"https://drive.google.com/uc?id={logo_id}" if logo_id else None
+    calls = send_chunks(slides_service, presentation_id, json_chunks(deck_requests(slides, logo_url)))
+    print(
+        f"Sent {len(slides)} slides in {calls} batchUpdate call(s): https://docs.google.com/presentation/d/{presentation_id}"
+    )
+    report()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
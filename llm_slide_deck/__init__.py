@@ -0,0 +1 @@
+"""Shared tooling for the LLM slide deck generators (PowerPoint, Google Slides, HTML)."""
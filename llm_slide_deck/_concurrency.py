@@ -0,0 +1,19 @@
+"""Helpers shared by the tools that run jobs on executors (mail merge, generation pipeline, credential pool)."""
+
+import concurrent.futures
+from typing import Callable, Iterable, Iterator
+
+
+def submit_bounded(
+    submit: Callable, items: Iterable, max_in_flight: int
+) -> Iterator[tuple[object, concurrent.futures.Future]]:
+    """Submit `items` lazily, keeping at most `max_in_flight` futures pending, and yield them as they complete."""
+    pending: dict[concurrent.futures.Future, object] = {}
+    for item in items:
+        if len(pending) >= max_in_flight:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+        pending[submit(item)] = item
+    for future in concurrent.futures.as_completed(list(pending)):
+        yield pending.pop(future), future
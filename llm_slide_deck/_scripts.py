@@ -0,0 +1,29 @@
+"""Load the generator scripts of `google/` and `powerpoint/` as modules."""
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+repo_path = Path(__file__).parent.parent.resolve()
+
+SCRIPTS = {
+    "google": repo_path / "google" / "create_slides.py",
+    "powerpoint": repo_path / "powerpoint" / "create_powerpoint_slides.py",
+}
+
+
+def load_script(name: str) -> ModuleType:
+    """Import a generator script by backend name ("google" or "powerpoint"), once per process."""
+    path = SCRIPTS[name]
+    module_name = f"_llm_slide_deck_{path.stem}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    # Sibling modules of the script are importable, as when it is run directly
+    if str(path.parent) not in sys.path:
+        sys.path.append(str(path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
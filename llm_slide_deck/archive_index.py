@@ -0,0 +1,513 @@
+"""
+Full-text and metadata index over the archive of generated decks.
+
+Every generated .pptx and request plan is kept. Finding the booklets that contain a clause ("article
+L311-12") should not mean opening each of them with python-pptx, so this index keeps, for every slide,
+its text, the SHA-1 of its pictures and a content fingerprint in a SQLite database with an FTS5 table:
+
+- slide XML is streamed straight out of the zip with `lxml.etree.iterparse`, and each shape is cleared
+  once read; media parts are hashed once per deck, with the same SHA-1 as the shared media store;
+- request plans (JSON lists of requests, or the JSON lines of `batchUpdate` bodies written by the dry
+  runs) are indexed from their `createSlide`, `insertText`, `createImage` and `duplicateObject`
+  requests; their pictures are identified by the SHA-1 of their URL. Other JSON files (manifests, the
+  media store index) are skipped and reported;
+- updates are incremental: a file whose size and modification time are unchanged is skipped, one whose
+  SHA-1 is unchanged only has its metadata refreshed, a copy of an indexed file reuses its rows, and
+  the decks deleted from a scanned directory are dropped;
+- the fingerprint of a slide hashes its texts and pictures in order, whatever the shape ids and
+  positions, so the same slide can be found across decks.
+
+Text is tokenised without diacritics, so "energie" matches "Énergie". A query is searched as a phrase,
+unless `--fts` passes it on in the FTS5 query syntax. Hits come newest first, so queries walk the
+indexes and stop at the limit: a few milliseconds on 20 000 decks, even for phrases found in all of them.
+
+Usage:
+    uv run python -m llm_slide_deck.archive_index build/ archive/
+    uv run python -m llm_slide_deck.archive_index -q "article L311-12"
+    uv run python -m llm_slide_deck.archive_index --image images/edf-logo.png
+"""
+
+import argparse
+import hashlib
+import json
+import posixpath
+import sqlite3
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+repo_path = Path(__file__).parent.parent.resolve()
+INDEX_PATH = repo_path / ".cache" / "archive_index.sqlite3"
+SCHEMA_VERSION = 1
+DECK_SUFFIXES = {".pptx", ".json", ".jsonl"}
+
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+SLIDE_RELTYPE = f"{NS_R}/slide"
+A_T, A_BR, A_P, A_BLIP = (f"{{{NS_A}}}{name}" for name in ("t", "br", "p", "blip"))
+P_PH = f"{{{NS_P}}}ph"
+R_EMBED = f"{{{NS_R}}}embed"
+SHAPE_TAGS = {f"{{{NS_P}}}{name}" for name in ("sp", "pic", "cxnSp", "graphicFrame")}
+TITLE_TYPES = {"title", "ctrTitle"}
+
+SCHEMA = """
+CREATE TABLE decks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    slides INTEGER NOT NULL
+);
+CREATE INDEX decks_sha1 ON decks(sha1);
+CREATE TABLE slides (
+    id INTEGER PRIMARY KEY,
+    deck_id INTEGER NOT NULL REFERENCES decks(id) ON DELETE CASCADE,
+    number INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX slides_deck ON slides(deck_id);
+CREATE INDEX slides_fingerprint ON slides(fingerprint);
+CREATE TABLE images (
+    digest TEXT NOT NULL,
+    slide_id INTEGER NOT NULL REFERENCES slides(id) ON DELETE CASCADE,
+    PRIMARY KEY (digest, slide_id)
+) WITHOUT ROWID;
+CREATE INDEX images_slide ON images(slide_id);
+CREATE VIRTUAL TABLE slide_text USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2');
+"""
+
+
+class Slide(NamedTuple):
+    number: int  # 1-based
+    title: str
+    text: str
+    images: tuple[str, ...]  # SHA-1 of the pictures, in order
+    fingerprint: str
+
+
+class Hit(NamedTuple):
+    path: str
+    slide: int
+    title: str
+    snippet: str
+    fingerprint: str
+
+
+def file_sha1(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha1").hexdigest()
+
+
+def _slide(number: int, content: list[tuple[str, str]], title: str = "") -> Slide:
+    """Build a slide from its ("t", text) and ("i", image digest) items in document order."""
+    digest = hashlib.sha1()
+    for kind, value in content:
+        digest.update(f"{kind}{value}\0".encode())
+    texts = [value for kind, value in content if kind == "t"]
+    if not title and texts:
+        title = texts[0].split("\n", 1)[0]
+    images = tuple(value for kind, value in content if kind == "i")
+    return Slide(number, title, "\n".join(texts), images, digest.hexdigest()[:16])
+
+
+# --- .pptx packages ---
+
+
+def _resolve(base: str, target: str) -> str:
+    """Part name of a relationship target, relative to the folder of the `base` part."""
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), target))
+
+
+def _relationships(package: zipfile.ZipFile, name: str) -> dict[str, tuple[str, str]]:
+    """Return the {rId: (type, part name)} of the internal relationships of a part."""
+    from lxml import etree
+
+    folder, _, base = name.rpartition("/")
+    try:
+        rels = etree.fromstring(package.read(f"{folder}/_rels/{base}.rels"))
+    except KeyError:
+        return {}
+    return {
+        rel.get("Id"): (rel.get("Type"), _resolve(name, rel.get("Target")))
+        for rel in rels.iter(f"{{{NS_RELS}}}Relationship")
+        if rel.get("TargetMode") != "External"
+    }
+
+
+def _slide_names(package: zipfile.ZipFile) -> list[str]:
+    """Return the slide part names of a package, in presentation order."""
+    from lxml import etree
+
+    rels = _relationships(package, "ppt/presentation.xml")
+    presentation = etree.fromstring(package.read("ppt/presentation.xml"))
+    return [
+        rels[sld_id.get(f"{{{NS_R}}}id")][1]
+        for sld_id in presentation.iter(f"{{{NS_P}}}sldId")
+        if rels.get(sld_id.get(f"{{{NS_R}}}id"), ("",))[0] == SLIDE_RELTYPE
+    ]
+
+
+def _read_slide(number: int, source, rels: dict, media_digest) -> Slide:
+    """Stream the text and pictures of a slide part, shape by shape."""
+    from lxml import etree
+
+    content: list[tuple[str, str]] = []
+    title, paragraphs, runs, is_title = "", [], [], False
+    for _, element in etree.iterparse(source, events=("end",)):
+        tag = element.tag
+        if tag == A_T:
+            runs.append(element.text or "")
+        elif tag == A_BR:
+            runs.append("\n")
+        elif tag == A_P:
+            paragraphs.append("".join(runs))
+            runs = []
+        elif tag == P_PH:
+            is_title = element.get("type") in TITLE_TYPES
+        elif tag == A_BLIP and (rel := rels.get(element.get(R_EMBED))):
+            content.append(("i", media_digest(rel[1])))
+        elif tag in SHAPE_TAGS:
+            text = "\n".join(paragraphs).strip()
+            if text:
+                content.append(("t", text))
+                if is_title and not title:
+                    title = " ".join(text.split())
+            paragraphs, is_title = [], False
+            # The shape is read: free it and the shapes before it
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    return _slide(number, content, title)
+
+
+def pptx_slides(path: Path) -> Iterator[Slide]:
+    """Read the slides of a .pptx package one at a time, without python-pptx."""
+    with zipfile.ZipFile(path) as package:
+        digests: dict[str, str] = {}
+
+        def media_digest(name: str) -> str:
+            if name not in digests:
+                try:
+                    with package.open(name) as f:
+                        digests[name] = hashlib.file_digest(f, "sha1").hexdigest()
+                except KeyError:  # dangling relationship
+                    digests[name] = ""
+            return digests[name]
+
+        for number, name in enumerate(_slide_names(package), 1):
+            with package.open(name) as source:
+                yield _read_slide(number, source, _relationships(package, name), media_digest)
+
+
+# --- Google Slides request plans ---
+
+
+def _requests(value, where: str) -> list[dict]:
+    """Return `value` if it is a list of requests ({"<kind>": {...}}), or raise ValueError."""
+    if not isinstance(value, list) or not all(
+        isinstance(request, dict) and len(request) == 1 and isinstance(next(iter(request.values())), dict)
+        for request in value
+    ):
+        raise ValueError(f"not a request plan: {where} is not a list of requests")
+    return value
+
+
+def _plan_requests(path: Path) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            # One batchUpdate body per line, as written by json_chunks
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    body = json.loads(line)
+                    yield from _requests(body.get("requests") if isinstance(body, dict) else None, f"line {number}")
+        else:
+            plan = json.load(f)
+            yield from _requests(plan.get("requests") if isinstance(plan, dict) else plan, "the top level")
+
+
+def plan_slides(path: Path) -> Iterator[Slide]:
+    """Read the slides created by a request plan. Raises ValueError if the file is not a plan."""
+    pages: dict[str, list[str]] = {}  # page id -> element ids, in creation order
+    element_pages: dict[str, str] = {}
+    texts: dict[str, list[str]] = {}
+    images: dict[str, str] = {}
+    for request in _plan_requests(path):
+        ((kind, body),) = request.items()
+        object_id = body.get("objectId")
+        if kind == "createSlide":
+            pages.setdefault(object_id or f"page_{len(pages)}", [])
+        elif kind.startswith("create") and "elementProperties" in body:
+            page = body["elementProperties"].get("pageObjectId")
+            if page in pages:
+                element_pages[object_id] = page
+                pages[page].append(object_id)
+                if kind == "createImage":
+                    images[object_id] = hashlib.sha1(body.get("url", "").encode()).hexdigest()
+        elif kind == "insertText" and object_id in element_pages:
+            texts.setdefault(object_id, []).append(body.get("text", ""))
+        elif kind == "duplicateObject" and object_id in element_pages:
+            copy = body.get("objectIds", {}).get(object_id)
+            if copy is not None:
+                element_pages[copy] = element_pages[object_id]
+                pages[element_pages[copy]].append(copy)
+                texts[copy] = list(texts.get(object_id, []))
+                if object_id in images:
+                    images[copy] = images[object_id]
+    for number, elements in enumerate(pages.values(), 1):
+        content = []
+        for element in elements:
+            if element in images:
+                content.append(("i", images[element]))
+            if text := "".join(texts.get(element, [])).strip():
+                content.append(("t", text))
+        yield _slide(number, content)
+
+
+def deck_slides(path: Path) -> Iterator[Slide]:
+    return pptx_slides(path) if path.suffix == ".pptx" else plan_slides(path)
+
+
+def deck_files(root: Path) -> Iterator[Path]:
+    """The .pptx files and plans of a directory tree, or `root` itself if it is a file."""
+    if root.is_file():
+        yield root
+    else:
+        yield from sorted(path for path in root.rglob("*") if path.suffix in DECK_SUFFIXES and path.is_file())
+
+
+# --- Index ---
+
+
+class ArchiveIndex:
+    """SQLite index of the slides of an archive of decks, updated incrementally."""
+
+    def __init__(self, path: Path = INDEX_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # The index is a cache of the archive: rebuild it rather than migrate it
+            with self.connection:
+                for table in ("slide_text", "images", "slides", "decks"):
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+                self.connection.executescript(SCHEMA)
+                self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # --- Updating ---
+
+    def _insert_deck(self, path: str, size: int, mtime_ns: int, sha1: str) -> int:
+        cursor = self.connection.execute(
+            "INSERT INTO decks (path, size, mtime_ns, sha1, slides) VALUES (?, ?, ?, ?, 0)",
+            (path, size, mtime_ns, sha1),
+        )
+        return cursor.lastrowid
+
+    def _insert_slides(self, deck_id: int, slides: Iterable[Slide]) -> int:
+        count = 0
+        for slide in slides:
+            slide_id = self.connection.execute(
+                "INSERT INTO slides (deck_id, number, fingerprint) VALUES (?, ?, ?)",
+                (deck_id, slide.number, slide.fingerprint),
+            ).lastrowid
+            self.connection.execute(
+                "INSERT INTO slide_text (rowid, title, body) VALUES (?, ?, ?)", (slide_id, slide.title, slide.text)
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO images (digest, slide_id) VALUES (?, ?)",
+                ((digest, slide_id) for digest in slide.images if digest),
+            )
+            count += 1
+        self.connection.execute("UPDATE decks SET slides = ? WHERE id = ?", (count, deck_id))
+        return count
+
+    def _copy_slides(self, source_id: int, deck_id: int) -> int:
+        """Give a deck the slides of an indexed deck with the same content."""
+        rows = self.connection.execute(
+            "SELECT slides.number, slides.fingerprint, slide_text.title, slide_text.body, slides.id"
+            " FROM slides JOIN slide_text ON slide_text.rowid = slides.id WHERE slides.deck_id = ?",
+            (source_id,),
+        ).fetchall()
+        slides = []
+        for number, fingerprint, title, body, slide_id in rows:
+            digests = self.connection.execute("SELECT digest FROM images WHERE slide_id = ?", (slide_id,))
+            slides.append(Slide(number, title, body, tuple(digest for (digest,) in digests), fingerprint))
+        return self._insert_slides(deck_id, slides)
+
+    def _delete_deck(self, deck_id: int):
+        self.connection.execute(
+            "DELETE FROM slide_text WHERE rowid IN (SELECT id FROM slides WHERE deck_id = ?)", (deck_id,)
+        )
+        self.connection.execute("DELETE FROM decks WHERE id = ?", (deck_id,))
+
+    def update(self, roots: Iterable[Path]) -> dict:
+        """
+        Index the decks under `roots` (files or directories) that are new or have changed, and drop the
+        decks that were deleted from the scanned directories. Returns counts of what was done.
+        """
+        from lxml import etree
+
+        stats = {"indexed": 0, "copied": 0, "touched": 0, "unchanged": 0, "removed": 0, "slides": 0, "errors": []}
+        known = {
+            path: (deck_id, size, mtime_ns, sha1)
+            for deck_id, path, size, mtime_ns, sha1 in self.connection.execute(
+                "SELECT id, path, size, mtime_ns, sha1 FROM decks"
+            )
+        }
+        seen = set()
+        for root in roots:
+            for file in deck_files(root):
+                path = str(file.resolve())
+                seen.add(path)
+                stat = file.stat()
+                row = known.get(path)
+                if row is not None and row[1:3] == (stat.st_size, stat.st_mtime_ns):
+                    stats["unchanged"] += 1
+                    continue
+                sha1 = file_sha1(file)
+                if row is not None and row[3] == sha1:
+                    with self.connection:
+                        self.connection.execute(
+                            "UPDATE decks SET size = ?, mtime_ns = ? WHERE id = ?",
+                            (stat.st_size, stat.st_mtime_ns, row[0]),
+                        )
+                    stats["touched"] += 1
+                    continue
+                same = self.connection.execute("SELECT id FROM decks WHERE sha1 = ? LIMIT 1", (sha1,)).fetchone()
+                try:
+                    # One transaction per deck: a deck is indexed entirely or not at all
+                    with self.connection:
+                        if row is not None:
+                            self._delete_deck(row[0])
+                        deck_id = self._insert_deck(path, stat.st_size, stat.st_mtime_ns, sha1)
+                        if same is not None:
+                            stats["slides"] += self._copy_slides(same[0], deck_id)
+                            stats["copied"] += 1
+                        else:
+                            stats["slides"] += self._insert_slides(deck_id, deck_slides(file))
+                            stats["indexed"] += 1
+                except (OSError, ValueError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError) as error:
+                    # XMLSyntaxError (malformed slide XML) derives from SyntaxError, not ValueError
+                    stats["errors"].append(f"{file}: {error}")
+        for root in roots:
+            if root.is_dir():
+                prefix = str(root.resolve()) + "/"
+                deleted = [row[0] for path, row in known.items() if path.startswith(prefix) and path not in seen]
+                with self.connection:
+                    for deck_id in deleted:
+                        self._delete_deck(deck_id)
+                stats["removed"] += len(deleted)
+        return stats
+
+    # --- Queries ---
+
+    def search(self, query: str, limit: int = 20, fts: bool = False, ranked: bool = False) -> list[Hit]:
+        """
+        Slides matching `query`, a phrase unless `fts` is True. Hits come newest first, which stops the
+        search after `limit` hits; `ranked` orders them by relevance instead, at the cost of scoring every
+        match (a phrase found in every deck of the archive takes a hundred times longer).
+        """
+        match = query if fts else '"' + query.replace('"', '""') + '"'
+        order = "rank" if ranked else "slide_text.rowid DESC"
+        rows = self.connection.execute(
+            "SELECT decks.path, slides.number, slide_text.title,"
+            " snippet(slide_text, -1, '[', ']', '…', 12), slides.fingerprint"
+            " FROM slide_text JOIN slides ON slides.id = slide_text.rowid JOIN decks ON decks.id = slides.deck_id"
+            f" WHERE slide_text MATCH ? ORDER BY {order} LIMIT ?",
+            (match, limit),
+        )
+        return [Hit(*row) for row in rows]
+
+    def _slides(self, source: str, condition: str, order: str, value: str, limit: int) -> list[Hit]:
+        # Newest first, in the order of the index used by `condition`, so the query stops after `limit` slides
+        rows = self.connection.execute(
+            "SELECT decks.path, slides.number, slide_text.title, '', slides.fingerprint"
+            f" FROM {source} JOIN decks ON decks.id = slides.deck_id JOIN slide_text ON slide_text.rowid = slides.id"
+            f" WHERE {condition} ORDER BY {order} DESC LIMIT ?",
+            (value, limit),
+        )
+        return [Hit(*row) for row in rows]
+
+    def slides_with_image(self, digest: str, limit: int = 20) -> list[Hit]:
+        source = "images JOIN slides ON slides.id = images.slide_id"
+        return self._slides(source, "images.digest = ?", "images.slide_id", digest, limit)
+
+    def slides_with_fingerprint(self, fingerprint: str, limit: int = 20) -> list[Hit]:
+        return self._slides("slides", "slides.fingerprint = ?", "slides.id", fingerprint, limit)
+
+    def counts(self) -> tuple[int, int]:
+        return self.connection.execute("SELECT count(*), coalesce(sum(slides), 0) FROM decks").fetchone()
+
+    def close(self):
+        self.connection.close()
+
+
+def _image_digest(image: str) -> str:
+    path = Path(image)
+    return file_sha1(path) if path.is_file() else image
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Index the archive of generated decks and search their slides.")
+    parser.add_argument("paths", type=Path, nargs="*", help=".pptx files, request plans or directories to index")
+    parser.add_argument("-q", "--query", default=None, help="search the slides for this phrase")
+    parser.add_argument("--fts", action="store_true", help="pass the query on in the FTS5 query syntax")
+    parser.add_argument("--rank", action="store_true", help="order the hits by relevance rather than newest first")
+    parser.add_argument("--image", default=None, help="find the slides showing this image (file or SHA-1)")
+    parser.add_argument("--fingerprint", default=None, help="find the slides with this fingerprint")
+    parser.add_argument("-n", "--limit", type=int, default=20)
+    parser.add_argument("--index", type=Path, default=INDEX_PATH, help="SQLite index file")
+    args = parser.parse_args(argv)
+    if not (args.paths or args.query or args.image or args.fingerprint):
+        parser.error("give paths to index and/or a query")
+
+    index = ArchiveIndex(args.index)
+    try:
+        if args.paths:
+            start = time.perf_counter()
+            stats = index.update(args.paths)
+            elapsed = time.perf_counter() - start
+            for error in stats["errors"]:
+                print(f"  skipped {error}", file=sys.stderr)
+            decks, slides = index.counts()
+            print(
+                f"{stats['indexed']} deck(s) indexed ({stats['slides']} slides), {stats['copied']} copied,"
+                f" {stats['touched']} touched, {stats['unchanged']} unchanged, {stats['removed']} removed,"
+                f" {len(stats['errors'])} skipped in {elapsed:.2f}s; {decks} deck(s), {slides} slide(s) in the index."
+            )
+        for label, search in (
+            (args.query, lambda: index.search(args.query, args.limit, args.fts, args.rank)),
+            (args.image, lambda: index.slides_with_image(_image_digest(args.image), args.limit)),
+            (args.fingerprint, lambda: index.slides_with_fingerprint(args.fingerprint, args.limit)),
+        ):
+            if label is None:
+                continue
+            start = time.perf_counter()
+            try:
+                hits = search()
+            except sqlite3.OperationalError as error:  # e.g. a malformed --fts query
+                print(f"Search for {label!r} failed: {error}", file=sys.stderr)
+                return 1
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for hit in hits:
+                snippet = " ".join(hit.snippet.split())
+                print(
+                    f"{hit.path}:slide {hit.slide} [{hit.fingerprint}] {hit.title}"
+                    + (f": {snippet}" if snippet else "")
+                )
+            print(f"{len(hits)} slide(s) for {label!r} in {elapsed_ms:.1f} ms.")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
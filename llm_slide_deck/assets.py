@@ -0,0 +1,83 @@
+"""
+Pre-rendered image assets for shape picture fills.
+
+Neither python-pptx nor the Slides API can clip a picture to an arbitrary shape, so the builders used
+to place the full source image behind a transparent shape. Instead, `crop_image` renders the picture
+already masked to the target shape (circle or rounded rectangle) as an alpha PNG at the target size.
+
+Crops are cached on disk, keyed by the hash of the source file, the mask shape and the pixel size,
+so the PowerPoint and Google Slides builders share the same small asset and only render it once.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageDraw, ImageOps
+
+repo_path = Path(__file__).parent.parent.resolve()
+CACHE_DIR = repo_path / ".cache" / "assets"
+
+SHAPES = ("circle", "rounded_rect")
+DEFAULT_DPI = 150
+# Masks are drawn at this multiple of the target size and downsampled, for anti-aliased edges
+SUPERSAMPLING = 4
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 16) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def target_pixels(width_pt: float, height_pt: float, dpi: int = DEFAULT_DPI) -> tuple[int, int]:
+    """Return the pixel size of an image displayed at `width_pt` x `height_pt` points."""
+    return round(width_pt / 72 * dpi), round(height_pt / 72 * dpi)
+
+
+def _mask(shape: str, size: tuple[int, int], corner_ratio: float) -> Image.Image:
+    width, height = size[0] * SUPERSAMPLING, size[1] * SUPERSAMPLING
+    mask = Image.new("L", (width, height), 0)
+    draw = ImageDraw.Draw(mask)
+    if shape == "circle":
+        draw.ellipse((0, 0, width - 1, height - 1), fill=255)
+    else:
+        draw.rounded_rectangle((0, 0, width - 1, height - 1), radius=corner_ratio * min(width, height), fill=255)
+    return mask.resize(size, Image.Resampling.LANCZOS)
+
+
+def crop_image(
+    source: Path, shape: str, size: tuple[int, int], corner_ratio: float = 0.15, colors: Optional[int] = 256
+) -> Path:
+    """
+    Return the path of `source` cropped to `size` pixels and masked to `shape`, rendering it if needed.
+
+    The image is scaled to cover `size` and centre-cropped before masking. `corner_ratio` sets the
+    corner radius of rounded rectangles relative to their smaller side. The PNG is quantized to a
+    `colors` palette with alpha, which keeps photos about as small as their JPEG source;
+    pass `colors=None` to keep full RGBA.
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown mask shape {shape!r}, expected one of {SHAPES}")
+    suffix = f"-{corner_ratio:g}" if shape == "rounded_rect" else ""
+    palette = f"-p{colors}" if colors else ""
+    name = f"{source.stem}-{file_hash(source)[:16]}-{shape}{suffix}-{size[0]}x{size[1]}{palette}.png"
+    cached = CACHE_DIR / name
+    if cached.exists():
+        return cached
+
+    with Image.open(source) as image:
+        fitted = ImageOps.fit(ImageOps.exif_transpose(image).convert("RGBA"), size, Image.Resampling.LANCZOS)
+    fitted.putalpha(_mask(shape, size, corner_ratio))
+    if colors:
+        fitted = fitted.quantize(colors=colors, method=Image.Quantize.FASTOCTREE)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary name first so that concurrent builds never read a partial file
+    tmp_path = cached.with_suffix(f".{os.getpid()}.tmp")
+    fitted.save(tmp_path, format="PNG", optimize=True)
+    tmp_path.replace(cached)
+    return cached
@@ -0,0 +1,204 @@
+"""
+`llm-slide-deck` command line: one entry point for every deck backend and tool.
+
+Subcommands only import their backend (python-pptx, the Google API client, Pillow, NumPy...) once they
+run, so `--help` and the dispatch itself only cost the interpreter start-up and `argparse`.
+
+    llm-slide-deck pptx [-o deck.pptx] [--trace build/trace]
+    llm-slide-deck google [--dry-run [-o requests.json]]
+    llm-slide-deck html [--kind single|responsive|lazy] [tool options...]
+    llm-slide-deck bench [--build]
+
+`lint`, `merge`, `render`, `ingest`, `generate`, `serve`, `shards`, `batch`, `table` and `archive` run the
+matching `llm_slide_deck` modules, with their own options.
+
+`bench` runs each subcommand in a fresh interpreter under `-X importtime` and reports its start-up
+time against the budget, with the slowest top-level imports.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+# Subcommands forwarding their arguments to the `main(argv)` of a module
+TOOLS = {
+    "lint": ("llm_slide_deck.lint", "Lint slide layouts for overlaps and overflowing text."),
+    "merge": ("llm_slide_deck.merge", "Generate one personalised deck per recipient."),
+    "render": ("llm_slide_deck.render", "Render PNG previews of a .pptx deck."),
+    "ingest": ("llm_slide_deck.ingest", "Extract slide content from the PDF booklet."),
+    "generate": ("llm_slide_deck.pipeline", "Run batched LLM generation jobs."),
+    "serve": ("llm_slide_deck.service", "Serve deck generation jobs from warm workers."),
+    "shards": ("llm_slide_deck.pptx_shards", "Build a long content deck in parallel slide shards."),
+    "batch": ("llm_slide_deck.save_pipeline", "Build and save a batch of decks in a pipeline."),
+    "table": ("llm_slide_deck.pagination", "Lay out a long table or list over continuation slides."),
+    "archive": ("llm_slide_deck.archive_index", "Index the archive of generated decks and search their slides."),
+}
+HTML_KINDS = {
+    "single": "llm_slide_deck.html_build",
+    "responsive": "llm_slide_deck.responsive",
+    "lazy": "llm_slide_deck.html_deck",
+}
+# Start-up budget of the commands that do not need the Google API client
+STARTUP_BUDGET_MS = 150
+BENCH_COMMANDS = [["--help"], ["pptx", "--help"], ["html", "--help"], ["bench", "--help"], ["google", "--help"]]
+
+
+def _run_module(module_name: str, argv: list[str]) -> int:
+    import importlib
+
+    return importlib.import_module(module_name).main(argv) or 0
+
+
+# --- pptx ---
+
+
+def run_pptx(args: argparse.Namespace) -> int:
+    from llm_slide_deck._scripts import load_script
+
+    powerpoint = load_script("powerpoint")
+    output = args.output or powerpoint.powerpoint_path / "EDF_Presentation_powerpoint_slides.pptx"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if args.trace is None:
+        powerpoint.main(output)
+        return 0
+
+    from llm_slide_deck.instrument import BuildTracer
+
+    with BuildTracer() as tracer:
+        powerpoint.main(output)
+    summary_path, chrome_path = tracer.write(args.trace)
+    print(f"Build trace written to {summary_path} and {chrome_path}.")
+    return 0
+
+
+# --- google ---
+
+
+def run_google(args: argparse.Namespace) -> int:
+    from llm_slide_deck._scripts import load_script
+
+    google = load_script("google")
+    if not args.dry_run:
+        google.main()
+        return 0
+
+    import json
+
+    from llm_slide_deck.lint import lint_requests
+
+    # Image IDs are placeholders: nothing is uploaded nor created
+    uploaded_images = {key: f"dry-run-{key}" for key in ("edf_logo", "slide1_bg", "slide3_acteurs")}
+    requests = google.create_slide_1("dry_run_slide_1", uploaded_images)
+    for create_slide in (google.create_slide_2, google.create_slide_3, google.create_slide_4, google.create_slide_5):
+        requests.extend(create_slide(uploaded_images))
+    issues = list(lint_requests(requests))
+    print(f"{len(requests)} request(s) generated, {len(issues)} layout issue(s).")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(requests, ensure_ascii=False, indent=1), encoding="utf-8")
+        print(f"Requests written to {args.output}")
+    return 0
+
+
+# --- bench ---
+
+
+def startup_report(argv: list[str]) -> tuple[float, list[tuple[int, str]], int]:
+    """
+    Run `llm-slide-deck argv` in a fresh interpreter under `-X importtime`.
+
+    Returns the wall time in milliseconds, the (cumulative microseconds, module) of its top-level imports
+    and the exit code.
+    """
+    import subprocess
+    import time
+
+    entry_point = "from llm_slide_deck.cli import main; raise SystemExit(main())"
+    command = [sys.executable, "-X", "importtime", "-c", entry_point, *argv]
+    start = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # Nested imports are indented under the module importing them
+        if not name[1:].startswith(" "):
+            imports.append((int(cumulative), name.strip()))
+    return wall_ms, sorted(imports, reverse=True), result.returncode
+
+
+def run_bench(args: argparse.Namespace) -> int:
+    import tempfile
+
+    commands = list(BENCH_COMMANDS)
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.build:
+            commands += [["pptx", "-o", f"{tmp}/deck.pptx"], ["html", "--kind", "responsive", "-o", f"{tmp}/site"]]
+        n_failed = 0
+        for argv in commands:
+            runs = [startup_report(argv) for _ in range(args.repeat)]
+            # Any failing run fails the command, even if another run succeeded faster
+            code = next((code for _, _, code in runs if code != 0), 0)
+            # Keep the best of a few runs, to measure a warm file-system cache rather than noise
+            wall_ms, imports, _ = min(runs, key=lambda r: r[0])
+            budget = "" if argv[0] == "google" or "--help" not in argv else f"(budget {STARTUP_BUDGET_MS} ms)"
+            over_budget = budget and wall_ms > STARTUP_BUDGET_MS
+            n_failed += bool(over_budget or code)
+            status = f"  exit code {code}" if code else "  OVER BUDGET" if over_budget else ""
+            print(f"llm-slide-deck {' '.join(argv):<40} {wall_ms:7.0f} ms {budget}{status}")
+            for cumulative, name in imports[: args.top]:
+                print(f"    {cumulative / 1000:7.1f} ms  {name}")
+    return 1 if n_failed else 0
+
+
+# --- CLI ---
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="llm-slide-deck", description="Generate the EDF slide decks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pptx = subparsers.add_parser("pptx", help="Build the PowerPoint deck.")
+    pptx.add_argument("-o", "--output", type=Path, default=None)
+    pptx.add_argument("--trace", type=Path, default=None, help="write a per-slide build trace to this directory")
+    pptx.set_defaults(run=run_pptx)
+
+    google = subparsers.add_parser("google", help="Build the Google Slides deck.")
+    google.add_argument("--dry-run", action="store_true", help="generate and lint the requests without any API call")
+    google.add_argument("-o", "--output", type=Path, default=None, help="with --dry-run, write the requests as JSON")
+    google.set_defaults(run=run_google)
+
+    html = subparsers.add_parser(
+        "html", help="Build the web decks.", description="Other options are passed to the selected build tool."
+    )
+    html.add_argument(
+        "--kind", choices=HTML_KINDS, default="single", help="self-contained page, responsive site or lazy deck"
+    )
+    html.set_defaults(run=lambda args: _run_module(HTML_KINDS[args.kind], args.extra))
+
+    bench = subparsers.add_parser("bench", help="Report the start-up time and imports of each subcommand.")
+    bench.add_argument("--build", action="store_true", help="also time full pptx and html builds")
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--top", type=int, default=5, help="number of top-level imports to show")
+    bench.set_defaults(run=run_bench)
+
+    for name, (module_name, help_text) in TOOLS.items():
+        tool = subparsers.add_parser(name, help=help_text, add_help=False)
+        tool.set_defaults(run=lambda args, module_name=module_name: _run_module(module_name, args.extra))
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command not in TOOLS and args.command != "html":
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.extra = extra
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
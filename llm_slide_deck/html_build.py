@@ -0,0 +1,410 @@
+"""
+Self-contained build of `raw/presentation.html`: self-hosted fonts, critical CSS and optimised images.
+
+The hand-written page pulls Open Sans from Google Fonts with a render-blocking `@import`, which also
+fails offline. This build step:
+
+- subsets each Open Sans face to the characters actually used by the page, as WOFF2 (faces come from
+  the Google Fonts CSS API, cached under `.cache/fonts`, or from local TTF files with `--font-dir`);
+  without network access nor `--font-dir`, the page keeps its fallback fonts (Arial, sans-serif),
+- splits the stylesheet into the rules needed by the first slide, inlined in `<head>`, and the rest,
+  moved to the end of `<body>` so it no longer blocks the first paint,
+- re-encodes the referenced images as WebP scaled to their display size.
+
+Only the critical subset is in `<head>`: font faces restricted (with `unicode-range`) to the glyphs of
+the first slide, and a tiny blurred placeholder of the first slide's background. The faces for the
+other glyphs and the full-size images follow the content at the end of `<body>`. The result is a single
+HTML file with no external request; with `--external-assets`, the non-critical fonts and images are
+written next to the page instead, and preloaded from `<head>`.
+
+Usage:
+    uv run python -m llm_slide_deck.html_build raw/presentation.html -o build/presentation.html
+"""
+
+import argparse
+import base64
+import hashlib
+import html
+import io
+import re
+import urllib.error
+import urllib.request
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Optional
+
+from PIL import Image
+
+repo_path = Path(__file__).parent.parent.resolve()
+CACHE_DIR = repo_path / ".cache" / "fonts"
+
+# A recent browser user agent makes the Google Fonts CSS API serve WOFF2 files
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+IMPORT_RULE = re.compile(r"@import\s+url\(['\"]?(https://fonts\.googleapis\.com/[^'\")]+)['\"]?\)\s*;")
+FONT_FACE = re.compile(r"@font-face\s*{([^}]*)}")
+STYLE_BLOCK = re.compile(r"<style>(.*?)</style>", re.S)
+CSS_URL = re.compile(r"url\(['\"]?(?!data:|https?:)([^'\")]+)['\"]?\)")
+IMG_SRC = re.compile(r"(<img\b[^>]*\bsrc=)\"(?!data:|https?:)([^\"]+)\"")
+LOCAL_WEIGHTS = {"Regular": 400, "Medium": 500, "SemiBold": 600, "Bold": 700, "ExtraBold": 800}
+# Largest width at which the page displays images (the deck is at most 1024 px wide), doubled for HiDPI
+MAX_IMAGE_WIDTH = 2048
+# Width of the blurred placeholders inlined in <head> in place of the first slide's background images
+PLACEHOLDER_WIDTH = 32
+
+
+def fetch(url: str) -> bytes:
+    """Download `url` once, caching the response on disk."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cached = CACHE_DIR / hashlib.sha1(url.encode()).hexdigest()
+    if not cached.exists():
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            cached.write_bytes(response.read())
+    return cached.read_bytes()
+
+
+# --- Fonts ---
+
+
+def _parse_unicode_range(value: str) -> Optional[set[int]]:
+    codepoints = set()
+    for part in value.split(","):
+        part = part.strip().upper().removeprefix("U+")
+        if "-" in part:
+            start, end = part.split("-")
+            codepoints.update(range(int(start, 16), int(end, 16) + 1))
+        elif "?" in part:
+            codepoints.update(range(int(part.replace("?", "0"), 16), int(part.replace("?", "F"), 16) + 1))
+        elif part:
+            codepoints.add(int(part, 16))
+    return codepoints or None
+
+
+def google_font_faces(css_url: str) -> list[dict]:
+    """Return the faces (family, weight, style, unicode range, font bytes) listed by a Google Fonts CSS URL."""
+    css = fetch(css_url).decode()
+    faces = []
+    for block in FONT_FACE.findall(css):
+        properties = dict(
+            (key.strip(), value.strip()) for key, _, value in (line.partition(":") for line in block.split(";"))
+        )
+        src = re.search(r"url\(([^)]+)\)", properties["src"]).group(1)
+        faces.append(
+            {
+                "family": properties["font-family"].strip("'\""),
+                "weight": properties.get("font-weight", "400"),
+                "style": properties.get("font-style", "normal"),
+                "unicode_range": properties.get("unicode-range"),
+                "data": fetch(src),
+            }
+        )
+    return faces
+
+
+def local_font_faces(font_dir: Path, family: str) -> list[dict]:
+    """Return faces from local files named like `OpenSans-SemiBold.ttf`."""
+    faces = []
+    for path in sorted(font_dir.glob("*.[ot]tf")):
+        weight_name = path.stem.rpartition("-")[2]
+        if weight_name in LOCAL_WEIGHTS:
+            faces.append(
+                {
+                    "family": family,
+                    "weight": str(LOCAL_WEIGHTS[weight_name]),
+                    "style": "normal",
+                    "unicode_range": None,
+                    "data": path.read_bytes(),
+                }
+            )
+    return faces
+
+
+def subset_font(data: bytes, codepoints: set[int]) -> bytes:
+    """Subset a font to `codepoints` and return it as WOFF2."""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(io.BytesIO(data))
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.desubroutinize = True
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    output = io.BytesIO()
+    font.flavor = "woff2"
+    font.save(output)
+    return output.getvalue()
+
+
+def used_codepoints(text: str) -> set[int]:
+    """Characters of `text` in both cases (text-transform may change them), with the spaces."""
+    return {ord(c) for c in text} | {ord(c.upper()) for c in text} | {ord(c.lower()) for c in text} | {0x20, 0xA0}
+
+
+def _format_unicode_range(codepoints: set[int]) -> str:
+    ranges: list[list[int]] = []
+    for codepoint in sorted(codepoints):
+        if ranges and codepoint == ranges[-1][1] + 1:
+            ranges[-1][1] = codepoint
+        else:
+            ranges.append([codepoint, codepoint])
+    return ", ".join(f"U+{start:X}" if start == end else f"U+{start:X}-{end:X}" for start, end in ranges)
+
+
+def data_uri(data: bytes, mime: str) -> str:
+    return f"data:{mime};base64," + base64.b64encode(data).decode()
+
+
+def font_face_css(faces: list[dict], codepoints: set[int], store: Optional[Callable[[bytes, str], str]] = None) -> str:
+    """
+    Return `@font-face` rules for the faces, subset to `codepoints` and limited to them with `unicode-range`.
+
+    Fonts are inlined as data URIs, or saved by `store(data, suffix)`, which returns their URL.
+    """
+    rules = []
+    for face in faces:
+        face_range = _parse_unicode_range(face["unicode_range"]) if face["unicode_range"] else None
+        face_codepoints = codepoints & face_range if face_range else codepoints
+        if not face_codepoints:
+            continue
+        woff2 = subset_font(face["data"], face_codepoints)
+        url = store(woff2, ".woff2") if store else data_uri(woff2, "font/woff2")
+        rules.append(
+            f"@font-face {{ font-family: '{face['family']}'; font-style: {face['style']}; "
+            f"font-weight: {face['weight']}; font-display: swap; "
+            f"src: url({url}) format('woff2'); unicode-range: {_format_unicode_range(face_codepoints)}; }}"
+        )
+    return "\n".join(rules)
+
+
+# --- Critical CSS ---
+
+
+class _FirstSlideParser(HTMLParser):
+    """Collect the text of the page and the tags, classes and ids rendered up to the end of the first slide."""
+
+    def __init__(self):
+        super().__init__()
+        self.text: list[str] = []
+        self.first_text: list[str] = []  # text rendered up to the end of the first slide
+        self.tags: set[str] = {"html", "body"}
+        self.classes: set[str] = set()
+        self.ids: set[str] = set()
+        self._depth = 0  # depth inside the first <section>, -1 once it is closed
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        self._in_style = tag in ("style", "script")
+        if self._depth < 0:
+            return
+        if tag == "section":
+            self._depth += 1
+        attributes = dict(attrs)
+        self.tags.add(tag)
+        self.classes.update((attributes.get("class") or "").split())
+        if attributes.get("id"):
+            self.ids.add(attributes["id"])
+        if attributes.get("alt"):
+            self.text.append(attributes["alt"])
+            self.first_text.append(attributes["alt"])
+
+    def handle_endtag(self, tag):
+        self._in_style = False
+        if tag == "section" and self._depth > 0:
+            self._depth -= 1
+            if self._depth == 0:
+                self._depth = -1
+
+    def handle_data(self, data):
+        if not self._in_style:
+            self.text.append(data)
+            if self._depth >= 0:
+                self.first_text.append(data)
+
+
+def _split_rules(css: str) -> list[str]:
+    """Split a stylesheet into its top-level rules (at-rule blocks are kept whole)."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    rules, depth, start = [], 0, 0
+    for i, char in enumerate(css):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start : i + 1].strip())
+                start = i + 1
+        elif char == ";" and depth == 0:
+            rules.append(css[start : i + 1].strip())
+            start = i + 1
+    return [rule for rule in rules if rule]
+
+
+def _selector_matches(selector: str, page: _FirstSlideParser) -> bool:
+    selector = re.sub(r"::?[\w-]+(\([^)]*\))?", "", selector)  # pseudo-classes and elements
+    for compound in re.split(r"[\s>+~]+", selector.strip()):
+        if not compound or compound == "*":
+            continue
+        tag = re.match(r"^[a-zA-Z][\w-]*", compound)
+        if tag and tag.group(0).lower() not in page.tags:
+            return False
+        if any(name not in page.classes for name in re.findall(r"\.([\w-]+)", compound)):
+            return False
+        if any(name not in page.ids for name in re.findall(r"#([\w-]+)", compound)):
+            return False
+    return True
+
+
+def split_critical_css(css: str, page: _FirstSlideParser) -> tuple[str, str]:
+    """Return the (critical, deferred) parts of a stylesheet for the first slide."""
+    critical, deferred = [], []
+    for rule in _split_rules(css):
+        if rule.startswith("@"):
+            # Media queries and other at-rules go with the deferred rules, except charset-like statements
+            (critical if rule.endswith(";") else deferred).append(rule)
+            continue
+        selectors = rule.split("{", 1)[0].split(",")
+        (critical if any(_selector_matches(s, page) for s in selectors) else deferred).append(rule)
+    return "\n".join(critical), "\n".join(deferred)
+
+
+# --- Images ---
+
+
+def optimised_webp(path: Path, max_width: int = MAX_IMAGE_WIDTH, placeholder: bool = False) -> bytes:
+    """
+    Return `path` re-encoded as WebP (lossless if it has transparency), scaled down to `max_width`.
+
+    A placeholder is a small, low-quality version, which the browser stretches (and blurs) to the box.
+    """
+    with Image.open(path) as image:
+        has_alpha = image.mode in ("RGBA", "LA", "P")
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        if image.width > max_width:
+            image = image.resize((max_width, round(image.height * max_width / image.width)), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="WEBP", lossless=has_alpha and not placeholder, quality=30 if placeholder else 80)
+    return output.getvalue()
+
+
+def optimised_data_uri(path: Path, max_width: int = MAX_IMAGE_WIDTH) -> str:
+    return data_uri(optimised_webp(path, max_width), "image/webp")
+
+
+def _font_faces(import_url: Optional[str], font_dir: Optional[Path]) -> list[dict]:
+    """The Open Sans faces to self-host, or none (the page then uses its fallback fonts)."""
+    if font_dir is not None:
+        return local_font_faces(font_dir, "Open Sans")
+    if import_url is None:
+        return []
+    try:
+        return google_font_faces(import_url)
+    except (urllib.error.URLError, OSError) as error:
+        print(
+            f"Warning: could not download the Open Sans faces of {import_url} ({error}); the page falls back "
+            "to Arial, sans-serif. To self-host the fonts offline, pass --font-dir with OpenSans-Regular.ttf, "
+            "OpenSans-SemiBold.ttf and OpenSans-Bold.ttf."
+        )
+        return []
+
+
+def build(source: Path, font_dir: Optional[Path] = None, assets_dir: Optional[Path] = None) -> str:
+    """
+    Return the optimised version of the HTML page `source`.
+
+    Non-critical fonts and images are inlined at the end of the page, or written to `assets_dir` (a
+    directory next to the output page). Of those files, only the full images of the first slide's
+    backgrounds are preloaded; the others are fetched when the styles at the end of the page apply.
+    """
+    page_html = source.read_text(encoding="utf-8")
+    match = STYLE_BLOCK.search(page_html)
+    css = match.group(1) if match else ""
+
+    page = _FirstSlideParser()
+    page.feed(page_html)
+    generated_text = "".join(re.findall(r"content:\s*['\"]([^'\"]*)['\"]", css))
+    used = used_codepoints(html.unescape("".join(page.text)) + generated_text)
+    first_slide = used_codepoints(html.unescape("".join(page.first_text)) + generated_text) & used
+
+    preloads: list[str] = []
+
+    def store(data: bytes, suffix: str, preload: bool = False) -> str:
+        assets_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{hashlib.sha1(data).hexdigest()[:16]}{suffix}"
+        (assets_dir / name).write_bytes(data)
+        url = f"{assets_dir.name}/{name}"
+        if preload:
+            preloads.append(f'<link rel="preload" href="{url}" as="image">')
+        return url
+
+    import_url = IMPORT_RULE.search(css)
+    css = IMPORT_RULE.sub("", css)
+    faces = _font_faces(html.unescape(import_url.group(1)) if import_url else None, font_dir)
+    # The glyphs of the first slide block its first paint; the faces of the others come after the content
+    critical_fonts = font_face_css(faces, first_slide)
+    deferred_fonts = font_face_css(faces, used - first_slide, store if assets_dir else None)
+
+    images: dict[str, str] = {}
+
+    def image(reference: str, placeholder: bool = False, above_the_fold: bool = False) -> str:
+        key = f"{reference}#placeholder" if placeholder else reference
+        if key not in images:
+            path = (source.parent / reference).resolve()
+            if placeholder:
+                images[key] = data_uri(optimised_webp(path, PLACEHOLDER_WIDTH, placeholder=True), "image/webp")
+            elif assets_dir is not None:
+                images[key] = store(optimised_webp(path), ".webp", preload=above_the_fold)
+            else:
+                images[key] = optimised_data_uri(path)
+        return images[key]
+
+    critical, deferred = split_critical_css(css, page)
+    # Critical rules get placeholder images, and are repeated with the full images after the content
+    full_size = [rule for rule in _split_rules(critical) if CSS_URL.search(rule)]
+    critical = CSS_URL.sub(lambda m: f"url('{image(m.group(1), placeholder=True)}')", critical)
+    full_size = [CSS_URL.sub(lambda m: f"url('{image(m.group(1), above_the_fold=True)}')", rule) for rule in full_size]
+    deferred = "\n".join([CSS_URL.sub(lambda m: f"url('{image(m.group(1))}')", deferred), *full_size])
+    page_html = IMG_SRC.sub(lambda m: f'{m.group(1)}"{image(m.group(2))}"', page_html)
+
+    head = "\n".join([*preloads, f"<style>\n{critical_fonts}\n{critical}\n</style>"])
+    # Searched again: rewriting the image sources may have moved the style block
+    match = STYLE_BLOCK.search(page_html)
+    if match:
+        page_html = page_html[: match.start()] + head + page_html[match.end() :]
+    else:
+        page_html = page_html.replace("</head>", f"{head}\n</head>", 1)
+    # Styles at the end of the body do not block the first paint of the content above them
+    return page_html.replace("</body>", f"<style>\n{deferred_fonts}\n{deferred}\n</style>\n</body>", 1)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build a self-contained version of the raw HTML presentation.")
+    parser.add_argument("source", type=Path, nargs="?", default=repo_path / "raw" / "presentation.html")
+    parser.add_argument("-o", "--output", type=Path, default=Path("build/presentation.html"))
+    parser.add_argument("--font-dir", type=Path, help="local Open Sans TTF files instead of Google Fonts")
+    parser.add_argument(
+        "--external-assets", action="store_true", help="write the non-critical fonts and images next to the page"
+    )
+    args = parser.parse_args(argv)
+
+    assets_dir = args.output.parent / f"{args.output.stem}_assets" if args.external_assets else None
+    output = build(args.source, args.font_dir, assets_dir)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(output, encoding="utf-8")
+    source_html = args.source.read_text(encoding="utf-8")
+    external = len(set(CSS_URL.findall(source_html) + [m[1] for m in IMG_SRC.findall(source_html)]))
+    external += len(IMPORT_RULE.findall(source_html))
+    match = STYLE_BLOCK.search(output)
+    head_style = match.group(1) if match else ""
+    assets = f"non-critical assets in {assets_dir}" if assets_dir else "no external request"
+    print(
+        f"Wrote {args.output} ({len(output.encode()) / 1024:.0f} KiB, {len(head_style.encode()) / 1024:.0f} KiB of"
+        f" critical styles and fonts in <head>, {assets}; the source page made {external} blocking or image"
+        " request(s) plus the font files)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
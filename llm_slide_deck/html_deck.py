@@ -0,0 +1,245 @@
+"""
+Lazy-loading HTML deck for long presentations, emitted from slide content.
+
+`raw/presentation.html` holds every slide and background in one page, which does not scale to decks of
+hundreds of slides. This emitter writes instead:
+
+- `index.html`, a small shell (styles, one slide container and a loader script) whose size does not
+  depend on the number of slides,
+- `slides/NNNN.html`, one HTML fragment per slide,
+- `media/`, the slide images, named by content hash (formats browsers cannot display, like JPEG 2000,
+  are converted to WebP).
+
+The loader only keeps the current slide in the DOM. It fetches its fragment on demand, prefetches the
+fragments and images of the neighbouring slides so that navigation is instant, and forgets fragments
+far from the current slide, so images are only decoded around the current position.
+
+The input is the slide content JSONL written by `llm_slide_deck.ingest` (`{"page", "title",
+"paragraphs", "images"}`, plus an optional `background` image). Fragments are loaded with `fetch`, so
+the output directory must be served over HTTP (e.g. `python -m http.server -d build/deck`).
+
+Usage:
+    uv run python -m llm_slide_deck.html_deck build/ingest/slides.jsonl -o build/deck
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import shutil
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from PIL import Image
+
+WEB_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".svg"}
+# Slides on each side of the current one whose fragments and images are prefetched
+PREFETCH = 2
+# Fragments further than this from the current slide are dropped from the loader cache
+KEEP = 8
+
+SHELL_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <link rel="preload" as="fetch" href="slides/0001.html" crossorigin>
+    <style>
+        body {{ font-family: 'Open Sans', Arial, sans-serif; background-color: #f0f2f5; color: #333; margin: 0;
+               padding: 2rem 1rem; }}
+        .slide-deck {{ max-width: 1024px; margin: 0 auto; box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+                      border: 1px solid #ddd; background-color: #fff; }}
+        .slide {{ width: 100%; aspect-ratio: 16 / 9; position: relative; overflow: hidden; display: flex;
+                 flex-direction: column; background-size: cover; background-position: center; }}
+        .slide .header {{ background-color: #F57C00; color: white; padding: 2% 8%; }}
+        .slide h2 {{ font-size: min(3.5vw, 36px); margin: 0; font-weight: 700; }}
+        .slide .content {{ display: flex; gap: 4%; padding: 3% 8%; flex-grow: 1; min-height: 0; }}
+        .slide ul {{ flex: 3; list-style: none; padding-left: 1.5em; margin: 0; font-size: min(1.5vw, 15px);
+                    line-height: 1.6; overflow: hidden; }}
+        .slide li {{ position: relative; margin-bottom: 1em; }}
+        .slide li::before {{ content: '◆'; position: absolute; left: -1.5em; color: #FF6600; }}
+        .slide figure {{ flex: 2; display: flex; flex-wrap: wrap; gap: 4%; align-content: flex-start; margin: 0; }}
+        .slide figure img {{ max-width: 48%; max-height: 40%; object-fit: contain; }}
+        .footer {{ margin-top: auto; padding: 1.5% 4%; display: flex; justify-content: space-between;
+                  font-size: min(1.2vw, 12px); color: #555; }}
+        nav {{ max-width: 1024px; margin: 1rem auto; display: flex; justify-content: center; gap: 1rem; }}
+    </style>
+</head>
+<body>
+    <div class="slide-deck"><section class="slide" id="slide" aria-live="polite"></section></div>
+    <nav>
+        <button id="previous" aria-label="Diapositive précédente">&larr;</button>
+        <span id="counter"></span>
+        <button id="next" aria-label="Diapositive suivante">&rarr;</button>
+    </nav>
+    <script>
+        const TOTAL = {total}, PREFETCH = {prefetch}, KEEP = {keep};
+        const slide = document.getElementById("slide");
+        const fragments = new Map();
+        const images = new Map();
+        let current = 0;
+
+        const url = (i) => `slides/${{String(i + 1).padStart(4, "0")}}.html`;
+
+        function fragment(i) {{
+            if (!fragments.has(i)) {{
+                fragments.set(i, fetch(url(i)).then((response) => response.text()));
+            }}
+            return fragments.get(i);
+        }}
+
+        function parse(text) {{
+            const template = document.createElement("template");
+            template.innerHTML = text.trim();
+            return template.content.firstElementChild;
+        }}
+
+        // Decode the images of a neighbouring slide ahead of time
+        function warm(i) {{
+            fragment(i).then((text) => {{
+                const element = parse(text);
+                const sources = [...element.querySelectorAll("img")].map((img) => img.getAttribute("src"));
+                sources.push(element.dataset.background);
+                for (const source of sources.filter(Boolean)) {{
+                    if (!images.has(source)) {{
+                        const image = new Image();
+                        image.src = source;
+                        image.decode().catch(() => {{}});
+                        images.set(source, i);
+                    }}
+                }}
+            }});
+        }}
+
+        function evict() {{
+            for (const i of fragments.keys()) if (Math.abs(i - current) > KEEP) fragments.delete(i);
+            for (const [source, i] of images) if (Math.abs(i - current) > PREFETCH) images.delete(source);
+        }}
+
+        async function show(i) {{
+            current = Math.max(0, Math.min(TOTAL - 1, i));
+            const index = current;
+            const element = parse(await fragment(index));
+            if (index !== current) return;
+            slide.className = element.className;
+            slide.style.backgroundImage = element.dataset.background ? `url("${{element.dataset.background}}")` : "";
+            slide.replaceChildren(...element.childNodes);
+            document.getElementById("counter").textContent = `${{index + 1}} / ${{TOTAL}}`;
+            history.replaceState(null, "", `#${{index + 1}}`);
+            for (let d = 1; d <= PREFETCH; d++) {{
+                if (index + d < TOTAL) warm(index + d);
+                if (index - d >= 0) warm(index - d);
+            }}
+            evict();
+        }}
+
+        document.getElementById("previous").addEventListener("click", () => show(current - 1));
+        document.getElementById("next").addEventListener("click", () => show(current + 1));
+        document.addEventListener("keydown", (event) => {{
+            if (["ArrowRight", "PageDown", " "].includes(event.key)) show(current + 1);
+            else if (["ArrowLeft", "PageUp"].includes(event.key)) show(current - 1);
+            else if (event.key === "Home") show(0);
+            else if (event.key === "End") show(TOTAL - 1);
+        }});
+        window.addEventListener("hashchange", () => show(parseInt(location.hash.slice(1), 10) - 1 || 0));
+        show(parseInt(location.hash.slice(1), 10) - 1 || 0);
+    </script>
+</body>
+</html>
+"""
+
+
+def load_slides(path: Path) -> Iterator[dict]:
+    """Stream slide content records from a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class MediaStore:
+    """Copies slide images into the `media/` folder of the deck, once per distinct file content."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.names: dict[str, Optional[str]] = {}
+
+    def add(self, source: str) -> Optional[str]:
+        """Return the deck-relative URL of an image, or None if it cannot be displayed."""
+        if source not in self.names:
+            self.names[source] = self._copy(Path(source))
+        return self.names[source]
+
+    def _copy(self, source: Path) -> Optional[str]:
+        digest = hashlib.sha1(source.read_bytes()).hexdigest()[:16]
+        if source.suffix.lower() in WEB_EXTENSIONS:
+            name = f"{digest}{source.suffix.lower()}"
+            if not (self.directory / name).exists():
+                shutil.copyfile(source, self.directory / name)
+            return f"media/{name}"
+        name = f"{digest}.webp"
+        if not (self.directory / name).exists():
+            try:
+                with Image.open(source) as image:
+                    image.convert("RGBA" if "A" in image.mode else "RGB").save(self.directory / name, quality=80)
+            except OSError as error:
+                print(f"Warning: skipping image {source}: {error}")
+                return None
+        return f"media/{name}"
+
+
+def slide_fragment(slide: dict, number: int, media: MediaStore) -> str:
+    """Render the HTML fragment of one slide."""
+    attributes = f'class="slide slide-{number}"'
+    if slide.get("background") and (background := media.add(slide["background"])):
+        attributes += f' data-background="{html.escape(background)}"'
+    parts = [f"<section {attributes}>"]
+    if slide.get("title"):
+        parts.append(f'<div class="header"><h2>{html.escape(slide["title"])}</h2></div>')
+    items = "".join(f"<li>{html.escape(paragraph)}</li>" for paragraph in slide.get("paragraphs", []))
+    sources = [url for url in map(media.add, slide.get("images", [])) if url]
+    pictures = "".join(f'<img src="{html.escape(url)}" alt="" decoding="async">' for url in sources)
+    parts.append(f'<div class="content"><ul>{items}</ul>{f"<figure>{pictures}</figure>" if pictures else ""}</div>')
+    page = slide.get("page", number)
+    parts.append(f'<div class="footer"><span>Direction des Services Partagés</span><span>{page}</span></div>')
+    parts.append("</section>")
+    return "\n".join(parts) + "\n"
+
+
+def emit_deck(slides: Iterable[dict], output_dir: Path, title: str = "Présentation EDF") -> dict:
+    """Write the shell, fragments and media of a lazy-loading deck. Returns size counters."""
+    fragment_dir = output_dir / "slides"
+    fragment_dir.mkdir(parents=True, exist_ok=True)
+    media = MediaStore(output_dir / "media")
+    total = fragment_bytes = 0
+    # Slides are streamed: only one fragment is held in memory at a time
+    for total, slide in enumerate(slides, start=1):
+        fragment = slide_fragment(slide, total, media).encode()
+        (fragment_dir / f"{total:04d}.html").write_bytes(fragment)
+        fragment_bytes += len(fragment)
+    shell = SHELL_TEMPLATE.format(title=html.escape(title), total=total, prefetch=PREFETCH, keep=KEEP).encode()
+    (output_dir / "index.html").write_bytes(shell)
+    return {"slides": total, "shell_bytes": len(shell), "fragment_bytes": fragment_bytes, "media": len(media.names)}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a lazy-loading HTML deck from slide content JSONL.")
+    parser.add_argument("slides", type=Path, nargs="?", default=Path("build/ingest/slides.jsonl"))
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("build/deck"))
+    parser.add_argument("--title", default="Présentation EDF")
+    parser.add_argument("--repeat", type=int, default=1, help="repeat the slides, to try out long decks")
+    args = parser.parse_args(argv)
+
+    slides = (slide for _ in range(args.repeat) for slide in load_slides(args.slides))
+    stats = emit_deck(slides, args.output_dir, args.title)
+    print(
+        f"Wrote {stats['slides']} slide(s) to {args.output_dir}: shell {stats['shell_bytes'] / 1024:.1f} KiB, "
+        f"fragments {stats['fragment_bytes'] / 1024:.0f} KiB, {stats['media']} image(s)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
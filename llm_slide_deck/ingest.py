@@ -0,0 +1,296 @@
+"""
+Streaming ingestion of the source booklet (`livret_producteur_fet17cr_v1.1.pdf`) into slide content.
+
+Pages are read lazily from a memory-mapped file: each worker process opens the PDF once and only
+parses the pages it is given, so memory stays flat for booklets of hundreds of pages. For each page,
+text lines are extracted with their position and font size, grouped into blocks and tagged as
+heading, body or footer; the images the page draws are written once to a shared cache directory,
+named by the hash of their data.
+
+Per-page results are cached as JSON keyed by the hash of the page content stream and of the fonts and
+XObjects (images, forms) of its resources, so re-ingesting an updated booklet only parses the pages
+that changed. Image paths are stored relative to the cache, which can be copied or moved as a whole.
+
+The output is a JSONL file with one record per page, and a JSONL file of slide content
+(`{"page", "title", "paragraphs", "images"}`) that the deck generators can consume.
+
+Usage:
+    uv run python -m llm_slide_deck.ingest livret_producteur_fet17cr_v1.1.pdf -o build/ingest
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import mmap
+import os
+import re
+import statistics
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+repo_path = Path(__file__).parent.parent.resolve()
+CACHE_DIR = repo_path / ".cache" / "ingest"
+CACHE_VERSION = 3
+# Extracted images are content-addressed, so they are shared by every run and every booklet
+IMAGE_DIR = CACHE_DIR / "images"
+
+# Lines in the top/bottom margins of the page (as a fraction of its height) are running headers/footers
+MARGIN_RATIO = 0.08
+# Lines at least this many times larger than the median body size are headings
+HEADING_RATIO = 1.5
+# Maximum vertical gap between two lines of the same block, relative to the font size
+BLOCK_GAP_RATIO = 1.6
+
+# Names of the XObjects painted by a content stream ("/Im5 Do")
+DRAWN_XOBJECT = re.compile(rb"/([^\s/\[\]()<>{}%]+)\s+Do\b")
+
+_pdf: Optional["MappedPdf"] = None
+# Memos of the open PDF, keyed by its object numbers: cleared whenever another PDF is opened
+_extracted: dict = {}  # extracted images
+_resource_digests: dict[int, str] = {}  # resource hashes
+
+
+class MappedPdf:
+    """A PDF opened through a read-only memory map, so pages are paged in from disk on demand."""
+
+    def __init__(self, path: Path):
+        # The map keeps its own handle on the file
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.reader = PdfReader(self._map)
+
+    def close(self):
+        self.reader = None
+        self._map.close()
+
+    def __enter__(self) -> "MappedPdf":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _open(path: Path) -> MappedPdf:
+    """Open `path` as the PDF of this process, dropping the memos of the previous one."""
+    global _pdf
+    _extracted.clear()
+    _resource_digests.clear()
+    _pdf = MappedPdf(path)
+    return _pdf
+
+
+def _init_worker(path: Path):
+    # Kept open for the life of the worker process
+    _open(path)
+
+
+def _hash_object(obj, digest, seen: set[int]):
+    """Feed a PDF object to `digest`, following indirect references once."""
+    if isinstance(obj, IndirectObject):
+        digest.update(f"R{obj.idnum}:".encode())
+        if obj.idnum in seen:
+            return
+        seen.add(obj.idnum)
+        obj = obj.get_object()
+    if isinstance(obj, StreamObject):
+        # The stored (encoded) bytes: hashing them does not need the filters to be supported
+        digest.update(obj._data)
+    if isinstance(obj, DictionaryObject):
+        for key in sorted(obj):
+            if key != "/Parent":
+                digest.update(key.encode())
+                _hash_object(obj.raw_get(key), digest, seen)
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            _hash_object(item, digest, seen)
+    elif not isinstance(obj, StreamObject):
+        digest.update(repr(obj).encode())
+
+
+def _resource_digest(ref) -> str:
+    """Hash of a font or XObject with everything it references, once per PDF object and worker."""
+    idnum = getattr(ref, "idnum", None)
+    if idnum is not None and idnum in _resource_digests:
+        return _resource_digests[idnum]
+    digest = hashlib.sha1()
+    _hash_object(ref, digest, set())
+    if idnum is not None:
+        _resource_digests[idnum] = digest.hexdigest()
+    return digest.hexdigest()
+
+
+def page_hash(page, contents: bytes) -> str:
+    """Hash of the page content stream, size, fonts and XObjects, used as the cache key of the page."""
+    digest = hashlib.sha1(f"v{CACHE_VERSION}:{list(page.mediabox)}".encode())
+    digest.update(contents)
+    resources = page.get("/Resources", {})
+    for category in ("/Font", "/XObject"):
+        entries = resources.get(category, {})
+        for name in sorted(entries):
+            digest.update(f"{category}{name}:{_resource_digest(entries.raw_get(name))}".encode())
+    return digest.hexdigest()
+
+
+def _lines(page) -> list[dict]:
+    """Extract text lines with their position (from the top-left corner, in points) and font size."""
+    height = float(page.mediabox.height)
+    lines = []
+
+    def visit(text, cm, tm, font_dict, font_size):
+        if not text.strip():
+            return
+        size = font_size * abs(tm[3] or tm[0]) * abs(cm[3] or cm[0])
+        x = tm[4] * cm[0] + cm[4]
+        y = tm[5] * cm[3] + cm[5]
+        lines.append({"text": text.strip(), "x": round(x, 1), "y": round(height - y, 1), "size": round(size, 1)})
+
+    page.extract_text(visitor_text=visit)
+    return lines
+
+
+def _blocks(lines: list[dict], page_height: float) -> list[dict]:
+    """Group consecutive lines of the same size and column into blocks, and tag their role."""
+    body_sizes = [line["size"] for line in lines] or [0]
+    median = statistics.median(body_sizes)
+    blocks: list[dict] = []
+    for line in lines:
+        last = blocks[-1] if blocks else None
+        if (
+            last is not None
+            and abs(last["size"] - line["size"]) < 0.5
+            and abs(last["x"] - line["x"]) < 2 * line["size"]
+            and 0 <= line["y"] - last["bottom"] <= BLOCK_GAP_RATIO * line["size"]
+        ):
+            last["text"] = f"{last['text']} {line['text']}"
+            last["bottom"] = line["y"]
+            continue
+        blocks.append({**line, "bottom": line["y"]})
+    for block in blocks:
+        in_margin = block["y"] < MARGIN_RATIO * page_height or block["y"] > (1 - MARGIN_RATIO) * page_height
+        if in_margin:
+            block["role"] = "footer"
+        elif median and block["size"] >= HEADING_RATIO * median:
+            block["role"] = "heading"
+        else:
+            block["role"] = "body"
+    return blocks
+
+
+def _images(page, contents: bytes) -> list[dict]:
+    """Write the images drawn by the page content stream to `IMAGE_DIR`, once per distinct PDF object."""
+    xobjects = page.get("/Resources", {}).get("/XObject", {})
+    images = []
+    for name in dict.fromkeys(m.decode() for m in DRAWN_XOBJECT.findall(contents)):
+        ref = xobjects.get(f"/{name}")
+        if ref is None or ref.get_object().get("/Subtype") != "/Image":
+            continue
+        # Booklets share one resource dictionary across pages: decode each image object once per worker
+        key = getattr(ref, "idnum", None) or name
+        if key not in _extracted:
+            try:
+                image = page.images[f"/{name}"]
+                data = image.data
+            except (PyPdfError, NotImplementedError, OSError, ValueError) as error:  # unsupported filters (JPX...)
+                print(f"Warning: could not extract image {name}: {error}")
+                _extracted[key] = None
+                continue
+            digest = hashlib.sha1(data).hexdigest()
+            path = IMAGE_DIR / f"{digest[:16]}{Path(image.name).suffix}"
+            if not path.exists():
+                path.write_bytes(data)
+            # Relative to the cache, so a copied or moved cache still points at its own images
+            relative = path.relative_to(CACHE_DIR).as_posix()
+            _extracted[key] = {"name": name, "sha1": digest, "path": relative, "bytes": len(data)}
+        if _extracted[key] is not None:
+            images.append(_extracted[key])
+    return images
+
+
+def _resolve_images(result: dict) -> dict:
+    """Turn the cache-relative image paths of a page result into absolute paths."""
+    result["images"] = [{**image, "path": str(CACHE_DIR / image["path"])} for image in result["images"]]
+    return result
+
+
+def _ingest_page(index: int) -> dict:
+    page = _pdf.reader.pages[index]
+    contents = page.get_contents()
+    contents = contents.get_data() if contents is not None else b""
+    key = page_hash(page, contents)
+    cached = CACHE_DIR / f"{key}.json"
+    if cached.exists():
+        result = json.loads(cached.read_text(encoding="utf-8"))
+        result["page"] = index + 1
+        return _resolve_images(result)
+    height = float(page.mediabox.height)
+    result = {
+        "page": index + 1,
+        "hash": key,
+        "width": float(page.mediabox.width),
+        "height": height,
+        "blocks": _blocks(_lines(page), height),
+        "images": _images(page, contents),
+    }
+    tmp_path = cached.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(cached)
+    return _resolve_images(result)
+
+
+def ingest(path: Path, workers: Optional[int] = None) -> Iterator[dict]:
+    """Yield the extracted content of each page of `path`, in page order, processing pages in parallel."""
+    global _pdf
+    IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    if workers == 1:
+        with _open(path) as pdf:
+            for index in range(len(pdf.reader.pages)):
+                yield _ingest_page(index)
+        _pdf = None
+        return
+    with MappedPdf(path) as pdf:
+        n_pages = len(pdf.reader.pages)
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(path,)) as pool:
+        yield from pool.map(_ingest_page, range(n_pages), chunksize=4)
+
+
+def to_slide(page: dict) -> dict:
+    """Turn an ingested page into slide content: its first heading as title and its body blocks as paragraphs."""
+    headings = [block["text"] for block in page["blocks"] if block["role"] == "heading"]
+    return {
+        "page": page["page"],
+        "title": headings[0] if headings else "",
+        "paragraphs": [block["text"] for block in page["blocks"] if block["role"] == "body"],
+        "images": [image["path"] for image in page["images"]],
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract text blocks, headings and images from a PDF booklet.")
+    parser.add_argument("pdf", type=Path, nargs="?", default=repo_path / "livret_producteur_fet17cr_v1.1.pdf")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("build/ingest"))
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    n_pages = 0
+    with (
+        open(args.output_dir / "pages.jsonl", "w", encoding="utf-8") as pages_file,
+        open(args.output_dir / "slides.jsonl", "w", encoding="utf-8") as slides_file,
+    ):
+        for page in ingest(args.pdf, args.workers):
+            pages_file.write(json.dumps(page, ensure_ascii=False) + "\n")
+            slides_file.write(json.dumps(to_slide(page), ensure_ascii=False) + "\n")
+            n_pages += 1
+    print(f"Ingested {n_pages} page(s) in {time.perf_counter() - start:.2f}s to {args.output_dir}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
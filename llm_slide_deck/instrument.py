@@ -0,0 +1,258 @@
+"""
+Opt-in per-slide instrumentation of the PowerPoint build.
+
+`BuildTracer` wraps the python-pptx calls the generator makes (`add_slide`, `add_picture`, `add_shape`,
+`add_textbox`, `text_frame`, text setters and `save`) for the duration of a build, and restores them
+afterwards. Nothing is patched unless a tracer is installed, so a normal build runs the unmodified
+library code with no overhead.
+
+For each slide it records the wall time from its creation to the creation of the next slide (or the
+save), the number of shapes, the bytes of the new images it adds to the package, the size of its XML
+and the `tracemalloc` delta. Every wrapped call is also timed. The results are written as:
+
+- `build_trace.json`: per-slide records and per-operation totals,
+- `build_trace.chrome.json`: Chrome trace events (open in `chrome://tracing` or https://ui.perfetto.dev).
+
+Usage:
+    uv run python -m llm_slide_deck.instrument -o build/trace
+"""
+
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from lxml import etree
+from pptx.presentation import Presentation
+from pptx.shapes.autoshape import Shape
+from pptx.shapes.shapetree import SlideShapes
+from pptx.slide import Slides
+from pptx.text.text import TextFrame, _Paragraph
+
+# (class, method) pairs timed as operations
+TIMED_METHODS = [
+    (SlideShapes, "add_picture"),
+    (SlideShapes, "add_shape"),
+    (SlideShapes, "add_textbox"),
+    (Presentation, "save"),
+]
+# (class, property, accessor) triples timed as operations: "get" for the getter, "set" for the setter
+TIMED_PROPERTIES = [
+    (Shape, "text_frame", "get"),
+    (Shape, "text", "set"),
+    (TextFrame, "text", "set"),
+    (_Paragraph, "text", "set"),
+]
+
+
+def _owner(cls: type, name: str) -> type:
+    """Return the class of the MRO of `cls` that defines `name`."""
+    return next(klass for klass in cls.__mro__ if name in klass.__dict__)
+
+
+class BuildTracer:
+    """Collects per-slide and per-call measurements while installed."""
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.slides: list[dict] = []
+        self.events: list[dict] = []
+        self.operations: dict[str, dict] = {}
+        self._patched: list[tuple[type, str, object]] = []
+        self._image_parts: set[str] = set()
+        self._current: Optional[dict] = None
+        self._depth = 0
+        self._pid = os.getpid()
+        self._start_ns = 0
+        self._started_tracemalloc = False
+
+    # --- Installation ---
+
+    def install(self):
+        """Wrap the python-pptx methods. Call `uninstall` (or use the tracer as a context manager) to restore them."""
+        self._started_tracemalloc = self.memory and not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        self._start_ns = time.perf_counter_ns()
+        for cls, name in TIMED_METHODS:
+            self._patch(cls, name, self._timed(f"{cls.__name__}.{name}", getattr(cls, name)))
+        for cls, name, accessor in TIMED_PROPERTIES:
+            original = getattr(cls, name)
+            label = f"{cls.__name__.lstrip('_')}.{name}"
+            if accessor == "get":
+                wrapped = property(self._timed(label, original.fget), original.fset, original.fdel, original.__doc__)
+            else:
+                wrapped = property(
+                    original.fget, self._timed(f"{label}=", original.fset), original.fdel, original.__doc__
+                )
+            self._patch(cls, name, wrapped)
+        self._patch(Slides, "add_slide", self._add_slide(Slides.add_slide))
+
+    def _patch(self, cls: type, name: str, value):
+        owner = _owner(cls, name)
+        self._patched.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, value)
+
+    def uninstall(self):
+        """Close the last slide and restore the original python-pptx methods."""
+        self._close_slide()
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched.clear()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def __enter__(self) -> "BuildTracer":
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    # --- Wrappers ---
+
+    def _timed(self, label: str, function):
+        tracer = self
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            # Nested wrapped calls (e.g. `text` setting the text frame) only count at the outermost level
+            if tracer._depth:
+                return function(*args, **kwargs)
+            if label == "Presentation.save":
+                tracer._close_slide()
+            tracer._depth += 1
+            start = time.perf_counter_ns()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                tracer._depth -= 1
+                tracer._record(label, start, time.perf_counter_ns())
+            if label == "SlideShapes.add_picture":
+                tracer._count_image(result)
+            return result
+
+        return wrapper
+
+    def _add_slide(self, function):
+        tracer = self
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer._close_slide()
+            start = time.perf_counter_ns()
+            memory = tracemalloc.get_traced_memory()[0] if tracer.memory else 0
+            slide = function(*args, **kwargs)
+            tracer._current = {"index": len(tracer.slides) + 1, "slide": slide, "start": start, "memory": memory}
+            tracer._current["image_bytes"] = 0
+            return slide
+
+        return wrapper
+
+    # --- Measurements ---
+
+    def _record(self, label: str, start: int, end: int):
+        stats = self.operations.setdefault(label, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+        seconds = (end - start) / 1e9
+        stats["count"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        slide = self._current["index"] if self._current else None
+        self.events.append({"name": label, "slide": slide, "start": start, "end": end})
+
+    def _count_image(self, picture):
+        """Add the size of the image of a picture, unless its part was already in the package."""
+        partname = str(picture.part.related_part(picture._element.blip_rId).partname)
+        if partname not in self._image_parts and self._current is not None:
+            self._image_parts.add(partname)
+            self._current["image_bytes"] += len(picture.image.blob)
+
+    def _close_slide(self):
+        if self._current is None:
+            return
+        current, self._current = self._current, None
+        end = time.perf_counter_ns()
+        slide = current["slide"]
+        memory = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        self.slides.append(
+            {
+                "slide": current["index"],
+                "seconds": round((end - current["start"]) / 1e9, 6),
+                "shapes": len(slide.shapes),
+                "image_bytes": current["image_bytes"],
+                "xml_bytes": len(etree.tostring(slide._element)),
+                "memory_delta_bytes": memory - current["memory"] if self.memory else None,
+            }
+        )
+        self.events.append(
+            {"name": f"slide {current['index']}", "slide": current["index"], "start": current["start"], "end": end}
+        )
+
+    # --- Output ---
+
+    def summary(self) -> dict:
+        """Return the per-slide records and per-operation totals."""
+        operations = {
+            label: {key: round(value, 6) if isinstance(value, float) else value for key, value in stats.items()}
+            for label, stats in sorted(self.operations.items(), key=lambda item: -item[1]["seconds"])
+        }
+        return {"slides": self.slides, "operations": operations}
+
+    def chrome_trace(self) -> dict:
+        """Return the recorded spans in the Chrome trace event format (complete events, in microseconds)."""
+        thread = threading.get_ident()
+        events = [
+            {
+                "name": event["name"],
+                "cat": "slide" if event["name"].startswith("slide ") else "pptx",
+                "ph": "X",
+                "ts": (event["start"] - self._start_ns) / 1000,
+                "dur": (event["end"] - event["start"]) / 1000,
+                "pid": self._pid,
+                "tid": thread,
+                "args": {"slide": event["slide"]},
+            }
+            for event in self.events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, output_dir: Path) -> tuple[Path, Path]:
+        """Write the JSON summary and the Chrome trace to `output_dir`."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        summary_path = output_dir / "build_trace.json"
+        chrome_path = output_dir / "build_trace.chrome.json"
+        summary_path.write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+        chrome_path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+        return summary_path, chrome_path
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the PowerPoint deck with per-slide instrumentation.")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("build/trace"), help="trace and deck output")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc, which slows the build down")
+    args = parser.parse_args(argv)
+
+    from llm_slide_deck._scripts import load_script
+
+    powerpoint = load_script("powerpoint")
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    with BuildTracer(memory=not args.no_memory) as tracer:
+        powerpoint.main(args.output_dir / "EDF_Presentation_powerpoint_slides.pptx")
+    summary_path, chrome_path = tracer.write(args.output_dir)
+    for record in tracer.slides:
+        memory = f", {record['memory_delta_bytes'] / 1024:+.0f} KiB" if record["memory_delta_bytes"] is not None else ""
+        print(
+            f"Slide {record['slide']}: {record['seconds'] * 1000:.1f} ms, {record['shapes']} shapes, "
+            f"{record['image_bytes'] / 1024:.0f} KiB images, {record['xml_bytes'] / 1024:.1f} KiB XML{memory}"
+        )
+    print(f"Trace written to {summary_path} and {chrome_path}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
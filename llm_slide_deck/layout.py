@@ -0,0 +1,160 @@
+"""
+Radial layout solver for diagram slides such as "Présentation des acteurs".
+
+Given a central circle and N satellite labels, computes non-overlapping boxes for the satellites
+around the centre, inside the available area of the slide. Label sizes are measured from their text
+with the same estimate as the layout linter, so the boxes are large enough for their content.
+
+The solver starts from an even radial placement that clears the centre, then relaxes the remaining
+overlaps with vectorised NumPy pushes (pairwise penetration along the axis of least overlap, plus a
+radial push away from the centre circle), clamping boxes to the available area at every step.
+Results are cached on the hash of the inputs, so rebuilding a deck does not solve the same diagram twice.
+
+Coordinates are in points; every placement also exposes its EMU equivalent for python-pptx.
+"""
+
+import functools
+import math
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from llm_slide_deck.lint import EMU_PER_PT, LINE_SPACING, TEXT_INSET_Y, estimate_text_size
+
+MAX_ITERATIONS = 500
+# Extra distance added to every push so that resolved constraints do not stay on the boundary
+EPSILON = 0.01
+
+
+class Placement(NamedTuple):
+    """Position and size of a satellite box, in points."""
+
+    label: str
+    left: float
+    top: float
+    width: float
+    height: float
+
+    @property
+    def emu(self) -> tuple[int, int, int, int]:
+        """(left, top, width, height) in EMU, as expected by python-pptx."""
+        return (
+            round(self.left * EMU_PER_PT),
+            round(self.top * EMU_PER_PT),
+            round(self.width * EMU_PER_PT),
+            round(self.height * EMU_PER_PT),
+        )
+
+
+class RadialLayout(NamedTuple):
+    placements: tuple[Placement, ...]
+    fits: bool  # False if some overlaps could not be resolved; the boxes still stay within the bounds
+
+
+def measure_label(text: str, font_size: float, width: float, oval: bool = False) -> tuple[float, float]:
+    """Return the (width, height) in points of a box of `width` points that fits `text`."""
+    # The largest rectangle inscribed in an ellipse is 1/sqrt(2) of its bounding box
+    factor = math.sqrt(2) if oval else 1.0
+    _, text_height = estimate_text_size(text, width / factor, font_size)
+    height = (text_height + 2 * TEXT_INSET_Y) * factor
+    return width, max(height, font_size * LINE_SPACING + 2 * TEXT_INSET_Y)
+
+
+def radial_layout(
+    center: tuple[float, float],
+    radius: float,
+    labels: Sequence[str],
+    sizes: Sequence[tuple[float, float]],
+    bounds: tuple[float, float, float, float],
+    gap: float = 8.0,
+    start_angle: float = -90.0,
+) -> RadialLayout:
+    """
+    Lay out satellite boxes around a central circle.
+
+    `center` and `radius` describe the central circle, `sizes` the (width, height) of each satellite,
+    `bounds` the (left, top, right, bottom) area the satellites must stay in, `gap` the minimum spacing
+    between boxes and `start_angle` the direction in degrees of the first satellite (-90 is straight up).
+    """
+    key = (
+        tuple(round(v, 2) for v in center),
+        round(radius, 2),
+        tuple((round(w, 2), round(h, 2)) for w, h in sizes),
+        tuple(round(v, 2) for v in bounds),
+        round(gap, 2),
+        round(start_angle, 2),
+    )
+    boxes, fits = _solve(*key)
+    placements = tuple(
+        Placement(label, float(x - w / 2), float(y - h / 2), float(w), float(h))
+        for label, (x, y, w, h) in zip(labels, boxes)
+    )
+    return RadialLayout(placements, fits)
+
+
+@functools.lru_cache(maxsize=256)
+def _solve(center, radius, sizes, bounds, gap, start_angle) -> tuple[tuple[tuple[float, ...], ...], bool]:
+    n = len(sizes)
+    if n == 0:
+        return (), True
+    cx, cy = center
+    size = np.array(sizes, dtype=float)
+    half = size / 2
+    left, top, right, bottom = bounds
+    low = np.array([left, top]) + half
+    high = np.array([right, bottom]) - half
+
+    # Even radial start on concentric rings, as many boxes per ring as its circumference allows.
+    # On each ring, boxes just clear the inner ring along their direction (support function of the box).
+    step = float(np.hypot(*size.max(axis=0))) + gap
+    ring = np.zeros(n, dtype=int)
+    slot = np.zeros(n)
+    per_ring = []
+    i, inner = 0, radius + gap + step / 2
+    while i < n:
+        capacity = max(1, min(n - i, int(2 * np.pi * inner / step)))
+        ring[i : i + capacity] = len(per_ring)
+        slot[i : i + capacity] = np.arange(capacity) + 0.5 * (len(per_ring) % 2)
+        per_ring.append(capacity)
+        i += capacity
+        inner += step
+    theta = np.radians(start_angle) + 2 * np.pi * slot / np.array(per_ring)[ring]
+    direction = np.stack([np.cos(theta), np.sin(theta)], axis=1)
+    support = np.abs(direction[:, 0]) * half[:, 0] + np.abs(direction[:, 1]) * half[:, 1]
+    reach = radius + gap + ring * step + support
+    pos = np.array([cx, cy]) + direction * reach[:, None]
+    not_self = ~np.eye(n, dtype=bool)
+    # Tiny deterministic jitter to break ties between boxes stacked on the same axis
+    jitter = 0.01 * (np.random.default_rng(0).random((n, 2)) - 0.5)
+
+    fits = False
+    for _ in range(MAX_ITERATIONS):
+        pos = np.clip(pos, low, high)
+        # Pairwise penetration between boxes, including the gap
+        delta = pos[:, None, :] - pos[None, :, :]
+        penetration = half[:, None, :] + half[None, :, :] + gap - np.abs(delta) + EPSILON
+        overlapping = (penetration > 2 * EPSILON).all(axis=2) & not_self
+        # Distance between the centre and the closest point of each box
+        nearest = np.clip(np.array([cx, cy]), pos - half, pos + half)
+        to_box = nearest - np.array([cx, cy])
+        distance = np.hypot(to_box[:, 0], to_box[:, 1])
+        deficit = radius + gap - distance + EPSILON
+        hits_center = deficit > 2 * EPSILON
+        if not overlapping.any() and not hits_center.any():
+            fits = True
+            break
+        # Resolve each overlapping pair along its axis of least penetration, half the way each
+        axis_x = penetration[:, :, 0] < penetration[:, :, 1]
+        sign = np.where(delta >= 0, 1.0, -1.0)
+        push = np.zeros((n, n, 2))
+        push[:, :, 0] = np.where(overlapping & axis_x, sign[:, :, 0] * penetration[:, :, 0] / 2, 0)
+        push[:, :, 1] = np.where(overlapping & ~axis_x, sign[:, :, 1] * penetration[:, :, 1] / 2, 0)
+        pos = pos + push.sum(axis=1) + np.where(overlapping.any(axis=1)[:, None], jitter, 0)
+        # Push boxes that touch the centre circle radially outwards
+        outward = np.where(distance[:, None] > 0, to_box / np.maximum(distance, 1e-9)[:, None], direction)
+        pos = pos + np.where(hits_center[:, None], outward * deficit[:, None], 0)
+    else:
+        # Out of iterations: boxes may still overlap, but never leave the bounds
+        pos = np.clip(pos, low, high)
+
+    return tuple((float(x), float(y), float(w), float(h)) for (x, y), (w, h) in zip(pos, size)), fits
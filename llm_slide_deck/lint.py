@@ -0,0 +1,403 @@
+"""
+Layout linter for generated decks.
+
+Extracts the bounding box of every shape of a PowerPoint file or of a Google Slides request plan
+(the list of `batchUpdate` requests built by `google/create_slides.py`) and reports:
+
+- partial overlaps between shapes (full containment is treated as intentional layering,
+  e.g. a title text box on its header bar or a logo on an overlay),
+- shapes running off the slide,
+- text that does not fit in its box (estimated from the font size, no font metrics needed).
+
+Overlaps are found with a sweep line over the axis along which the shapes are the least extended
+(y for full-width boxes stacked vertically, x for columns), so each slide costs O(n log n + m) for n
+shapes and m pairs overlapping on that axis; only layouts crowded on both axes approach O(n^2).
+Ellipses (oval shapes and pictures with an ellipse geometry) are tested against their actual outline,
+not their bounding box.
+Slides are linted one at a time, which keeps batch runs over thousands of slides linear in the
+number of slides.
+
+Usage:
+    uv run python -m llm_slide_deck.lint powerpoint/EDF_Presentation_powerpoint_slides.pptx
+    uv run python -m llm_slide_deck.lint plan.json  # JSON list of Slides API requests
+"""
+
+import argparse
+import heapq
+import json
+import math
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+EMU_PER_PT = 12700
+
+# Default text insets of PowerPoint text frames (0.1in left/right, 0.05in top/bottom), in points
+TEXT_INSET_X = 7.2
+TEXT_INSET_Y = 3.6
+DEFAULT_FONT_SIZE = 18.0
+# Average glyph width and line height, relative to the font size
+AVG_CHAR_WIDTH = 0.5
+LINE_SPACING = 1.2
+# Tolerance in points below which overlaps and overflows are ignored
+TOLERANCE = 0.5
+# Sample points per axis when testing the intersection of an ellipse with another shape
+OUTLINE_SAMPLES = 24
+
+
+class Box(NamedTuple):
+    """Axis-aligned bounding box of a shape, in points."""
+
+    name: str
+    left: float
+    top: float
+    right: float
+    bottom: float
+    text: str = ""
+    font_size: float = DEFAULT_FONT_SIZE
+    word_wrap: bool = True
+    shape: str = "rect"  # "rect" or "ellipse"
+
+
+class Issue(NamedTuple):
+    slide: int
+    kind: str  # "overlap", "off-slide" or "text-overflow"
+    shapes: tuple[str, ...]
+    message: str
+
+
+# --- Geometry ---
+
+
+def _contains(outer: Box, inner: Box) -> bool:
+    return (
+        outer.left <= inner.left + TOLERANCE
+        and outer.top <= inner.top + TOLERANCE
+        and outer.right >= inner.right - TOLERANCE
+        and outer.bottom >= inner.bottom - TOLERANCE
+    )
+
+
+def _inside(box: Box, x: float, y: float) -> bool:
+    """Whether (x, y) is inside the shape of `box`, more than TOLERANCE from its outline."""
+    if box.shape != "ellipse":
+        return True  # the sample points are taken inside the bounding boxes
+    rx = (box.right - box.left) / 2 - TOLERANCE
+    ry = (box.bottom - box.top) / 2 - TOLERANCE
+    if rx <= 0 or ry <= 0:
+        return False
+    dx = (x - (box.left + box.right) / 2) / rx
+    dy = (y - (box.top + box.bottom) / 2) / ry
+    return dx * dx + dy * dy < 1
+
+
+def _shapes_overlap(first: Box, second: Box) -> bool:
+    """Whether two shapes whose bounding boxes overlap also overlap in their actual outline."""
+    if first.shape != "ellipse" and second.shape != "ellipse":
+        return True
+    # Sample the intersection of the bounding boxes, at the centre of each cell of a grid
+    left, right = max(first.left, second.left), min(first.right, second.right)
+    top, bottom = max(first.top, second.top), min(first.bottom, second.bottom)
+    step_x, step_y = (right - left) / OUTLINE_SAMPLES, (bottom - top) / OUTLINE_SAMPLES
+    return any(
+        _inside(first, x, y) and _inside(second, x, y)
+        for x in (left + (i + 0.5) * step_x for i in range(OUTLINE_SAMPLES))
+        for y in (top + (j + 0.5) * step_y for j in range(OUTLINE_SAMPLES))
+    )
+
+
+def find_overlaps(boxes: list[Box]) -> Iterator[tuple[Box, Box]]:
+    """
+    Yield pairs of partially overlapping shapes using a sweep line.
+
+    The sweep runs along the axis with the smallest total extent of the boxes, so that the active set
+    only holds the few boxes sharing the current one's band: a slide of stacked full-width boxes is swept
+    on y, a slide of columns on x. Each box is compared with every active box, so the cost grows with
+    the number of pairs overlapping on the sweep axis, not only with the number of reported ones.
+    """
+    if sum(box.right - box.left for box in boxes) <= sum(box.bottom - box.top for box in boxes):
+        spans = [(box.left, box.right, box.top, box.bottom) for box in boxes]
+    else:
+        spans = [(box.top, box.bottom, box.left, box.right) for box in boxes]
+    order = sorted(range(len(boxes)), key=lambda i: spans[i][0])
+    active: set[int] = set()
+    by_end: list[tuple[float, int]] = []  # min-heap of (end on the sweep axis, index) of the active boxes
+    for i in order:
+        box = boxes[i]
+        start, _, cross_start, cross_end = spans[i]
+        # Drop the boxes that end before this one starts
+        while by_end and by_end[0][0] <= start + TOLERANCE:
+            active.discard(heapq.heappop(by_end)[1])
+        for j in active:
+            other = boxes[j]
+            if min(cross_end, spans[j][3]) - max(cross_start, spans[j][2]) <= TOLERANCE:
+                continue
+            if _contains(box, other) or _contains(other, box):
+                continue
+            if not _shapes_overlap(box, other):
+                continue
+            yield other, box
+        active.add(i)
+        heapq.heappush(by_end, (spans[i][1], i))
+
+
+def estimate_text_size(text: str, width: float, font_size: float, word_wrap: bool = True) -> tuple[float, float]:
+    """Estimate the (width, height) in points needed to render `text` in a box of `width` points."""
+    char_width = font_size * AVG_CHAR_WIDTH
+    lines = text.split("\n")
+    if not word_wrap:
+        return max(len(line) for line in lines) * char_width, len(lines) * font_size * LINE_SPACING
+    chars_per_line = max(1, int((width - 2 * TEXT_INSET_X) / char_width))
+    n_lines = sum(max(1, math.ceil(len(line) / chars_per_line)) for line in lines)
+    return width, n_lines * font_size * LINE_SPACING
+
+
+def lint_slide(slide_index: int, boxes: list[Box], slide_width: float, slide_height: float) -> list[Issue]:
+    """Return the layout issues of a single slide."""
+    issues = []
+    for box in boxes:
+        if (
+            box.left < -TOLERANCE
+            or box.top < -TOLERANCE
+            or box.right > slide_width + TOLERANCE
+            or box.bottom > slide_height + TOLERANCE
+        ):
+            issues.append(
+                Issue(
+                    slide_index,
+                    "off-slide",
+                    (box.name,),
+                    f"'{box.name}' spans ({box.left:.0f}, {box.top:.0f})-({box.right:.0f}, {box.bottom:.0f}) pt "
+                    f"outside the {slide_width:.0f}x{slide_height:.0f} pt slide",
+                )
+            )
+        if box.text:
+            width = box.right - box.left
+            height = box.bottom - box.top
+            needed_width, needed_height = estimate_text_size(box.text, width, box.font_size, box.word_wrap)
+            if needed_height > height - 2 * TEXT_INSET_Y + TOLERANCE or needed_width > width + TOLERANCE:
+                issues.append(
+                    Issue(
+                        slide_index,
+                        "text-overflow",
+                        (box.name,),
+                        f"text of '{box.name}' needs ~{needed_width:.0f}x{needed_height:.0f} pt "
+                        f"but the box is {width:.0f}x{height:.0f} pt",
+                    )
+                )
+    for first, second in find_overlaps(boxes):
+        issues.append(
+            Issue(slide_index, "overlap", (first.name, second.name), f"'{first.name}' overlaps '{second.name}'")
+        )
+    return issues
+
+
+def lint_slides(slides: Iterable[list[Box]], slide_width: float, slide_height: float) -> Iterator[Issue]:
+    """Lint a stream of slides, one list of boxes per slide."""
+    for index, boxes in enumerate(slides, start=1):
+        yield from lint_slide(index, boxes, slide_width, slide_height)
+
+
+# --- PowerPoint extraction ---
+
+
+def _pptx_font_size(shape) -> float:
+    for paragraph in shape.text_frame.paragraphs:
+        for run in paragraph.runs:
+            if run.font.size is not None:
+                return run.font.size.pt
+        if paragraph.font.size is not None:
+            return paragraph.font.size.pt
+    return DEFAULT_FONT_SIZE
+
+
+def boxes_from_pptx_slide(slide) -> list[Box]:
+    """Extract the bounding boxes of the shapes of a python-pptx slide."""
+    boxes = []
+    for shape in slide.shapes:
+        if shape.left is None or shape.width is None:
+            continue  # placeholder inheriting its position from the layout
+        text, font_size, word_wrap = "", DEFAULT_FONT_SIZE, True
+        if shape.has_text_frame and shape.text_frame.text:
+            text = shape.text_frame.text
+            font_size = _pptx_font_size(shape)
+            word_wrap = shape.text_frame.word_wrap is not False
+        left, top = shape.left / EMU_PER_PT, shape.top / EMU_PER_PT
+        # Oval shapes, and pictures clipped to an ellipse, share the "ellipse" preset geometry
+        is_oval = shape._element.xpath("./p:spPr/a:prstGeom/@prst") == ["ellipse"]
+        boxes.append(
+            Box(
+                shape.name,
+                left,
+                top,
+                left + shape.width / EMU_PER_PT,
+                top + shape.height / EMU_PER_PT,
+                text,
+                font_size,
+                word_wrap,
+                "ellipse" if is_oval else "rect",
+            )
+        )
+    return boxes
+
+
+def lint_pptx(path: Path) -> Iterator[Issue]:
+    """Lint every slide of a .pptx file."""
+    from pptx import Presentation
+
+    prs = Presentation(str(path))
+    slides = (boxes_from_pptx_slide(slide) for slide in prs.slides)
+    yield from lint_slides(slides, prs.slide_width / EMU_PER_PT, prs.slide_height / EMU_PER_PT)
+
+
+# --- Google Slides request plan extraction ---
+
+
+def _magnitude_pt(dimension: dict) -> float:
+    value = dimension.get("magnitude", 0)
+    return value / EMU_PER_PT if dimension.get("unit") == "EMU" else value
+
+
+def boxes_from_requests(requests: Iterable[dict]) -> dict[str, list[Box]]:
+    """Group the elements created by a Slides API request plan by page, in creation order."""
+    pages: dict[str, list[str]] = {}
+    geometry: dict[str, tuple[float, float, float, float]] = {}
+    texts: dict[str, str] = {}
+    font_sizes: dict[str, float] = {}  # sizes applied to the whole text
+    ranged_sizes: dict[str, float] = {}  # largest size applied to part of the text (e.g. one run)
+    ellipses: set[str] = set()
+    for request in requests:
+        (kind, body), *_ = request.items()
+        if kind == "createSlide":
+            pages.setdefault(body.get("objectId", f"page_{len(pages)}"), [])
+        elif kind in ("createShape", "createImage", "createLine", "createVideo", "createSheetsChart", "createTable"):
+            props = body.get("elementProperties", {})
+            size = props.get("size", {})
+            transform = props.get("transform", {})
+            scale = EMU_PER_PT if transform.get("unit") == "EMU" else 1
+            width = _magnitude_pt(size.get("width", {})) * transform.get("scaleX", 1)
+            height = _magnitude_pt(size.get("height", {})) * transform.get("scaleY", 1)
+            left = transform.get("translateX", 0) / scale
+            top = transform.get("translateY", 0) / scale
+            object_id = body.get("objectId", f"{kind}_{len(geometry)}")
+            geometry[object_id] = (left, top, left + width, top + height)
+            if body.get("shapeType") == "ELLIPSE":
+                ellipses.add(object_id)
+            pages.setdefault(props.get("pageObjectId", ""), []).append(object_id)
+        elif kind == "insertText":
+            object_id = body["objectId"]
+            text = texts.get(object_id, "")
+            index = body.get("insertionIndex", len(text))
+            texts[object_id] = text[:index] + body.get("text", "") + text[index:]
+        elif kind == "updateTextStyle":
+            text_range = body.get("textRange", {"type": "ALL"})
+            font_size = body.get("style", {}).get("fontSize")
+            if font_size:
+                object_id = body["objectId"]
+                # Range indexes count UTF-16 code units
+                length = len(texts.get(object_id, "").encode("utf-16-le")) // 2
+                start = text_range.get("startIndex", 0)
+                end = text_range.get("endIndex", length) if text_range.get("type") == "FIXED_RANGE" else length
+                if text_range.get("type") == "ALL" or (start == 0 and end >= length):
+                    font_sizes[object_id] = _magnitude_pt(font_size)
+                else:
+                    ranged_sizes[object_id] = max(ranged_sizes.get(object_id, 0), _magnitude_pt(font_size))
+        elif kind == "duplicateObject":
+            source = body["objectId"]
+            object_id = body.get("objectIds", {}).get(source, f"{source}_copy")
+            if source in geometry:
+                geometry[object_id] = geometry[source]
+                texts[object_id] = texts.get(source, "")
+                if source in ellipses:
+                    ellipses.add(object_id)
+                if source in font_sizes:
+                    font_sizes[object_id] = font_sizes[source]
+                if source in ranged_sizes:
+                    ranged_sizes[object_id] = ranged_sizes[source]
+                for elements in pages.values():
+                    if source in elements:
+                        elements.append(object_id)
+                        break
+        elif kind == "updatePageElementTransform":
+            object_id = body["objectId"]
+            if object_id in geometry and body.get("applyMode") in ("ABSOLUTE", "RELATIVE"):
+                transform = body["transform"]
+                scale = EMU_PER_PT if transform.get("unit") == "EMU" else 1
+                left, top, right, bottom = geometry[object_id]
+                dx = transform.get("translateX", 0) / scale
+                dy = transform.get("translateY", 0) / scale
+                if body["applyMode"] == "RELATIVE":
+                    # Pre-multiplied to the current transform; scales other than 1 resize the box
+                    scale_x, scale_y = transform.get("scaleX", 1), transform.get("scaleY", 1)
+                    geometry[object_id] = (
+                        scale_x * left + dx,
+                        scale_y * top + dy,
+                        scale_x * right + dx,
+                        scale_y * bottom + dy,
+                    )
+                else:
+                    geometry[object_id] = (dx, dy, dx + right - left, dy + bottom - top)
+        elif kind == "deleteText":
+            text_range = body.get("textRange", {"type": "ALL"})
+            object_id = body["objectId"]
+            if text_range.get("type") == "ALL":
+                texts.pop(object_id, None)
+            else:
+                text = texts.get(object_id, "")
+                end = text_range.get("endIndex", len(text)) if text_range["type"] == "FIXED_RANGE" else len(text)
+                texts[object_id] = text[: text_range.get("startIndex", 0)] + text[end:]
+        elif kind == "deleteObject":
+            geometry.pop(body["objectId"], None)
+            pages.pop(body["objectId"], None)
+    return {
+        page_id: [
+            Box(
+                object_id,
+                *geometry[object_id],
+                texts.get(object_id, ""),
+                font_sizes.get(object_id, ranged_sizes.get(object_id, DEFAULT_FONT_SIZE)),
+                shape="ellipse" if object_id in ellipses else "rect",
+            )
+            for object_id in object_ids
+            if object_id in geometry
+        ]
+        for page_id, object_ids in pages.items()
+    }
+
+
+def lint_requests(requests: Iterable[dict], slide_width: float = 960, slide_height: float = 540) -> Iterator[Issue]:
+    """Lint a Google Slides request plan (defaults to the 960x540 pt page of `google/create_slides.py`)."""
+    yield from lint_slides(boxes_from_requests(requests).values(), slide_width, slide_height)
+
+
+# --- CLI ---
+
+
+def lint_path(path: Path) -> Iterator[Issue]:
+    """Lint a .pptx file or a JSON request plan, depending on the file extension."""
+    if path.suffix == ".pptx":
+        yield from lint_pptx(path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            plan = json.load(f)
+        yield from lint_requests(plan["requests"] if isinstance(plan, dict) else plan)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report overlapping, off-slide and overflowing shapes.")
+    parser.add_argument("paths", nargs="+", type=Path, help=".pptx files or JSON request plans")
+    parser.add_argument("--ignore", action="append", default=[], help="issue kind to ignore (repeatable)")
+    args = parser.parse_args(argv)
+
+    n_issues = 0
+    for path in args.paths:
+        for issue in lint_path(path):
+            if issue.kind in args.ignore:
+                continue
+            n_issues += 1
+            print(f"{path}:slide {issue.slide}: [{issue.kind}] {issue.message}")
+    print(f"{n_issues} issue(s) found.")
+    return 1 if n_issues else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
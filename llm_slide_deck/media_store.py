@@ -0,0 +1,236 @@
+"""
+Shared, memory-mapped media store for multi-process deck generation.
+
+Worker processes that each read the same images (the background, the actors photo, the logo, the media of
+a mail-merge template, recipient images) each hold a private copy of them. The store keeps every asset
+once, content-addressed by SHA-1, in one append-only blob file with a JSON index of each asset's offset,
+size, MIME type and pixel dimensions. Workers map the blob file read-only and get `memoryview`s into the
+mapping: the pages live once in the OS page cache, shared by all workers, so private memory stays flat
+as the worker count grows. Consumers that accept buffers (`zipfile.writestr`, `hashlib`, uploads from
+`MediaStoreReader`) use them without copying.
+
+The store is written by one process (typically the parent, before starting its workers), then only
+read. Sources are indexed by key (file path with its size and modification time, or package and part
+name), so workers find their assets without reading the source files. Concurrent writers take a file
+lock to append their blobs and to merge their entries into the index on disk when saving. Index entries
+whose blobs are gone (a deleted or truncated blob file) are dropped when the index is read.
+
+Usage:
+    uv run python -m llm_slide_deck.media_store images/*.jpg images/*.png
+"""
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import io
+import json
+import mimetypes
+import mmap
+import os
+import zipfile
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+repo_path = Path(__file__).parent.parent.resolve()
+STORE_DIR = repo_path / ".cache" / "media_store"
+
+
+class Asset(NamedTuple):
+    digest: str
+    offset: int
+    size: int
+    mime: str
+    width: Optional[int]
+    height: Optional[int]
+
+
+def file_key(path: Path) -> str:
+    """Key of a source file: its resolved path, size and modification time."""
+    stat = path.stat()
+    return f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _dimensions(data: bytes) -> tuple[Optional[int], Optional[int]]:
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return image.size
+    except OSError:
+        return None, None
+
+
+class SharedMediaStore:
+    """Content-addressed assets in one memory-mapped blob file."""
+
+    def __init__(self, directory: Path = STORE_DIR):
+        self.directory = directory
+        self.blob_path = directory / "blobs.bin"
+        self.index_path = directory / "index.json"
+        self.lock_path = directory / "lock"
+        self.assets, self.keys = self._read_index()
+        self._map: Optional[mmap.mmap] = None
+
+    def _read_index(self) -> tuple[dict[str, Asset], dict[str, str]]:
+        """Read the assets and keys of the index on disk, without the entries whose blobs are gone."""
+        index = json.loads(self.index_path.read_text(encoding="utf-8")) if self.index_path.exists() else {}
+        blob_size = self.blob_path.stat().st_size if self.blob_path.exists() else 0
+        assets = {
+            digest: Asset(digest, *fields)
+            for digest, fields in index.get("assets", {}).items()
+            if fields[0] + fields[1] <= blob_size
+        }
+        keys = {key: digest for key, digest in index.get("keys", {}).items() if digest in assets}
+        return assets, keys
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the store's exclusive lock, released when the lock file is closed."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    # --- Writing ---
+
+    def add_bytes(self, data, mime: str = "application/octet-stream", key: Optional[str] = None) -> Asset:
+        """Store `data` unless the same bytes are already in, and record `key` for it."""
+        digest = hashlib.sha1(data).hexdigest()
+        if digest not in self.assets:
+            with self._locked(), open(self.blob_path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            # The mapping was made before the append: the next view maps the grown file
+            self._unmap()
+            self.assets[digest] = Asset(digest, offset, len(data), mime, *_dimensions(data))
+        if key is not None:
+            self.keys[key] = digest
+        return self.assets[digest]
+
+    def add_file(self, path: Path) -> Asset:
+        key = file_key(path)
+        if key in self.keys:
+            return self.assets[self.keys[key]]
+        mime = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        return self.add_bytes(path.read_bytes(), mime, key)
+
+    def add_package(self, path: Path) -> list[Asset]:
+        """Store the media parts of a .pptx package, keyed by `package_key(path, part name)`."""
+        assets = []
+        with zipfile.ZipFile(path) as package:
+            for name in package.namelist():
+                if name.startswith("ppt/media/"):
+                    key = package_key(path, name)
+                    if key in self.keys:
+                        assets.append(self.assets[self.keys[key]])
+                    else:
+                        mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                        assets.append(self.add_bytes(package.read(name), mime, key))
+        return assets
+
+    def save(self):
+        """Merge the entries into the index on disk and write it atomically, after the blobs it points to."""
+        with self._locked():
+            assets, keys = self._read_index()
+            self.assets = {**self.assets, **assets}
+            self.keys = {**keys, **self.keys}
+            index = {"assets": {digest: list(asset[1:]) for digest, asset in self.assets.items()}, "keys": self.keys}
+            tmp_path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(index), encoding="utf-8")
+            tmp_path.replace(self.index_path)
+
+    # --- Reading ---
+
+    def _mapping(self) -> mmap.mmap:
+        if self._map is None:
+            # The map keeps its own handle on the file
+            with open(self.blob_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _unmap(self):
+        if self._map is not None:
+            # Views still exported from the mapping keep it alive, and it is closed when they are released
+            with contextlib.suppress(BufferError):
+                self._map.close()
+            self._map = None
+
+    def view(self, asset: Asset) -> memoryview:
+        """Return the bytes of an asset as a read-only view into the shared mapping."""
+        end = asset.offset + asset.size
+        if end > len(self._mapping()):
+            # Another process may have appended to the blob file since it was mapped
+            self._unmap()
+            if end > len(self._mapping()):
+                raise ValueError(f"Asset {asset.digest} ends at byte {end}, past the end of {self.blob_path}")
+        return memoryview(self._mapping())[asset.offset : end]
+
+    def lookup(self, key: str) -> Optional[Asset]:
+        digest = self.keys.get(key)
+        return self.assets[digest] if digest is not None else None
+
+    def reader(self, asset: Asset) -> "MediaStoreReader":
+        return MediaStoreReader(self.view(asset))
+
+    def close(self):
+        self._unmap()
+
+    def __getstate__(self):
+        # Workers receive the index and map the blob file themselves
+        return {**self.__dict__, "_map": None}
+
+
+def package_key(path: Path, name: str) -> str:
+    """Key of a media part of a package."""
+    return f"{file_key(path)}!{name}"
+
+
+class MediaStoreReader(io.RawIOBase):
+    """A read-only, seekable file object over a memoryview, for APIs that want files (uploads, PIL)."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._position : self._position + len(buffer)]
+        buffer[: len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Add images and .pptx media to the shared media store.")
+    parser.add_argument("sources", type=Path, nargs="+", help="image files or .pptx packages")
+    parser.add_argument("--store", type=Path, default=STORE_DIR)
+    args = parser.parse_args(argv)
+
+    store = SharedMediaStore(args.store)
+    for source in args.sources:
+        assets = store.add_package(source) if source.suffix == ".pptx" else [store.add_file(source)]
+        for asset in assets:
+            size = f"{asset.width}x{asset.height}" if asset.width else "-"
+            print(f"{source}: {asset.digest[:16]} {asset.mime} {size} {asset.size / 1024:.0f} KiB")
+    store.save()
+    total = sum(asset.size for asset in store.assets.values())
+    print(f"{len(store.assets)} asset(s), {total / 2**20:.1f} MiB in {store.blob_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
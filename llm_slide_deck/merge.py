@@ -0,0 +1,343 @@
+"""
+Mail-merge: personalised decks for each laureate from a CSV or JSONL file of recipients.
+
+A template deck contains `{{field}}` markers in its text (e.g. `{{name}}`, `{{installation}}`).
+For .pptx output, the template package is read once per worker process; for each recipient only the
+XML parts holding markers are rewritten, every other part (media, layouts, masters, unchanged slides)
+is written back byte for byte, and media are stored without recompression. The template media are put
+once in the shared media store (`llm_slide_deck.media_store`), and workers write them from views into
+its memory mapping instead of holding a private copy each.
+For Google Slides, the markers are read from the template presentation once, the template is copied on
+Drive and every marker is replaced with a single `replaceAllText` batch per recipient.
+
+Recipients are streamed and at most a few records per worker are in flight, so memory stays bounded
+whatever the size of the recipient file. A JSONL report with the status, output and duration of each
+record is written next to the decks, and the overall throughput is printed at the end.
+
+Markers must not be split across text runs, which holds for decks built with python-pptx.
+
+Usage:
+    uv run python -m llm_slide_deck.merge powerpoint/EDF_Presentation_powerpoint_slides.pptx recipients.csv -o out/
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import io
+import json
+import os
+import re
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+from xml.sax.saxutils import escape
+
+from llm_slide_deck._concurrency import submit_bounded
+
+if TYPE_CHECKING:
+    from llm_slide_deck.media_store import SharedMediaStore
+
+MARKER_BYTES = re.compile(rb"\{\{\s*(\w+)\s*\}\}")
+MARKER = re.compile(MARKER_BYTES.pattern.decode())
+
+# Block added to the first slide of decks that do not contain any marker yet
+RECIPIENT_BLOCK = (
+    "Lauréat : {{name}}\nInstallation : {{installation}}\nDate de désignation : {{designation_date}}\n"
+    "Contact EDF OA : {{contact}}"
+)
+
+# Parts that are already compressed and gain nothing from deflate
+STORED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".emf", ".wmf", ".mp4", ".m4a"}
+
+
+def load_recipients(path: Path) -> Iterator[dict[str, str]]:
+    """Stream recipient records from a CSV (with a header row) or a JSONL file."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def add_recipient_block(deck_path: Path, output_path: Path):
+    """Write a copy of `deck_path` with the recipient block of markers on its first slide."""
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+
+    prs = Presentation(str(deck_path))
+    text_frame = (
+        prs.slides[0].shapes.add_textbox(Inches(2), Inches(6), prs.slide_width - Inches(4), Inches(0.9)).text_frame
+    )
+    text_frame.word_wrap = True
+    for i, line in enumerate(RECIPIENT_BLOCK.split("\n")):
+        paragraph = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+        paragraph.text = line
+        paragraph.font.size = Pt(10)
+    prs.save(str(output_path))
+
+
+# --- PowerPoint ---
+
+
+class PptxTemplate:
+    """The parts of a .pptx template, split between immutable parts and parts holding markers."""
+
+    def __init__(self, path: Path, store: Optional["SharedMediaStore"] = None):
+        from llm_slide_deck.media_store import package_key
+
+        self.parts: list[tuple[zipfile.ZipInfo, bytes | memoryview]] = []
+        self.fields: set[str] = set()
+        with zipfile.ZipFile(path) as package:
+            for info in package.infolist():
+                asset = store.lookup(package_key(path, info.filename)) if store is not None else None
+                data = store.view(asset) if asset is not None else package.read(info)
+                self.parts.append((info, data))
+                if info.filename.endswith(".xml"):
+                    self.fields.update(m.decode() for m in MARKER_BYTES.findall(data))
+
+    def render(self, record: dict[str, str]) -> bytes:
+        """
+        Return the .pptx bytes of the template with the markers replaced by the fields of `record`.
+
+        Like `render_google`, missing fields (short CSV rows, JSON nulls) are blanked and the extra values
+        of a CSV row longer than the header are ignored.
+        """
+        values = {field.encode(): b"" for field in self.fields}
+        values.update(
+            (key.encode(), escape(str(value)).encode())
+            for key, value in record.items()
+            if key is not None and value is not None
+        )
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as package:
+            for info, data in self.parts:
+                if info.filename.endswith(".xml") and b"{{" in data:
+                    data = MARKER_BYTES.sub(lambda m: values[m.group(1)], data)
+                stored = Path(info.filename).suffix.lower() in STORED_EXTENSIONS
+                package.writestr(info, data, compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+        return buffer.getvalue()
+
+
+_template: Optional[PptxTemplate] = None
+
+
+def _init_worker(template_path: Path, store: Optional["SharedMediaStore"] = None):
+    global _template
+    _template = PptxTemplate(template_path, store)
+
+
+def _render_pptx(record: dict[str, str], output_path: Path) -> float:
+    start = time.perf_counter()
+    output_path.write_bytes(_template.render(record))
+    return time.perf_counter() - start
+
+
+def output_name(record: dict[str, str], index: int, field: str) -> str:
+    """Return a file-system safe deck name for a record."""
+    stem = re.sub(r"[^\w\-]+", "_", str(record.get(field) or "")).strip("_") or "deck"
+    return f"{index:05d}_{stem}"
+
+
+def _report(results: Iterator[tuple[int, dict, concurrent.futures.Future, str]], report_path: Path) -> tuple[int, int]:
+    start = time.perf_counter()
+    n_ok = n_failed = 0
+    with open(report_path, "w", encoding="utf-8") as report:
+        for index, record, future, output in results:
+            error = future.exception()
+            entry = {"index": index, "output": output, "ok": error is None}
+            if error is None:
+                n_ok += 1
+                entry["seconds"] = round(future.result(), 4)
+            else:
+                n_failed += 1
+                entry["error"] = f"{type(error).__name__}: {error}"
+                print(f"Record {index} failed: {entry['error']}")
+            report.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    elapsed = time.perf_counter() - start
+    rate = (n_ok + n_failed) / elapsed if elapsed else 0.0
+    print(f"{n_ok} deck(s) written, {n_failed} failure(s) in {elapsed:.2f}s ({rate:.1f} records/s).")
+    print(f"Per-record report: {report_path}")
+    return n_ok, n_failed
+
+
+def merge_pptx(
+    template_path: Path,
+    recipients: Iterable[dict[str, str]],
+    output_dir: Path,
+    name_field: str = "name",
+    workers: Optional[int] = None,
+    shared_media: bool = True,
+) -> tuple[int, int]:
+    """Write one personalised .pptx per recipient in `output_dir`. Returns the (succeeded, failed) counts."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    store = None
+    if shared_media:
+        from llm_slide_deck.media_store import SharedMediaStore
+
+        store = SharedMediaStore()
+        store.add_package(template_path)
+        store.save()
+    initargs = (template_path, store)
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+        max_in_flight = 4 * workers
+
+        def submit(item):
+            index, record = item
+            output = output_dir / f"{output_name(record, index, name_field)}.pptx"
+            return pool.submit(_render_pptx, record, output)
+
+        def results():
+            for (index, record), future in submit_bounded(submit, enumerate(recipients), max_in_flight):
+                yield index, record, future, str(output_dir / f"{output_name(record, index, name_field)}.pptx")
+
+        return _report(results(), output_dir / "merge_report.jsonl")
+
+
+# --- Google Slides ---
+
+
+def template_markers(slides_service, template_id: str) -> dict[str, str]:
+    """Return the markers of a template presentation (e.g. `{{ name }}`), mapped to their field names."""
+    presentation = slides_service.presentations().get(presentationId=template_id, fields="slides").execute()
+    return {m.group(0): m.group(1) for m in MARKER.finditer(json.dumps(presentation, ensure_ascii=False))}
+
+
+def render_google(
+    slides_service,
+    drive_service,
+    template_id: str,
+    record: dict[str, str],
+    title: str,
+    markers: Optional[dict[str, str]] = None,
+) -> str:
+    """
+    Copy the template presentation and fill in its markers. Returns the new presentation ID.
+
+    `markers` are those returned by `template_markers`, which reads them from the template when not given.
+    Like `PptxTemplate.render`, every marker of the template is replaced, and missing fields (short CSV
+    rows, JSON nulls, keys absent from a JSONL record) are blanked. If the markers cannot be filled in, the
+    copy is deleted before the error is raised, so a failed or retried record leaves no half-filled deck.
+    """
+    if markers is None:
+        markers = template_markers(slides_service, template_id)
+    copy = drive_service.files().copy(fileId=template_id, body={"name": title}, fields="id").execute()
+    presentation_id = copy["id"]
+    requests = [
+        {
+            "replaceAllText": {
+                "containsText": {"text": marker, "matchCase": True},
+                "replaceText": "" if record.get(field) is None else str(record[field]),
+            }
+        }
+        for marker, field in markers.items()
+    ]
+    try:
+        slides_service.presentations().batchUpdate(
+            presentationId=presentation_id, body={"requests": requests}
+        ).execute()
+    except Exception:
+        try:
+            drive_service.files().delete(fileId=presentation_id).execute()
+        except Exception as error:  # report the orphan, but raise the original error
+            print(f"Warning: could not delete the copy {presentation_id} of a failed record: {error}")
+        raise
+    return presentation_id
+
+
+def merge_google(
+    service_factory: Callable[[], tuple[object, object]],
+    template_id: str,
+    recipients: Iterable[dict[str, str]],
+    report_path: Path,
+    title_prefix: str,
+    name_field: str = "name",
+    workers: int = 4,
+) -> tuple[int, int]:
+    """
+    Create one personalised Google presentation per recipient from a template presentation.
+
+    `service_factory` returns a (slides_service, drive_service) pair; it is called once per worker
+    thread because the API client objects are not thread-safe.
+    """
+    # Read once, so that every record blanks the markers of the fields it lacks
+    markers = template_markers(service_factory()[0], template_id)
+    local = threading.local()
+
+    def render(index: int, record: dict[str, str]) -> float:
+        start = time.perf_counter()
+        if not hasattr(local, "services"):
+            local.services = service_factory()
+        title = f"{title_prefix} - {record.get(name_field) or index}"
+        presentation_id = render_google(*local.services, template_id, record, title, markers)
+        print(f"Record {index}: https://docs.google.com/presentation/d/{presentation_id}")
+        return time.perf_counter() - start
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+
+        def results():
+            def submit(item):
+                return pool.submit(render, *item)
+
+            for (index, record), future in submit_bounded(submit, enumerate(recipients), 4 * workers):
+                yield index, record, future, ""
+
+        return _report(results(), report_path)
+
+
+# --- CLI ---
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate one personalised deck per recipient.")
+    parser.add_argument("template", help="template .pptx, or a Google presentation ID with --google")
+    parser.add_argument("recipients", type=Path, help="CSV (with header) or JSONL file of recipients")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("merged"))
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--name-field", default="name", help="record field used to name the outputs")
+    parser.add_argument("--google", action="store_true", help="copy a Google Slides template instead")
+    parser.add_argument(
+        "--no-shared-media", dest="shared_media", action="store_false", help="load the media in every worker"
+    )
+    args = parser.parse_args(argv)
+
+    recipients = load_recipients(args.recipients)
+    if args.google:
+        from llm_slide_deck._scripts import load_script
+
+        google = load_script("google")
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        _, n_failed = merge_google(
+            lambda: (google.get_slides_service(), google.get_drive_service()),
+            args.template,
+            recipients,
+            args.output_dir / "merge_report.jsonl",
+            google.PRESENTATION_TITLE,
+            args.name_field,
+            args.workers or 4,
+        )
+        return 1 if n_failed else 0
+
+    template_path = Path(args.template)
+    with zipfile.ZipFile(template_path) as package:
+        has_markers = any(
+            MARKER_BYTES.search(package.read(name)) for name in package.namelist() if name.endswith(".xml")
+        )
+    if not has_markers:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        marked_path = args.output_dir / f"{template_path.stem}_template.pptx"
+        add_recipient_block(template_path, marked_path)
+        print(f"No {{{{field}}}} marker in {template_path}, added the recipient block: {marked_path}")
+        template_path = marked_path
+    _, n_failed = merge_pptx(
+        template_path, recipients, args.output_dir, args.name_field, args.workers, args.shared_media
+    )
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,224 @@
+"""
+Auto-paginating tables and lists for long booklet sections ("Check-list des démarches",
+"Questions - Réponses", "Adresses utiles").
+
+Rows are measured with the same text estimate as the layout linter: each cell wraps in its column, and
+a row is as tall as its tallest cell. Rows are placed top-down in the available area of a slide; when
+the next row does not fit, a continuation slide starts and the header row is repeated at its top. A row
+taller than a whole slide is split between its lines, at word boundaries, and carries on at the top of
+the next slide. A list is a table with a single column and no header.
+
+The layout is backend-neutral and in points: `paginate` is a generator that reads rows as they come and
+keeps only the current page, so a 1000-row table is laid out in linear time and bounded memory. The
+slides are drawn by `pptx_shards.add_table_slides` (python-pptx) and `slides_requests.table_slides`
+(Google Slides requests).
+
+Usage:
+    uv run python -m llm_slide_deck.pagination checklist.csv --title "Check-list des démarches" -o build/checklist.pptx
+    uv run python -m llm_slide_deck.pagination faq.csv --title "Questions - Réponses" --widths 1,2 --google plan.json
+"""
+
+import argparse
+import csv
+import math
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from llm_slide_deck.lint import AVG_CHAR_WIDTH, LINE_SPACING, TEXT_INSET_X, TEXT_INSET_Y, estimate_text_size
+
+DEFAULT_FONT_SIZE = 12.0
+BULLET = "•"
+
+
+class PlacedRow(NamedTuple):
+    """A row (or the part of a split row) placed on a page. `top` is relative to the top of the area."""
+
+    index: int  # index of the source row, -1 for the header
+    cells: tuple[str, ...]
+    top: float
+    height: float
+    continued: bool = False  # True for the second and next parts of a split row
+
+
+class Page(NamedTuple):
+    number: int  # 1-based
+    header: Optional[PlacedRow]
+    rows: list[PlacedRow]
+
+    @property
+    def continued(self) -> bool:
+        return self.number > 1
+
+
+def column_widths(weights: Sequence[float], total: float) -> list[float]:
+    """Split `total` points between columns in proportion to `weights`."""
+    scale = total / sum(weights)
+    return [weight * scale for weight in weights]
+
+
+def row_height(cells: Sequence[str], widths: Sequence[float], font_size: float) -> float:
+    """Height in points of a row whose cells wrap in their columns."""
+    line_height = font_size * LINE_SPACING
+    text_height = max(
+        (estimate_text_size(cell, width, font_size)[1] if cell else line_height for cell, width in zip(cells, widths)),
+        default=line_height,
+    )
+    return text_height + 2 * TEXT_INSET_Y
+
+
+def _split_text(text: str, chars_per_line: int, max_lines: int) -> tuple[str, str]:
+    """Split `text` after the words that fit in `max_lines` lines of `chars_per_line` characters."""
+    head: list[str] = []
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        needed = max(1, math.ceil(len(line) / chars_per_line))
+        if needed <= max_lines:
+            head.append(line)
+            max_lines -= needed
+            continue
+        cut = max_lines * chars_per_line
+        if max_lines:
+            space = line.rfind(" ", 0, cut + 1)
+            cut = space if space > 0 else cut
+            head.append(line[:cut].rstrip())
+        tail = [line[cut:]] + lines[i + 1 :]
+        return "\n".join(head), "\n".join(tail).strip()
+    return "\n".join(head), ""
+
+
+def split_row(
+    cells: Sequence[str], widths: Sequence[float], font_size: float, max_height: float
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Split a row into the part that fits in `max_height` points and the rest."""
+    # The epsilon keeps a space of exactly n lines from rounding down to n - 1
+    max_lines = max(0, int((max_height - 2 * TEXT_INSET_Y) / (font_size * LINE_SPACING) + 1e-9))
+    heads, tails = [], []
+    for cell, width in zip(cells, widths):
+        chars_per_line = max(1, int((width - 2 * TEXT_INSET_X) / (font_size * AVG_CHAR_WIDTH)))
+        head, tail = _split_text(cell, chars_per_line, max_lines)
+        heads.append(head)
+        tails.append(tail)
+    return tuple(heads), tuple(tails)
+
+
+def paginate(
+    rows: Iterable[Sequence[str]],
+    widths: Sequence[float],
+    area_height: float,
+    font_size: float = DEFAULT_FONT_SIZE,
+    header: Optional[Sequence[str]] = None,
+    header_font_size: Optional[float] = None,
+) -> Iterator[Page]:
+    """
+    Lay out `rows` in columns of `widths` points on pages whose table area is `area_height` points high.
+
+    Yields each page as soon as it is full. The header row, if any, is repeated at the top of every page.
+    """
+    header_row = None
+    if header is not None:
+        header = tuple(header)
+        header_row = PlacedRow(-1, header, 0.0, row_height(header, widths, header_font_size or font_size))
+    body_top = header_row.height if header_row else 0.0
+    line_height = font_size * LINE_SPACING + 2 * TEXT_INSET_Y
+    if area_height - body_top < line_height:
+        raise ValueError(f"the table area ({area_height:.0f} pt) cannot hold the header and one line")
+
+    number, placed, top = 1, [], body_top
+    for index, row in enumerate(rows):
+        cells, continued = tuple(str(cell) for cell in row), False
+        while True:
+            height = row_height(cells, widths, font_size)
+            if top + height <= area_height:
+                placed.append(PlacedRow(index, cells, top, height, continued))
+                top += height
+                break
+            if area_height - top >= line_height and (height > area_height - body_top or not placed):
+                # Too tall for any page: fill this one and carry the rest of the row over
+                head, cells = split_row(cells, widths, font_size, area_height - top)
+                head_height = row_height(head, widths, font_size)
+                placed.append(PlacedRow(index, head, top, head_height, continued))
+                if not any(cell.strip() for cell in cells):
+                    # Only blank lines were left over: the row ends on this page
+                    top += head_height
+                    break
+                continued = True
+            yield Page(number, header_row, placed)
+            number, placed, top = number + 1, [], body_top
+    if placed or number == 1:
+        yield Page(number, header_row, placed)
+
+
+def list_rows(items: Iterable[str], bullet: str = BULLET) -> Iterator[tuple[str]]:
+    """Rows of a single-column table showing `items` as a bulleted list."""
+    for item in items:
+        yield (f"{bullet} {item}" if bullet else item,)
+
+
+def load_rows(path: Path, has_header: bool = True) -> tuple[Optional[list[str]], Iterator[list[str]]]:
+    """Return the header (if any) and a stream of the rows of a CSV file."""
+
+    def read():
+        with open(path, encoding="utf-8", newline="") as f:
+            yield from csv.reader(f)
+
+    reader = read()
+    header = next(reader, None) if has_header else None
+    return header, (row for row in reader if any(cell.strip() for cell in row))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lay out a long table or list over as many slides as needed.")
+    parser.add_argument("rows", type=Path, help="CSV file; its first row is the header unless --list is given")
+    parser.add_argument("--title", required=True, help="slide title, followed by '(suite)' on continuation slides")
+    parser.add_argument("--list", action="store_true", help="lay out the first column as a bulleted list")
+    parser.add_argument("--widths", default=None, help="relative column widths, e.g. 1,2 (default: equal)")
+    parser.add_argument("--font-size", type=float, default=DEFAULT_FONT_SIZE)
+    parser.add_argument("-o", "--output", type=Path, default=None, help="write a .pptx deck of the table slides")
+    parser.add_argument("--google", type=Path, default=None, help="write the Google Slides requests as JSON")
+    args = parser.parse_args(argv)
+    if args.output is None and args.google is None:
+        parser.error("give -o and/or --google")
+
+    def load():
+        header, rows = load_rows(args.rows, has_header=not args.list)
+        if args.list:
+            return None, list_rows(row[0] for row in rows)
+        return header, rows
+
+    weights = [float(weight) for weight in args.widths.split(",")] if args.widths else None
+    if args.output is not None:
+        from llm_slide_deck.lint import lint_pptx
+        from llm_slide_deck.pptx_shards import add_table_slides, new_presentation
+
+        header, rows = load()
+        prs = new_presentation()
+        n_slides = add_table_slides(prs, args.title, rows, header, weights, args.font_size)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        prs.save(str(args.output))
+        issues = list(lint_pptx(args.output))
+        print(f"{n_slides} slide(s) written to {args.output}, {len(issues)} layout issue(s).")
+    if args.google is not None:
+        import json
+
+        from llm_slide_deck._scripts import load_script
+        from llm_slide_deck.lint import lint_requests
+
+        load_script("google")
+        from slides_requests import table_slides
+
+        header, rows = load()
+        requests = [
+            json.loads(bytes(request)) for request in table_slides(args.title, rows, header, weights, args.font_size)
+        ]
+        n_slides = sum(1 for request in requests if "createSlide" in request)
+        issues = list(lint_requests(requests))
+        args.google.parent.mkdir(parents=True, exist_ok=True)
+        args.google.write_text(json.dumps(requests, ensure_ascii=False, indent=1), encoding="utf-8")
+        print(
+            f"{n_slides} slide(s), {len(requests)} request(s) written to {args.google}, {len(issues)} layout issue(s)."
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,247 @@
+"""
+Batched LLM generation pipeline: prompt jobs in, generated slide code out.
+
+Each line of the input JSONL file (e.g. `requests.jsonl`) is a job:
+
+    {"id": "preambule-pptx", "pages": [3], "format": "pptx"}
+
+`pages` are booklet pages ingested by `llm_slide_deck.ingest` (their `slides.jsonl`), `format` is one of
+the deck formats of this repository, and an optional `instructions` field is appended to the prompt.
+Jobs run concurrently on a bounded thread pool, with at most a few jobs per worker in flight, and the
+results are streamed to the output JSONL file as they complete (not in input order).
+
+Responses are cached on disk keyed by the hash of the backend, model and prompt, so re-running a batch
+only calls the model for new or changed prompts. Transient backend errors are retried with exponential
+backoff.
+
+Backends are classes with a `name`, a `model` and a `generate(prompt) -> str` method, selected with
+`--backend module:Class`. `MockBackend` is a local stand-in with configurable latency and failure rate,
+to exercise throughput, caching and retries offline.
+
+Usage:
+    uv run python -m llm_slide_deck.pipeline requests.jsonl -o build/generated.jsonl --slides build/ingest/slides.jsonl
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import importlib
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Protocol
+
+from llm_slide_deck._concurrency import submit_bounded
+
+repo_path = Path(__file__).parent.parent.resolve()
+CACHE_DIR = repo_path / ".cache" / "llm"
+
+FORMATS = {
+    "pptx": "a Python script using python-pptx that builds the slides and saves them to a .pptx file",
+    "google": "a Python function returning the Google Slides API batchUpdate requests that build the slides",
+    "html": "a standalone HTML/CSS page rendering the slides with a 16:9 aspect ratio",
+    "quarto": "a Quarto Reveal.js (.qmd) document with one section per slide",
+}
+PROMPT_TEMPLATE = """Reproduce the following pages of the EDF producer booklet as slides.
+Output {target}. Keep the original French text, the EDF colour palette and one slide per page.
+
+{pages}
+{instructions}"""
+
+
+class TransientError(Exception):
+    """A backend error worth retrying (rate limit, timeout, overloaded server)."""
+
+
+class Backend(Protocol):
+    name: str
+    model: str
+
+    def generate(self, prompt: str) -> str: ...
+
+
+class MockBackend:
+    """Local stand-in model: sleeps for a random latency, fails transiently at random, echoes the prompt."""
+
+    name = "mock"
+
+    def __init__(self, model: str = "mock-1", latency: float = 0.05, failure_rate: float = 0.1, seed: int = 0):
+        self.model = model
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            delay = self._random.uniform(0.5, 1.5) * self.latency
+            fail = self._random.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            raise TransientError("mock backend overloaded")
+        first_line = prompt.splitlines()[0]
+        return f"# Generated by {self.model} ({len(prompt)} prompt characters)\n# {first_line}\n"
+
+
+def load_backend(spec: str, **kwargs) -> Backend:
+    """Instantiate a backend from a `module:Class` spec (`mock` is a shortcut for `MockBackend`)."""
+    if spec == "mock":
+        return MockBackend(**kwargs)
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
+
+
+def load_jobs(path: Path) -> Iterator[dict]:
+    """Stream jobs from a JSONL file, skipping blank lines."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_slides(path: Optional[Path]) -> dict[int, dict]:
+    """Load the slide content produced by `llm_slide_deck.ingest`, keyed by page number."""
+    if path is None or not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {slide["page"]: slide for slide in map(json.loads, f)}
+
+
+def build_prompt(job: dict, slides: dict[int, dict]) -> str:
+    """Render the prompt of a job from the content of its source pages."""
+    if job.get("format") not in FORMATS:
+        raise ValueError(f"unknown format {job.get('format')!r}, expected one of {', '.join(FORMATS)}")
+    pages = []
+    for number in job.get("pages", []):
+        if number not in slides:
+            raise KeyError(f"page {number} has not been ingested")
+        slide = slides[number]
+        paragraphs = "\n".join(f"- {paragraph}" for paragraph in slide["paragraphs"])
+        pages.append(f"## Page {number}: {slide['title']}\n{paragraphs}")
+    return PROMPT_TEMPLATE.format(
+        target=FORMATS[job["format"]], pages="\n\n".join(pages), instructions=job.get("instructions", "")
+    ).strip()
+
+
+class ResponseCache:
+    """On-disk cache of model responses, keyed by the hash of backend, model and prompt."""
+
+    def __init__(self, directory: Path = CACHE_DIR):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, backend: Backend, prompt: str) -> str:
+        return hashlib.sha256(f"{backend.name}\0{backend.model}\0{prompt}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.directory / f"{key}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))["response"]
+
+    def put(self, key: str, response: str):
+        path = self.directory / f"{key}.json"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({"response": response}, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+def run_job(
+    job: dict, slides: dict[int, dict], backend: Backend, cache: ResponseCache, max_retries: int, backoff: float
+) -> dict:
+    """Run one job, using the cache and retrying transient errors. Returns its result record."""
+    start = time.perf_counter()
+    prompt = build_prompt(job, slides)
+    key = cache.key(backend, prompt)
+    result = {"id": job.get("id"), "format": job["format"], "prompt_hash": key, "cached": False, "attempts": 0}
+    response = cache.get(key)
+    if response is not None:
+        result["cached"] = True
+    else:
+        for attempt in range(max_retries + 1):
+            result["attempts"] = attempt + 1
+            try:
+                response = backend.generate(prompt)
+                break
+            except TransientError:
+                if attempt == max_retries:
+                    raise
+                time.sleep(backoff * 2**attempt * random.uniform(0.5, 1.0))
+        cache.put(key, response)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    result["output"] = response
+    return result
+
+
+def run_pipeline(
+    jobs_path: Path,
+    output_path: Path,
+    backend: Backend,
+    slides: dict[int, dict],
+    workers: int = 8,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+) -> dict:
+    """Run every job of `jobs_path` and stream the results to `output_path`. Returns summary counters."""
+    cache = ResponseCache()
+    stats = {"jobs": 0, "ok": 0, "failed": 0, "cached": 0, "retries": 0}
+    start = time.perf_counter()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with (
+        concurrent.futures.ThreadPoolExecutor(workers) as pool,
+        open(output_path, "w", encoding="utf-8") as output,
+    ):
+
+        def submit(job):
+            return pool.submit(run_job, job, slides, backend, cache, max_retries, backoff)
+
+        for job, future in submit_bounded(submit, load_jobs(jobs_path), 4 * workers):
+            stats["jobs"] += 1
+            error = future.exception()
+            if error is None:
+                result = future.result()
+                stats["ok"] += 1
+                stats["cached"] += result["cached"]
+                stats["retries"] += max(0, result["attempts"] - 1)
+            else:
+                result = {"id": job.get("id"), "error": f"{type(error).__name__}: {error}"}
+                stats["failed"] += 1
+                print(f"Job {job.get('id')} failed: {result['error']}")
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    stats["jobs_per_second"] = round(stats["jobs"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    return stats
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run batched LLM generation jobs from a JSONL file.")
+    parser.add_argument("jobs", type=Path, help="JSONL file of jobs, e.g. requests.jsonl")
+    parser.add_argument("-o", "--output", type=Path, default=Path("build/generated.jsonl"))
+    parser.add_argument("--slides", type=Path, default=Path("build/ingest/slides.jsonl"), help="ingested pages")
+    parser.add_argument("--backend", default="mock", help="'mock' or a module:Class backend")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("-w", "--workers", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--mock-latency", type=float, default=0.05, help="mock backend latency in seconds")
+    parser.add_argument("--mock-failure-rate", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    kwargs = {"model": args.model} if args.model else {}
+    if args.backend == "mock":
+        kwargs.update(latency=args.mock_latency, failure_rate=args.mock_failure_rate)
+    backend = load_backend(args.backend, **kwargs)
+    stats = run_pipeline(args.jobs, args.output, backend, load_slides(args.slides), args.workers, args.retries)
+    print(
+        f"{stats['ok']}/{stats['jobs']} job(s) succeeded ({stats['cached']} from cache, {stats['retries']} retries, "
+        f"{stats['failed']} failed) in {stats['seconds']}s ({stats['jobs_per_second']} jobs/s)."
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,393 @@
+"""
+Slide-sharded parallel build of long PowerPoint decks.
+
+A python-pptx `Presentation` can only be built by one thread, so a deck of thousands of slides builds on
+one core. Here the slide content is split into ranges, each range is built into its own mini-package
+by a worker process, and the packages are merged into a single .pptx:
+
+- the slides of every shard after the first are renamed after the slides already merged
+  (`ppt/slides/slideN.xml`), and get new relationship IDs and `sldId`s in the presentation,
+- media are deduplicated by SHA-1 across shards and named `ppt/media/imageN.ext` in order of first use,
+  the way python-pptx names them within one package,
+- shape IDs are scoped to their slide, so slide XML is copied unchanged.
+
+All shards are built from the same base template, which the merge takes from the first shard. The
+merged package holds the same parts, with the same bytes and in the same order, as a serial build of
+the same slides; `--check` builds both and compares them.
+
+Long tables and lists are drawn over as many slides as needed by `add_table_slides`, with the layout
+of `llm_slide_deck.pagination`.
+
+Usage:
+    uv run python -m llm_slide_deck.pptx_shards build/ingest/slides.jsonl --repeat 400 -o build/deck.pptx -w 8
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import os
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from lxml import etree
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
+from pptx.util import Inches, Pt
+
+from llm_slide_deck.pagination import DEFAULT_FONT_SIZE, column_widths, paginate
+
+repo_path = Path(__file__).parent.parent.resolve()
+LOGO_PATH = repo_path / "images" / "edf-logo.png"
+
+# Colours of the content slides of the PowerPoint deck
+HEADER_ORANGE = RGBColor(245, 125, 0)
+TEXT_GRAY = RGBColor(84, 84, 84)
+WHITE = RGBColor(255, 255, 255)
+ROW_GRAY = RGBColor(242, 242, 242)
+PICTURE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff"}
+# Area of the table slides (left, top, width, height), in points: below the header, above the logo
+TABLE_AREA = (36.0, 108.0, 648.0, 374.0)
+
+NS_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_TYPES = "http://schemas.openxmlformats.org/package/2006/content-types"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+SLIDE_RELTYPE = f"{NS_R}/slide"
+SLIDE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+
+
+# --- Slides ---
+
+
+def new_presentation():
+    prs = Presentation()
+    prs.slide_width = Inches(10)
+    prs.slide_height = Inches(7.5)
+    return prs
+
+
+def _add_titled_slide(prs, title: str):
+    """Add a blank slide with the orange header and its title."""
+    page = prs.slides.add_slide(prs.slide_layouts[6])
+    header = page.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, Inches(1.2))
+    header.fill.solid()
+    header.fill.fore_color.rgb = HEADER_ORANGE
+    header.line.fill.background()
+    if title:
+        paragraph = page.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(9), Inches(0.7)).text_frame.paragraphs[0]
+        paragraph.text = title
+        paragraph.font.size = Pt(28)
+        paragraph.font.bold = True
+        paragraph.font.color.rgb = WHITE
+    return page
+
+
+def add_content_slide(prs, slide: dict):
+    """Add a content slide (orange header, title, paragraphs, first picture, logo), in the style of slide 3."""
+    page = _add_titled_slide(prs, slide.get("title"))
+    pictures = [path for path in slide.get("images", []) if Path(path).suffix.lower() in PICTURE_EXTENSIONS]
+    body_width = Inches(6) if pictures else Inches(9)
+    if slide.get("paragraphs"):
+        text_frame = page.shapes.add_textbox(Inches(0.5), Inches(1.5), body_width, Inches(5)).text_frame
+        text_frame.word_wrap = True
+        for i, text in enumerate(slide["paragraphs"]):
+            paragraph = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+            paragraph.text = text
+            paragraph.font.size = Pt(14)
+            paragraph.font.color.rgb = TEXT_GRAY
+    if pictures:
+        page.shapes.add_picture(pictures[0], Inches(6.8), Inches(1.5), width=Inches(2.7))
+    page.shapes.add_picture(str(LOGO_PATH), Inches(8.5), Inches(6.8), width=Inches(1))
+    return page
+
+
+def _add_cell(page, left: float, top: float, width: float, height: float, text: str, fill, color, font_size, bold):
+    cell = page.shapes.add_shape(MSO_SHAPE.RECTANGLE, Pt(left), Pt(top), Pt(width), Pt(height))
+    cell.fill.solid()
+    cell.fill.fore_color.rgb = fill
+    cell.line.fill.background()
+    text_frame = cell.text_frame
+    text_frame.word_wrap = True
+    text_frame.vertical_anchor = MSO_ANCHOR.TOP
+    for i, line in enumerate(text.split("\n")):
+        paragraph = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+        paragraph.alignment = PP_ALIGN.LEFT
+        paragraph.text = line
+        paragraph.font.size = Pt(font_size)
+        paragraph.font.bold = bold
+        paragraph.font.color.rgb = color
+
+
+def add_table_slides(
+    prs,
+    title: str,
+    rows: Iterable[Sequence[str]],
+    header: Optional[Sequence[str]] = None,
+    weights: Optional[Sequence[float]] = None,
+    font_size: float = DEFAULT_FONT_SIZE,
+) -> int:
+    """
+    Add a table (or a list, with a single column and no header) over as many slides as needed.
+
+    Continuation slides are titled "<title> (suite)" and repeat the header row. Returns the number of slides.
+    """
+    left, top, width, height = TABLE_AREA
+    n_columns = len(header) if header is not None else 1
+    widths = column_widths(weights or [1.0] * n_columns, width)
+    lefts = [left + sum(widths[:i]) for i in range(n_columns)]
+    n_slides = 0
+    for page in paginate(rows, widths, height, font_size, header):
+        slide = _add_titled_slide(prs, f"{title} (suite)" if page.continued else title)
+        placed = ([page.header] if page.header else []) + page.rows
+        for row in placed:
+            is_header = row.index < 0
+            fill = TEXT_GRAY if is_header else (ROW_GRAY if row.index % 2 else WHITE)
+            color = WHITE if is_header else TEXT_GRAY
+            for cell_left, cell_width, text in zip(lefts, widths, row.cells):
+                _add_cell(
+                    slide, cell_left, top + row.top, cell_width, row.height, text, fill, color, font_size, is_header
+                )
+        slide.shapes.add_picture(str(LOGO_PATH), Inches(8.5), Inches(6.8), width=Inches(1))
+        n_slides += 1
+    return n_slides
+
+
+def build_deck(slides: list[dict], output_path: Path):
+    """Build the content slides serially into `output_path`."""
+    prs = new_presentation()
+    for slide in slides:
+        add_content_slide(prs, slide)
+    prs.save(str(output_path))
+
+
+# --- Package merge ---
+
+
+def _rels_name(name: str) -> str:
+    folder, _, base = name.rpartition("/")
+    return f"{folder}/_rels/{base}.rels"
+
+
+def _rid_number(rid: str) -> int:
+    return int(rid[3:]) if rid.startswith("rId") and rid[3:].isdigit() else 0
+
+
+def _serialize(element) -> bytes:
+    # Same serialisation as python-pptx parts
+    return etree.tostring(element, encoding="UTF-8", standalone=True)
+
+
+def _slide_names(package: zipfile.ZipFile) -> list[str]:
+    """Return the slide part names of a package, in presentation order."""
+    targets = {
+        rel.get("Id"): rel.get("Target")
+        for rel in etree.fromstring(package.read("ppt/_rels/presentation.xml.rels"))
+        if rel.get("Type") == SLIDE_RELTYPE
+    }
+    presentation = etree.fromstring(package.read("ppt/presentation.xml"))
+    return [f"ppt/{targets[sld_id.get(f'{{{NS_R}}}id')]}" for sld_id in presentation.iter(f"{{{NS_P}}}sldId")]
+
+
+class PackageMerger:
+    """Appends the slides of other packages built from the same template to a base package."""
+
+    def __init__(self, base_path: Path):
+        self.base = zipfile.ZipFile(base_path)
+        self.presentation = etree.fromstring(self.base.read("ppt/presentation.xml"))
+        self.presentation_rels = etree.fromstring(self.base.read("ppt/_rels/presentation.xml.rels"))
+        self.content_types = etree.fromstring(self.base.read("[Content_Types].xml"))
+        self.n_slides = len(_slide_names(self.base))
+        self.media: dict[str, str] = {}
+        for name in self.base.namelist():
+            if name.startswith("ppt/media/"):
+                self.media[hashlib.sha1(self.base.read(name)).hexdigest()] = name
+        self.rids = {rel.get("Id") for rel in self.presentation_rels}
+        self.next_slide_id = (
+            max((int(s.get("id")) for s in self.presentation.iter(f"{{{NS_P}}}sldId")), default=255) + 1
+        )
+        # Merged media names by (source package, part name), so each media part is hashed once
+        self.media_names: dict[tuple[str, str], str] = {}
+        # Parts appended after the slides of the base package: (name, source package, source name or bytes)
+        self.added: list[tuple[str, Optional[zipfile.ZipFile], object]] = []
+        self.sources: list[zipfile.ZipFile] = []
+
+    def _next_rid(self) -> str:
+        # First unused rId, like python-pptx
+        rid = next(f"rId{n}" for n in range(len(self.rids) + 1, 0, -1) if f"rId{n}" not in self.rids)
+        self.rids.add(rid)
+        return rid
+
+    def _add_media(self, package: zipfile.ZipFile, name: str, new_parts: list) -> str:
+        """Return the merged name of a media part, adding it to `new_parts` unless the same bytes are already in."""
+        key = (package.filename, name)
+        if key in self.media_names:
+            return self.media_names[key]
+        digest = hashlib.sha1(package.read(name)).hexdigest()
+        if digest not in self.media:
+            ext = name.rsplit(".", 1)[-1]
+            self.media[digest] = f"ppt/media/image{len(self.media) + 1}.{ext}"
+            new_parts.append((self.media[digest], package, name))
+            defaults = {
+                default.get("Extension").lower() for default in self.content_types.iter(f"{{{NS_TYPES}}}Default")
+            }
+            if ext.lower() not in defaults:
+                types = etree.fromstring(package.read("[Content_Types].xml"))
+                self.content_types.append(
+                    next(d for d in types.iter(f"{{{NS_TYPES}}}Default") if d.get("Extension") == ext)
+                )
+        self.media_names[key] = self.media[digest]
+        return self.media[digest]
+
+    def append(self, path: Path):
+        """Append the slides of the package at `path`."""
+        package = zipfile.ZipFile(path)
+        self.sources.append(package)
+        slide_list = self.presentation.find(f"{{{NS_P}}}sldIdLst")
+        for slide_name in _slide_names(package):
+            self.n_slides += 1
+            name = f"ppt/slides/slide{self.n_slides}.xml"
+            rels = etree.fromstring(package.read(_rels_name(slide_name)))
+            new_media: list = []
+            for rel in rels:
+                target = rel.get("Target")
+                if target.startswith("../media/"):
+                    media_name = self._add_media(package, "ppt/media/" + target.removeprefix("../media/"), new_media)
+                    rel.set("Target", "../media/" + media_name.removeprefix("ppt/media/"))
+            # Same order as python-pptx: the slide, its relationships, then the media it uses first
+            self.added += [(name, package, slide_name), (_rels_name(name), None, _serialize(rels)), *new_media]
+
+            rid = self._next_rid()
+            etree.SubElement(
+                self.presentation_rels, f"{{{NS_RELS}}}Relationship", Id=rid, Type=SLIDE_RELTYPE, Target=name[4:]
+            )
+            etree.SubElement(slide_list, f"{{{NS_P}}}sldId", {"id": str(self.next_slide_id), f"{{{NS_R}}}id": rid})
+            self.next_slide_id += 1
+            etree.SubElement(
+                self.content_types, f"{{{NS_TYPES}}}Override", PartName=f"/{name}", ContentType=SLIDE_CONTENT_TYPE
+            )
+
+    def _content_types(self) -> bytes:
+        # Defaults sorted by extension and overrides by part name, like python-pptx
+        defaults = sorted(self.content_types.iter(f"{{{NS_TYPES}}}Default"), key=lambda d: d.get("Extension"))
+        overrides = sorted(self.content_types.iter(f"{{{NS_TYPES}}}Override"), key=lambda o: o.get("PartName"))
+        types = etree.Element(f"{{{NS_TYPES}}}Types", nsmap={None: NS_TYPES})
+        types.extend(defaults + overrides)
+        return _serialize(types)
+
+    def _presentation_rels(self) -> bytes:
+        rels = sorted(self.presentation_rels, key=lambda rel: _rid_number(rel.get("Id")))
+        element = etree.Element(f"{{{NS_RELS}}}Relationships", nsmap={None: NS_RELS})
+        element.extend(rels)
+        return _serialize(element)
+
+    def write(self, output_path: Path):
+        """Write the merged package, streaming the parts from the shard packages."""
+        replaced = {
+            "[Content_Types].xml": self._content_types(),
+            "ppt/presentation.xml": _serialize(self.presentation),
+            "ppt/_rels/presentation.xml.rels": self._presentation_rels(),
+        }
+        names = self.base.namelist()
+        # The parts of the slides come last in the presentation part's relationships, so python-pptx writes
+        # them after every template part it reaches from the presentation: that is where the new ones go
+        slide_parts = [i for i, name in enumerate(names) if name.startswith(("ppt/slides/", "ppt/media/"))]
+        insert_at = slide_parts[-1] + 1 if slide_parts else len(names)
+        tmp_path = output_path.with_suffix(f".{os.getpid()}.tmp")
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as output:
+            for name in names[:insert_at]:
+                output.writestr(name, replaced.get(name) or self.base.read(name))
+            for name, package, source in self.added:
+                output.writestr(name, package.read(source) if package is not None else source)
+            for name in names[insert_at:]:
+                output.writestr(name, replaced.get(name) or self.base.read(name))
+        tmp_path.replace(output_path)
+
+    def close(self):
+        for package in [self.base, *self.sources]:
+            package.close()
+
+
+def merge_packages(paths: list[Path], output_path: Path):
+    """Merge packages built from the same template into one deck, with their slides in order."""
+    if not paths:
+        raise ValueError("no packages to merge")
+    merger = PackageMerger(paths[0])
+    try:
+        for path in paths[1:]:
+            merger.append(path)
+        merger.write(output_path)
+    finally:
+        merger.close()
+
+
+# --- Sharded build ---
+
+
+def _build_shard(slides: list[dict], path: Path) -> Path:
+    build_deck(slides, path)
+    return path
+
+
+def build_sharded(slides: list[dict], output_path: Path, workers: int, shard_size: Optional[int] = None) -> dict:
+    """Build the slides in shards on `workers` processes and merge them. Returns the build and merge times."""
+    shard_size = shard_size or max(1, -(-len(slides) // workers))
+    # An empty deck is still built, as a single empty shard
+    shards = [slides[i : i + shard_size] for i in range(0, len(slides), shard_size)] or [[]]
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / f"shard-{i:04d}.pptx" for i in range(len(shards))]
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            list(pool.map(_build_shard, shards, paths))
+        built = time.perf_counter()
+        merge_packages(paths, output_path)
+    return {"shards": len(shards), "build_seconds": built - start, "merge_seconds": time.perf_counter() - built}
+
+
+def compare_packages(first: Path, second: Path) -> list[str]:
+    """Return the names of the parts that differ between two packages (or are missing from one), or their order."""
+    with zipfile.ZipFile(first) as a, zipfile.ZipFile(second) as b:
+        names_a, names_b = a.namelist(), b.namelist()
+        differences = sorted(set(names_a) ^ set(names_b))
+        differences += [name for name in names_a if name in set(names_b) and a.read(name) != b.read(name)]
+        if not differences and names_a != names_b:
+            differences.append("(part order)")
+    return differences
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build a long PowerPoint deck in parallel slide shards.")
+    parser.add_argument("slides", type=Path, help="slide content JSONL (from llm_slide_deck.ingest)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("build/content_deck.pptx"))
+    parser.add_argument("--repeat", type=int, default=1, help="repeat the slides, to try out long decks")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=None, help="slides per shard (default: one per worker)")
+    parser.add_argument("--check", action="store_true", help="also build serially and compare the packages")
+    args = parser.parse_args(argv)
+
+    from llm_slide_deck.html_deck import load_slides
+
+    slides = [slide for _ in range(args.repeat) for slide in load_slides(args.slides)]
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    stats = build_sharded(slides, args.output, args.workers, args.shard_size)
+    print(
+        f"{len(slides)} slides in {stats['shards']} shard(s) on {args.workers} worker(s): "
+        f"build {stats['build_seconds']:.2f}s, merge {stats['merge_seconds']:.2f}s -> {args.output}"
+    )
+    if args.check:
+        serial_path = args.output.with_name(f"{args.output.stem}.serial.pptx")
+        start = time.perf_counter()
+        build_deck(slides, serial_path)
+        print(f"Serial build: {time.perf_counter() - start:.2f}s -> {serial_path}")
+        differences = compare_packages(serial_path, args.output)
+        print("Identical parts." if not differences else f"Differences: {', '.join(differences[:10])}")
+        return 1 if differences else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,305 @@
+"""
+Pure-Python slide rasterizer for PNG thumbnails and previews.
+
+Draws the subset of DrawingML the generators use with Pillow: rectangles and ovals with solid fills
+(including `a:alpha` transparency) and outlines, pictures, and text frames with word wrapping,
+alignment and vertical anchoring. Other preset geometries are drawn as rectangles, and anything else
+(tables, charts, connectors, groups) as the grey outline of its bounding rectangle. It is meant for
+previews on a headless box without an office suite, not for pixel-exact output.
+
+Each slide is cached as a PNG keyed by the hash of its XML, of the media it references and of the
+resolution, so re-rendering a deck only redraws the slides that changed.
+
+Usage:
+    uv run python -m llm_slide_deck.render powerpoint/EDF_Presentation_powerpoint_slides.pptx -o previews/
+"""
+
+import argparse
+import functools
+import hashlib
+import io
+import time
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from llm_slide_deck.lint import EMU_PER_PT
+
+repo_path = Path(__file__).parent.parent.resolve()
+CACHE_DIR = repo_path / ".cache" / "render"
+# Part of the cache key: bump it when a change to the renderer changes its output
+RENDER_VERSION = 1
+
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+}
+# Colours of the default Office theme, used for shapes styled by theme references
+THEME_COLORS = {
+    "accent1": "4472C4",
+    "accent2": "ED7D31",
+    "accent3": "A5A5A5",
+    "accent4": "FFC000",
+    "accent5": "5B9BD5",
+    "accent6": "70AD47",
+    "lt1": "FFFFFF",
+    "dk1": "000000",
+    "tx1": "000000",
+    "bg1": "FFFFFF",
+}
+FONT_FILES = {
+    False: ("DejaVuSans.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"),
+    True: ("DejaVuSans-Bold.ttf", "Arial Bold.ttf", "LiberationSans-Bold.ttf"),
+}
+DEFAULT_FONT_SIZE = 18.0
+LINE_SPACING = 1.2
+# Outline of the bounding rectangle of shapes that are not drawn
+UNSUPPORTED_OUTLINE = (160, 160, 160, 255)
+# Default text frame insets (0.1in left/right, 0.05in top/bottom), in points
+INSET_X, INSET_Y = 7.2, 3.6
+
+
+@functools.lru_cache(maxsize=128)
+def get_font(size_px: int, bold: bool = False) -> ImageFont.ImageFont:
+    """Return a TrueType font of `size_px` pixels, falling back to Pillow's bundled font."""
+    for name in FONT_FILES[bold]:
+        try:
+            return ImageFont.truetype(name, size_px)
+        except OSError:
+            continue
+    return ImageFont.load_default(size_px)
+
+
+def _color(parent, default: Optional[tuple[int, int, int, int]]) -> Optional[tuple[int, int, int, int]]:
+    """Read the RGBA colour of a `solidFill`-like element (srgbClr or schemeClr, with optional alpha)."""
+    if parent is None:
+        return default
+    for tag in ("a:srgbClr", "a:schemeClr"):
+        node = parent.find(tag, NS)
+        if node is None:
+            continue
+        value = node.get("val")
+        hex_value = value if tag == "a:srgbClr" else THEME_COLORS.get(value, "000000")
+        alpha = node.find("a:alpha", NS)
+        opacity = int(alpha.get("val")) / 100000 if alpha is not None else 1.0
+        return (*bytes.fromhex(hex_value), round(255 * opacity))
+    return default
+
+
+def _shape_fill(sp) -> tuple[Optional[tuple], Optional[tuple]]:
+    """Return the (fill, outline) RGBA colours of a `p:sp`, following its style when not set explicitly."""
+    sp_pr = sp.find("p:spPr", NS)
+    style = sp.find("p:style", NS)
+    styled_fill = _color(style.find("a:fillRef", NS), None) if style is not None else None
+    styled_line = _color(style.find("a:lnRef", NS), None) if style is not None else None
+    if styled_line is not None:
+        # Office shades the line of the default shape style
+        styled_line = tuple(round(c * 0.5) for c in styled_line[:3]) + (styled_line[3],)
+
+    fill = styled_fill
+    if sp_pr.find("a:noFill", NS) is not None:
+        fill = None
+    elif sp_pr.find("a:solidFill", NS) is not None:
+        fill = _color(sp_pr.find("a:solidFill", NS), styled_fill)
+    line = styled_line
+    ln = sp_pr.find("a:ln", NS)
+    if ln is not None:
+        if ln.find("a:noFill", NS) is not None:
+            line = None
+        elif ln.find("a:solidFill", NS) is not None:
+            line = _color(ln.find("a:solidFill", NS), styled_line)
+    return fill, line
+
+
+def _wrap(text: str, font, width: float) -> list[str]:
+    """Greedy word wrap of a single paragraph to `width` pixels."""
+    lines, current = [], ""
+    for word in text.split(" "):
+        candidate = f"{current} {word}" if current else word
+        if current and font.getlength(candidate) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    lines.append(current)
+    return lines
+
+
+def _draw_text(draw: ImageDraw.ImageDraw, shape, box: tuple[float, float, float, float], scale: float):
+    """Draw the text frame of `shape` inside `box` (pixels)."""
+    sp = shape._element
+    body_pr = sp.find(".//a:bodyPr", NS)
+    wrap = body_pr is None or body_pr.get("wrap") != "none"
+    anchor = body_pr.get("anchor", "t") if body_pr is not None else "t"
+    style = sp.find("p:style", NS)
+    default_color = _color(style.find("a:fontRef", NS), (0, 0, 0, 255)) if style is not None else (0, 0, 0, 255)
+
+    left, top, right, bottom = box
+    inner_width = right - left - 2 * INSET_X * scale
+    lines = []  # (text, font, colour, alignment, height)
+    for paragraph in shape.text_frame.paragraphs:
+        run_font = paragraph.runs[0].font if paragraph.runs else paragraph.font
+        size = run_font.size or paragraph.font.size
+        size_pt = size.pt if size is not None else DEFAULT_FONT_SIZE
+        bold = bool(run_font.bold or paragraph.font.bold)
+        font = get_font(max(1, round(size_pt * scale)), bold)
+        rgb = None
+        for candidate in (run_font, paragraph.font):
+            try:
+                rgb = candidate.color.rgb
+            except AttributeError:
+                rgb = None
+            if rgb is not None:
+                break
+        color = (*rgb, 255) if rgb is not None else default_color
+        alignment = paragraph.alignment
+        align = {1: "left", 2: "center", 3: "right"}.get(int(alignment) if alignment is not None else 1, "left")
+        text = paragraph.text
+        # Vertical tabs are how python-pptx stores line breaks inside a paragraph
+        for segment in text.replace("\v", "\n").split("\n"):
+            wrapped = _wrap(segment, font, inner_width) if wrap else [segment]
+            for line in wrapped:
+                lines.append((line, font, color, align, size_pt * LINE_SPACING * scale))
+
+    total_height = sum(line[4] for line in lines)
+    if anchor == "ctr":
+        y = (top + bottom - total_height) / 2
+    elif anchor == "b":
+        y = bottom - INSET_Y * scale - total_height
+    else:
+        y = top + INSET_Y * scale
+    for text, font, color, align, height in lines:
+        x = left + INSET_X * scale
+        if align != "left":
+            free = inner_width - font.getlength(text)
+            x += free / 2 if align == "center" else free
+        draw.text((x, y), text, font=font, fill=color)
+        y += height
+
+
+# Decoded and resized pictures, keyed by (image SHA-1, pixel size): logos repeat on every slide
+_pictures: dict[tuple[str, tuple[int, int]], Image.Image] = {}
+MAX_CACHED_PICTURES = 64
+
+
+def _decoded_picture(image, size: tuple[int, int]) -> Image.Image:
+    key = (image.sha1, size)
+    if key not in _pictures:
+        if len(_pictures) >= MAX_CACHED_PICTURES:
+            _pictures.pop(next(iter(_pictures)))
+        with Image.open(io.BytesIO(image.blob)) as decoded:
+            _pictures[key] = decoded.convert("RGBA").resize(size, Image.Resampling.BILINEAR)
+    return _pictures[key]
+
+
+def render_slide(slide, slide_size: tuple[int, int], dpi: float) -> Image.Image:
+    """Rasterize a python-pptx slide to an RGB image of the given resolution."""
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+    scale = dpi / 72  # pixels per point
+    width = round(slide_size[0] / EMU_PER_PT * scale)
+    height = round(slide_size[1] / EMU_PER_PT * scale)
+    canvas = Image.new("RGBA", (width, height), (255, 255, 255, 255))
+
+    for shape in slide.shapes:
+        if shape.left is None or shape.width is None:
+            continue
+        box = (
+            shape.left / EMU_PER_PT * scale,
+            shape.top / EMU_PER_PT * scale,
+            (shape.left + shape.width) / EMU_PER_PT * scale,
+            (shape.top + shape.height) / EMU_PER_PT * scale,
+        )
+        size = (max(1, round(box[2] - box[0])), max(1, round(box[3] - box[1])))
+        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+            picture = _decoded_picture(shape.image, size)
+            canvas.alpha_composite(picture, (round(box[0]), round(box[1])))
+            continue
+
+        if shape._element.tag == f"{{{NS['p']}}}sp":
+            fill, line = _shape_fill(shape._element)
+            geometry = shape._element.find(".//a:prstGeom", NS)
+            oval = geometry is not None and geometry.get("prst") == "ellipse"
+            if fill is not None or line is not None:
+                # Draw on a layer so that transparent fills blend with what is underneath
+                layer = Image.new("RGBA", size, (0, 0, 0, 0))
+                layer_draw = ImageDraw.Draw(layer)
+                outline_width = max(1, round(0.75 * scale)) if line is not None else 0
+                (layer_draw.ellipse if oval else layer_draw.rectangle)(
+                    (0, 0, size[0] - 1, size[1] - 1), fill=fill, outline=line, width=outline_width
+                )
+                canvas.alpha_composite(layer, (round(box[0]), round(box[1])))
+        else:
+            ImageDraw.Draw(canvas).rectangle(box, outline=UNSUPPORTED_OUTLINE, width=max(1, round(0.75 * scale)))
+
+        if shape.has_text_frame and shape.text_frame.text:
+            _draw_text(ImageDraw.Draw(canvas), shape, box, scale)
+
+    return canvas.convert("RGB")
+
+
+def slide_cache_key(slide, slide_size: tuple[int, int], dpi: float) -> str:
+    """Hash of the slide XML, of the media it references, of the slide size and resolution and of the renderer."""
+    digest = hashlib.sha1(f"v{RENDER_VERSION}:{slide_size[0]}x{slide_size[1]}:".encode())
+    digest.update(slide.part.blob)
+    for rel in sorted(slide.part.rels.values(), key=lambda rel: rel.rId):
+        if not rel.is_external and "image" in rel.reltype:
+            digest.update(rel.target_part.blob)
+    digest.update(str(dpi).encode())
+    return digest.hexdigest()
+
+
+def render_deck(path: Path, output_dir: Path, dpi: float = 48, use_cache: bool = True) -> list[Path]:
+    """Render every slide of a .pptx to `output_dir/slide-NNN.png` and return the image paths."""
+    from pptx import Presentation
+
+    prs = Presentation(str(path))
+    slide_size = (prs.slide_width, prs.slide_height)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index, slide in enumerate(prs.slides, start=1):
+        output = output_dir / f"slide-{index:03d}.png"
+        cached = CACHE_DIR / f"{slide_cache_key(slide, slide_size, dpi)}.png"
+        if not (use_cache and cached.exists()):
+            render_slide(slide, slide_size, dpi).save(cached, optimize=False)
+        output.write_bytes(cached.read_bytes())
+        paths.append(output)
+    return paths
+
+
+def contact_sheet(images: list[Path], columns: int = 5, margin: int = 8) -> Image.Image:
+    """Assemble slide images into a single preview strip (a grid of `columns` thumbnails per row)."""
+    if not images:
+        raise ValueError("a contact sheet needs at least one slide image")
+    thumbnails = [Image.open(path) for path in images]
+    width, height = thumbnails[0].size
+    rows = -(-len(thumbnails) // columns)
+    sheet = Image.new("RGB", (columns * (width + margin) + margin, rows * (height + margin) + margin), (235, 235, 235))
+    for i, thumbnail in enumerate(thumbnails):
+        sheet.paste(thumbnail, (margin + (i % columns) * (width + margin), margin + (i // columns) * (height + margin)))
+        thumbnail.close()
+    return sheet
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render the slides of a .pptx to PNG thumbnails.")
+    parser.add_argument("deck", type=Path)
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("previews"))
+    parser.add_argument("--dpi", type=float, default=48, help="resolution, 48 gives 480x360 px for a 10x7.5in slide")
+    parser.add_argument("--strip", type=Path, help="also write a contact sheet of all slides to this PNG")
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    paths = render_deck(args.deck, args.output_dir, args.dpi, use_cache=not args.no_cache)
+    if args.strip and paths:
+        contact_sheet(paths, args.columns).save(args.strip)
+    print(f"Rendered {len(paths)} slide(s) to {args.output_dir} in {time.perf_counter() - start:.2f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,287 @@
+"""
+Responsive image variants for the Quarto and HTML decks.
+
+Every image of `images/` is encoded as AVIF, WebP and a JPEG (or PNG, for images with transparency)
+fallback at a ladder of widths, never upscaled. Variants are cached under `.cache/responsive`, named by
+the hash of the source file, so only new or changed images are re-encoded.
+
+The decks are then rewritten into an output site directory, with the variants in its `images/` folder:
+
+- `<img>` tags become `<picture>` elements with one `srcset` per format,
+- CSS backgrounds keep a fallback `url()` followed by an `image-set()` of the modern formats at 1x/2x,
+- Reveal.js `data-background-image` attributes, which only take one URL, point to a WebP variant,
+- the first background of the deck (the title slide) gets a `<link rel="preload">` hint for the variant it uses.
+
+Usage:
+    uv run python -m llm_slide_deck.responsive -o build/site
+"""
+
+import argparse
+import html
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from PIL import Image
+
+from llm_slide_deck.assets import file_hash
+
+repo_path = Path(__file__).parent.parent.resolve()
+CACHE_DIR = repo_path / ".cache" / "responsive"
+
+WIDTHS = (320, 640, 960, 1280, 1920)
+# Encoders by format: (MIME type, file extension, Pillow save options)
+ENCODERS = {
+    "avif": ("image/avif", ".avif", {"quality": 55, "speed": 6}),
+    "webp": ("image/webp", ".webp", {"quality": 78, "method": 6}),
+    "jpeg": ("image/jpeg", ".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+    "png": ("image/png", ".png", {"optimize": True}),
+}
+# Display width of the decks in CSS pixels (raw HTML max-width, Reveal.js width is larger but scaled)
+DECK_WIDTH = 1024
+# `sizes` of the images shown smaller than the deck, by file name. The logo is 2.2em high in text of at
+# most 2.5vw (title slide), so 5.5vw high and 13vw wide at its 354:151 aspect ratio
+DISPLAY_SIZES = {"edf-logo.png": "13vw"}
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
+
+IMG_TAG = re.compile(r"<img\b[^>]*>")
+ATTRIBUTE = re.compile(r"([\w-]+)=\"([^\"]*)\"")
+CSS_BACKGROUND = re.compile(r"(background(?:-image)?\s*:\s*[^;{}]*?)url\(['\"]?([^'\")]+)['\"]?\)([^;{}]*);")
+DATA_BACKGROUND = re.compile(r"data-background-image=\"([^\"]+)\"")
+QMD_LOGO = re.compile(r"^(\s*logo:\s*)\"([^\"]+)\"", re.M)
+
+
+class Variant(NamedTuple):
+    path: Path
+    width: int
+    height: int
+    mime: str
+
+
+def image_variants(source: Path, widths: tuple[int, ...] = WIDTHS) -> dict[str, list[Variant]]:
+    """Return the variants of `source` by format, best format first, each list sorted by width."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    digest = file_hash(source)[:16]
+    with Image.open(source) as image:
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        ladder = sorted({w for w in widths if w < image.width} | {min(image.width, max(widths))})
+        variants: dict[str, list[Variant]] = {}
+        for format_name in ("avif", "webp", "png" if has_alpha else "jpeg"):
+            mime, extension, options = ENCODERS[format_name]
+            variants[mime] = []
+            for width in ladder:
+                height = round(image.height * width / image.width)
+                path = CACHE_DIR / f"{source.stem}-{digest}-{width}{extension}"
+                if not path.exists():
+                    resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+                    tmp_path = path.with_suffix(f".tmp{extension}")
+                    resized.save(tmp_path, format=format_name.upper(), **options)
+                    tmp_path.replace(path)
+                variants[mime].append(Variant(path, width, height, mime))
+    return variants
+
+
+class ImageSet:
+    """The variants of the images of the decks, copied to the `images/` folder of the output site."""
+
+    def __init__(self, source_dir: Path, output_dir: Path):
+        self.source_dir = source_dir
+        self.image_dir = output_dir / "images"
+        self.variants: dict[Path, dict[str, list[Variant]]] = {}
+        self.bytes_before = self.bytes_after = 0
+
+    def get(self, reference: str, base: Path) -> Optional[dict[str, list[Variant]]]:
+        """
+        Return the variants of an image referenced relatively to `base`, or None if it is not in `images/`.
+
+        Absolute references (`/images/...`) are relative to the site root, the parent of `images/`.
+        """
+        if reference.startswith("/"):
+            base, reference = self.source_dir.parent, reference.lstrip("/")
+        source = (base / reference).resolve()
+        if source.parent != self.source_dir or not source.exists():
+            return None
+        if source not in self.variants:
+            self.variants[source] = image_variants(source)
+            self.image_dir.mkdir(parents=True, exist_ok=True)
+            for variants in self.variants[source].values():
+                for variant in variants:
+                    if not (self.image_dir / variant.path.name).exists():
+                        shutil.copy2(variant.path, self.image_dir)
+            self.bytes_before += source.stat().st_size
+            self.bytes_after += min(v[-1].path.stat().st_size for v in self.variants[source].values())
+        return self.variants[source]
+
+
+def _url(reference: str, variant: Variant) -> str:
+    """URL of a variant, in the same folder as the original `reference` (relative or absolute)."""
+    folder, slash, _ = reference.rpartition("/")
+    return f"{folder}{slash}{variant.path.name}"
+
+
+def _srcset(reference: str, variants: list[Variant]) -> str:
+    return ", ".join(f"{_url(reference, v)} {v.width}w" for v in variants)
+
+
+def _pick(variants: list[Variant], width: int) -> Variant:
+    """Smallest variant at least `width` pixels wide, or the largest one."""
+    return next((v for v in variants if v.width >= width), variants[-1])
+
+
+def _display_width(sizes: str) -> int:
+    """CSS pixel width of the default (last) entry of a `sizes` value, taking vw relative to the deck width."""
+    size = sizes.rpartition(",")[2].rpartition(")")[2].strip()
+    if size.endswith("vw"):
+        return round(float(size[:-2]) * DECK_WIDTH / 100)
+    return round(float(size.removesuffix("px")))
+
+
+def picture_html(tag: str, reference: str, variants: dict[str, list[Variant]], sizes: Optional[str] = None) -> str:
+    """
+    Rewrite an `<img>` tag into a `<picture>` with one source per modern format.
+
+    `sizes` is the rendered width of the image; it defaults to the `sizes` or `width` attribute of the
+    tag, then to the deck width.
+    """
+    attributes = dict(ATTRIBUTE.findall(tag))
+    *modern, fallback = variants.values()
+    largest = fallback[-1]
+    sizes = sizes or attributes.get("sizes")
+    if sizes is None:
+        width = int(attributes.get("width", min(largest.width, DECK_WIDTH)))
+        sizes = f"(max-width: {width}px) 100vw, {width}px"
+    display = _display_width(sizes)
+    sources = "".join(f'<source type="{v[0].mime}" srcset="{_srcset(reference, v)}" sizes="{sizes}">' for v in modern)
+    attributes.update(src=_url(reference, _pick(fallback, display)), srcset=_srcset(reference, fallback), sizes=sizes)
+    # Intrinsic dimensions let the browser reserve the space before the image loads
+    attributes.setdefault("width", str(largest.width))
+    attributes.setdefault("height", str(largest.height))
+    attributes.setdefault("decoding", "async")
+    img = "<img " + " ".join(f'{key}="{html.escape(value)}"' for key, value in attributes.items()) + ">"
+    return f"<picture>{sources}{img}</picture>"
+
+
+def image_set_css(reference: str, variants: dict[str, list[Variant]], width: int = DECK_WIDTH) -> str:
+    """Return an `image-set()` of the variants at 1x and 2x the display `width`, best format first."""
+    candidates = []
+    for mime, ladder in variants.items():
+        one_x, two_x = _pick(ladder, width), _pick(ladder, 2 * width)
+        candidates.append(f'url("{_url(reference, one_x)}") 1x type("{mime}")')
+        if two_x != one_x:
+            candidates.append(f'url("{_url(reference, two_x)}") 2x type("{mime}")')
+    return f"image-set({', '.join(candidates)})"
+
+
+def preload_link(url: str, mime: str) -> str:
+    """Return a preload hint for an image, skipped by browsers that do not support its format."""
+    return f'<link rel="preload" as="image" type="{mime}" href="{url}">'
+
+
+def rewrite_css(css: str, base: Path, images: ImageSet) -> tuple[str, list[str]]:
+    """Add `image-set()` backgrounds to a stylesheet. Returns it with the preload hints of its backgrounds."""
+    preloads = []
+
+    def replace(match: re.Match) -> str:
+        variants = images.get(match.group(2), base)
+        if variants is None:
+            return match.group(0)
+        fallback = _pick(next(reversed(variants.values())), DECK_WIDTH)
+        best = next(iter(variants.values()))
+        preloads.append(preload_link(_url(match.group(2), _pick(best, DECK_WIDTH)), best[0].mime))
+        declaration = f"{match.group(1)}url('{_url(match.group(2), fallback)}'){match.group(3)};"
+        return f"{declaration} background-image: {image_set_css(match.group(2), variants)};"
+
+    return CSS_BACKGROUND.sub(replace, css), preloads
+
+
+def rewrite_html(page: str, base: Path, images: ImageSet, sizes: Optional[dict[str, str]] = None) -> str:
+    """
+    Rewrite the images and inline styles of an HTML page, preloading its first background.
+
+    `sizes` maps image file names to the `sizes` value of their rendered width (see `picture_html`).
+    """
+    sizes = sizes or {}
+
+    def replace_img(match: re.Match) -> str:
+        reference = dict(ATTRIBUTE.findall(match.group(0))).get("src", "")
+        variants = images.get(reference, base)
+        if variants is None:
+            return match.group(0)
+        return picture_html(match.group(0), reference, variants, sizes.get(reference.rpartition("/")[2]))
+
+    page, preloads = rewrite_css(page, base, images)
+    page = IMG_TAG.sub(replace_img, page)
+    if preloads:
+        page = page.replace("</head>", f"    {preloads[0]}\n</head>", 1)
+    return page
+
+
+def rewrite_qmd(document: str, base: Path, images: ImageSet) -> str:
+    """Point Reveal.js backgrounds and the logo to WebP variants, and preload the first background."""
+    preloads = []
+
+    def replace_background(match: re.Match) -> str:
+        variants = images.get(match.group(1), base)
+        if variants is None:
+            return match.group(0)
+        webp = _pick(variants["image/webp"], 2 * DECK_WIDTH)
+        preloads.append(preload_link(_url(match.group(1), webp), webp.mime))
+        return f'data-background-image="{_url(match.group(1), webp)}"'
+
+    def replace_logo(match: re.Match) -> str:
+        variants = images.get(match.group(2), base)
+        if variants is None:
+            return match.group(0)
+        return f'{match.group(1)}"{_url(match.group(2), _pick(variants["image/webp"], 2 * 150))}"'
+
+    document = QMD_LOGO.sub(replace_logo, document)
+    document = DATA_BACKGROUND.sub(replace_background, document)
+    if preloads and "include-in-header" not in document:
+        header = f"    include-in-header:\n      text: |\n        {preloads[0]}\n"
+        document = re.sub(r"^(\s*revealjs:\n)", lambda m: m.group(1) + header, document, count=1, flags=re.M)
+    return document
+
+
+def build_site(output_dir: Path, source_root: Path = repo_path) -> ImageSet:
+    """
+    Write the responsive versions of the raw HTML and Quarto decks (and their stylesheet) to `output_dir`.
+
+    Every image of `images/` gets its variants, including the ones no deck references yet.
+    """
+    images = ImageSet(source_root / "images", output_dir)
+    for relative, rewrite in [
+        ("raw/presentation.html", lambda text, base, images: rewrite_html(text, base, images, DISPLAY_SIZES)),
+        ("quarto/presentation.qmd", rewrite_qmd),
+        ("quarto/styles.css", lambda text, base, images: rewrite_css(text, base, images)[0]),
+    ]:
+        source = source_root / relative
+        output = output_dir / relative
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(rewrite(source.read_text(encoding="utf-8"), source.parent, images), encoding="utf-8")
+    for path in sorted(images.source_dir.iterdir()):
+        if path.suffix.lower() in IMAGE_SUFFIXES:
+            images.get(path.name, images.source_dir)
+    return images
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate responsive image variants and rewrite the web decks.")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("build/site"))
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    images = build_site(args.output_dir)
+    n_variants = sum(len(v) for variants in images.variants.values() for v in variants.values())
+    print(
+        f"{len(images.variants)} image(s), {n_variants} variant(s) in {time.perf_counter() - start:.2f}s; "
+        f"largest best-format variants {images.bytes_after / 1024:.0f} KiB vs {images.bytes_before / 1024:.0f} KiB "
+        f"of originals. Site written to {args.output_dir}."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
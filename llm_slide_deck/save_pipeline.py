@@ -0,0 +1,206 @@
+"""
+Pipelined batch saving of python-pptx decks: build, serialise and compress, write.
+
+In a batch loop, `prs.save()` serialises every part, deflates it and writes the zip before the next
+deck can be built. Here the three steps run as pipeline stages:
+
+1. the calling thread builds the decks (python-pptx holds the GIL);
+2. a thread pool serialises the parts of each built deck and deflates them (zlib releases the GIL);
+3. a writer thread writes the compressed entries, in order, through a large write buffer.
+
+Bounded queues between the stages cap the number of decks in memory. The parts are serialised in the
+order of `prs.save()` and deflated with the same zlib settings as `zipfile`, so each package has the
+same entries and compressed bytes as the one `prs.save()` would write; only the entry timestamps
+differ, as they do between two `prs.save()` calls.
+
+Usage:
+    uv run python -m llm_slide_deck.save_pipeline -n 20 -o build/decks --check
+"""
+
+import argparse
+import concurrent.futures
+import io
+import os
+import queue
+import threading
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Optional
+
+WRITE_BUFFER = 1 << 20
+
+
+class Entry(NamedTuple):
+    name: str
+    crc: int
+    size: int
+    deflated: bytes
+
+
+class _PartCollector:
+    """Stands in for the zip writer of python-pptx and keeps the serialised parts in order."""
+
+    def __init__(self):
+        self.parts: list[tuple[str, bytes]] = []
+
+    def write(self, pack_uri, blob: bytes):
+        self.parts.append((pack_uri.membername, blob))
+
+
+def serialize(prs) -> list[tuple[str, bytes]]:
+    """Return the (name, bytes) parts of a presentation, in the order `prs.save()` writes them."""
+    from pptx.opc.serialized import PackageWriter
+
+    package = prs.part.package
+    steps = ("_write_content_types_stream", "_write_pkg_rels", "_write_parts")
+    if not hasattr(package, "_rels") or not all(hasattr(PackageWriter, step) for step in steps):
+        # The package writer internals of another python-pptx version: read the parts back from a save
+        buffer = io.BytesIO()
+        prs.save(buffer)
+        with zipfile.ZipFile(buffer) as saved:
+            return [(info.filename, saved.read(info)) for info in saved.infolist()]
+    writer = PackageWriter(None, package._rels, tuple(package.iter_parts()))
+    collector = _PartCollector()
+    for step in steps:
+        getattr(writer, step)(collector)
+    return collector.parts
+
+
+def deflate(name: str, data: bytes) -> Entry:
+    # The settings of zipfile.ZIP_DEFLATED at its default compression level
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return Entry(name, zlib.crc32(data), len(data), compressor.compress(data) + compressor.flush())
+
+
+def serialize_and_deflate(prs) -> list[Entry]:
+    return [deflate(name, data) for name, data in serialize(prs)]
+
+
+def write_package(entries: list[Entry], path: Path):
+    """Write deflated entries as a zip package, atomically, through a large write buffer."""
+    date_time = time.localtime(time.time())[:6]
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb", buffering=WRITE_BUFFER) as f, zipfile.ZipFile(f, "w") as package:
+        for entry in entries:
+            # The entry zipfile.writestr(name, data, ZIP_DEFLATED) would write, without compressing again
+            info = zipfile.ZipInfo(entry.name, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o600 << 16
+            info.file_size, info.compress_size, info.CRC = entry.size, len(entry.deflated), entry.crc
+            info.header_offset = f.tell()
+            f.write(info.FileHeader(zip64=False))
+            f.write(entry.deflated)
+            package.filelist.append(info)
+            package.NameToInfo[info.filename] = info
+            package.start_dir = f.tell()
+    tmp_path.replace(path)
+
+
+def save_pipelined(
+    decks: Iterable[tuple[Path, Callable[[], object]]], workers: Optional[int] = None, max_pending: int = 4
+) -> int:
+    """
+    Build, compress and write `decks`, given as (output path, function returning a Presentation).
+
+    At most `max_pending` built decks wait for compression or writing. Returns the number of decks written.
+    """
+    workers = workers or os.cpu_count() or 1
+    to_write: queue.Queue = queue.Queue(max_pending)
+    errors: list[BaseException] = []
+    written = 0
+
+    def writer():
+        nonlocal written
+        while (item := to_write.get()) is not None:
+            path, future = item
+            try:
+                if not errors:
+                    write_package(future.result(), path)
+                    written += 1
+            except BaseException as error:  # reported by the build loop
+                errors.append(error)
+
+    writer_thread = threading.Thread(target=writer, name="deck-writer")
+    writer_thread.start()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="deck-deflate") as pool:
+            for path, build in decks:
+                if errors:
+                    break
+                # Blocks while max_pending decks are waiting, which bounds memory
+                to_write.put((path, pool.submit(serialize_and_deflate, build())))
+    finally:
+        to_write.put(None)
+        writer_thread.join()
+    if errors:
+        raise errors[0]
+    return written
+
+
+def save_serial(decks: Iterable[tuple[Path, Callable[[], object]]]) -> int:
+    """The plain batch loop, for comparison."""
+    written = 0
+    for path, build in decks:
+        build().save(str(path))
+        written += 1
+    return written
+
+
+def compare_packages(first: Path, second: Path) -> list[str]:
+    """Return the differences between the entries of two packages, timestamps aside."""
+    with zipfile.ZipFile(first) as a, zipfile.ZipFile(second) as b:
+        infos_a, infos_b = a.infolist(), b.infolist()
+        if [info.filename for info in infos_a] != [info.filename for info in infos_b]:
+            return ["the entries differ or are in a different order"]
+        fields = ("compress_type", "file_size", "compress_size", "CRC", "external_attr", "flag_bits")
+        return [
+            f"{x.filename}: {field}"
+            for x, y in zip(infos_a, infos_b)
+            for field in fields
+            if getattr(x, field) != getattr(y, field)
+        ]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and save a batch of decks in a build/compress/write pipeline.")
+    parser.add_argument("-n", "--count", type=int, default=20, help="number of decks to build")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("build") / "decks")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="compression threads")
+    parser.add_argument("--max-pending", type=int, default=4, help="built decks waiting for compression or writing")
+    parser.add_argument("--serial", action="store_true", help="use the plain prs.save() loop instead")
+    parser.add_argument("--check", action="store_true", help="compare the first deck with a prs.save() of it")
+    args = parser.parse_args(argv)
+
+    import pptx
+
+    from llm_slide_deck._scripts import load_script
+
+    powerpoint = load_script("powerpoint")
+    base_template = (Path(pptx.__file__).parent / "templates" / "default.pptx").read_bytes()
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    decks = (
+        (args.output_dir / f"deck_{index:05d}.pptx", lambda: powerpoint.build_presentation(io.BytesIO(base_template)))
+        for index in range(args.count)
+    )
+
+    start = time.perf_counter()
+    written = save_serial(decks) if args.serial else save_pipelined(decks, args.workers, args.max_pending)
+    elapsed = time.perf_counter() - start
+    print(f"{written} deck(s) written to {args.output_dir} in {elapsed:.2f}s ({written / elapsed:.2f} decks/s).")
+
+    if args.check and written:
+        reference = args.output_dir / "reference.pptx"
+        powerpoint.build_presentation(io.BytesIO(base_template)).save(str(reference))
+        differences = compare_packages(reference, args.output_dir / "deck_00000.pptx")
+        reference.unlink()
+        for difference in differences:
+            print(f"  differs: {difference}")
+        print("Same entries as prs.save()." if not differences else f"{len(differences)} difference(s).")
+        return 1 if differences else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
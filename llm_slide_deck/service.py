@@ -0,0 +1,417 @@
+"""
+Local deck generation service: warm workers behind an HTTP/JSON API.
+
+Every `python create_*.py` run pays the interpreter start, the python-pptx, lxml and Google client
+imports, the credential unpickling, the parsing of the base template and the first reads of the images.
+The service pays them once per worker process. Each worker imports the generators, keeps the bytes of the
+python-pptx base template, the parsed mail-merge templates (media included) and its Google services,
+and runs a warm-up build that renders the cached image crops. A job then only costs its build.
+
+Jobs go through a bounded queue: at most `--queue-size` jobs are queued or running. A batch waits for
+free slots while its results stream back (backpressure), and an asynchronous job is refused with 429
+when the queue is full. Queued jobs can be cancelled; the queued jobs of a batch are cancelled when its
+client disconnects.
+
+    POST   /jobs        a job spec, or {"jobs": [spec, ...]}: streams one JSON line per job as it completes
+    POST   /jobs?async  a job spec: returns its ID at once (202), or 429 when the queue is full
+    GET    /jobs/<id>   state and result of a job
+    DELETE /jobs/<id>   cancel a queued job
+    GET    /health      workers, queued and running jobs
+
+Job specs are sent as `application/json` (other content types get 415). Outputs are paths relative to
+the output directory and default to `<job id>.pptx`; mail-merge templates are paths relative to the
+template directory. A path that escapes its directory gets 400.
+
+    {"kind": "pptx", "output": "out/deck.pptx"}
+    {"kind": "merge", "template": "template.pptx", "record": {"name": "..."}, "output": "out/name.pptx"}
+    {"kind": "google-merge", "template": "<presentation ID>", "record": {"name": "..."}, "title": "..."}
+
+Usage:
+    uv run python -m llm_slide_deck.service --port 8765 -w 4 --template-dir templates
+    curl -N localhost:8765/jobs -H 'Content-Type: application/json' -d '{"jobs": [{"kind": "pptx"}, {"kind": "pptx"}]}'
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import io
+import itertools
+import json
+import os
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Required fields of each job kind
+JOB_KINDS = {
+    "pptx": (),
+    "merge": ("template", "record"),
+    "google-merge": ("template", "record"),
+}
+DEFAULT_QUEUE_SIZE = 64
+# Finished jobs kept for GET /jobs/<id>
+KEEP_FINISHED = 1000
+
+
+# --- Worker processes ---
+
+_worker: dict = {}
+
+
+def _init_worker(warm_up: bool):
+    import pptx
+
+    from llm_slide_deck._scripts import load_script
+
+    _worker["powerpoint"] = load_script("powerpoint")
+    _worker["base_template"] = (Path(pptx.__file__).parent / "templates" / "default.pptx").read_bytes()
+    _worker["templates"] = {}
+    if warm_up:
+        _build_pptx()
+
+
+def _build_pptx() -> bytes:
+    prs = _worker["powerpoint"].build_presentation(io.BytesIO(_worker["base_template"]))
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def _merge_template(path: str):
+    """Return the parsed mail-merge template of `path`, parsed again only when the file changes."""
+    from llm_slide_deck.merge import PptxTemplate
+
+    key = (path, os.stat(path).st_mtime_ns)
+    if key not in _worker["templates"]:
+        _worker["templates"] = {k: v for k, v in _worker["templates"].items() if k[0] != path}
+        _worker["templates"][key] = PptxTemplate(Path(path))
+    return _worker["templates"][key]
+
+
+def _google_services() -> tuple[object, object]:
+    if "google" not in _worker:
+        from llm_slide_deck._scripts import load_script
+
+        google = load_script("google")
+        _worker["google"] = (google.get_slides_service(), google.get_drive_service())
+    return _worker["google"]
+
+
+def run_job(spec: dict) -> dict:
+    """Run one job spec in a worker process and return its result."""
+    start = time.perf_counter()
+    if spec["kind"] == "google-merge":
+        from llm_slide_deck.merge import render_google
+
+        presentation_id = render_google(
+            *_google_services(), spec["template"], spec["record"], spec.get("title") or spec["id"]
+        )
+        result = {
+            "presentation_id": presentation_id,
+            "url": f"https://docs.google.com/presentation/d/{presentation_id}",
+        }
+    else:
+        data = _build_pptx() if spec["kind"] == "pptx" else _merge_template(spec["template"]).render(spec["record"])
+        output = Path(spec["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(output)
+        result = {"output": str(output), "bytes": len(data)}
+    result["build_seconds"] = round(time.perf_counter() - start, 4)
+    result["worker"] = os.getpid()
+    return result
+
+
+# --- Job queue ---
+
+
+class Job:
+    __slots__ = ("id", "spec", "future", "submitted", "finished")
+
+    def __init__(self, job_id: str, spec: dict):
+        self.id = job_id
+        self.spec = spec
+        self.future: Optional[concurrent.futures.Future] = None
+        self.submitted = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def describe(self) -> dict:
+        future = self.future
+        entry = {"id": self.id, "kind": self.spec["kind"]}
+        if future.cancelled():
+            entry["state"] = "cancelled"
+        elif not future.done():
+            entry["state"] = "running" if future.running() else "queued"
+        elif future.exception() is not None:
+            error = future.exception()
+            entry.update(state="failed", error=f"{type(error).__name__}: {error}")
+        else:
+            entry.update(state="done", **future.result())
+        if self.finished is not None:
+            entry["seconds"] = round(self.finished - self.submitted, 4)
+        return entry
+
+
+def validate(spec: dict):
+    """Raise ValueError if `spec` is not a valid job spec."""
+    if not isinstance(spec, dict) or spec.get("kind") not in JOB_KINDS:
+        raise ValueError(f"job kind must be one of {', '.join(JOB_KINDS)}")
+    missing = [field for field in JOB_KINDS[spec["kind"]] if field not in spec]
+    if missing:
+        raise ValueError(f"{spec['kind']} job is missing field(s): {', '.join(missing)}")
+
+
+def resolve_inside(directory: Path, path: str, field: str) -> Path:
+    """Resolve `path` relatively to `directory`. Raises ValueError if it points outside of it."""
+    if not isinstance(path, str):
+        raise ValueError(f"{field} must be a path")
+    resolved = (directory / path).resolve()
+    if not resolved.is_relative_to(directory):
+        raise ValueError(f"{field} must be inside {directory}")
+    return resolved
+
+
+class DeckService:
+    """
+    A pool of warm worker processes fed by a bounded job queue.
+
+    Jobs wait in the service's own queue and are handed to the process pool only when a worker is free,
+    so they stay cancellable until they start. Jobs only write in `output_dir` and only read mail-merge
+    templates from `template_dir`.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        output_dir: Path = Path("build/service"),
+        warm_up=True,
+        template_dir: Path = Path("."),
+    ):
+        self.workers = workers
+        self.output_dir = output_dir.resolve()
+        self.template_dir = template_dir.resolve()
+        self.executor = concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(warm_up,))
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queue: collections.deque[Job] = collections.deque()
+        self._running = 0
+        self.jobs: collections.OrderedDict[str, Job] = collections.OrderedDict()
+
+    def start(self):
+        """Start the worker processes now, so that their warm-up does not delay the first jobs."""
+        concurrent.futures.wait([self.executor.submit(os.getpid) for _ in range(self.workers)])
+
+    def resolve(self, spec: dict) -> dict:
+        """Validate a job spec and return it with its paths resolved. Raises ValueError for invalid specs."""
+        validate(spec)
+        spec = dict(spec)
+        if spec["kind"] == "merge":
+            spec["template"] = str(resolve_inside(self.template_dir, spec["template"], "template"))
+        if spec["kind"] != "google-merge" and "output" in spec:
+            spec["output"] = str(resolve_inside(self.output_dir, spec["output"], "output"))
+        return spec
+
+    def submit(self, spec: dict, block: bool = True) -> Optional[Job]:
+        """Queue a job, waiting for a free slot unless `block` is false. Returns None when the queue is full."""
+        spec = self.resolve(spec)
+        if not self._slots.acquire(blocking=block):
+            return None
+        job = Job(f"{next(self._ids):06d}", spec)
+        job.spec = {**spec, "id": job.id}
+        if spec["kind"] != "google-merge":
+            job.spec.setdefault("output", str(self.output_dir / f"{job.id}.pptx"))
+        job.future = concurrent.futures.Future()
+        job.future.add_done_callback(lambda _: self._finish(job))
+        with self._lock:
+            self.jobs[job.id] = job
+            self._queue.append(job)
+        self._dispatch()
+        return job
+
+    def _dispatch(self):
+        """Hand queued jobs to the free workers, skipping the cancelled ones."""
+        with self._lock:
+            while self._running < self.workers and self._queue:
+                job = self._queue.popleft()
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                self._running += 1
+                self.executor.submit(run_job, job.spec).add_done_callback(lambda inner, job=job: self._done(job, inner))
+
+    def _done(self, job: Job, inner: concurrent.futures.Future):
+        with self._lock:
+            self._running -= 1
+        if inner.exception() is not None:
+            job.future.set_exception(inner.exception())
+        else:
+            job.future.set_result(inner.result())
+        self._dispatch()
+
+    def _finish(self, job: Job):
+        job.finished = time.perf_counter()
+        self._slots.release()
+        with self._lock:
+            finished = [job_id for job_id, job in self.jobs.items() if job.future.done()]
+            for job_id in finished[: max(0, len(finished) - KEEP_FINISHED)]:
+                del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job. Returns False if it is unknown, running or finished."""
+        job = self.get(job_id)
+        return job is not None and job.future.cancel()
+
+    def health(self) -> dict:
+        with self._lock:
+            queued = sum(not job.future.cancelled() for job in self._queue)
+            return {"workers": self.workers, "queued": queued, "running": self._running, "known_jobs": len(self.jobs)}
+
+    def close(self):
+        with self._lock:
+            queued, self._queue = self._queue, collections.deque()
+        for job in queued:
+            job.future.cancel()
+        self.executor.shutdown()
+
+
+# --- HTTP API ---
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    service: DeckService
+
+    def _send_json(self, status: HTTPStatus, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _job(self) -> Optional[Job]:
+        job = self.service.get(urlsplit(self.path).path.removeprefix("/jobs/"))
+        if job is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown job"})
+        return job
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send_json(HTTPStatus.OK, self.service.health())
+        elif path.startswith("/jobs/") and (job := self._job()):
+            self._send_json(HTTPStatus.OK, job.describe())
+        elif not path.startswith("/jobs/"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_DELETE(self):
+        if not urlsplit(self.path).path.startswith("/jobs/"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+        elif job := self._job():
+            cancelled = self.service.cancel(job.id)
+            self._send_json(HTTPStatus.OK if cancelled else HTTPStatus.CONFLICT, job.describe())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/jobs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self.close_connection = True  # the body is left unread
+            self._send_json(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, {"error": "Content-Type must be application/json"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            specs = payload["jobs"] if isinstance(payload, dict) and "jobs" in payload else [payload]
+            for spec in specs:
+                self.service.resolve(spec)
+        except (ValueError, TypeError) as error:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+            return
+
+        if url.query == "async":
+            if len(specs) != 1:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": "async takes a single job"})
+            elif (job := self.service.submit(specs[0], block=False)) is None:
+                self._send_json(HTTPStatus.TOO_MANY_REQUESTS, {"error": "queue full"}, {"Retry-After": "1"})
+            else:
+                self._send_json(HTTPStatus.ACCEPTED, job.describe())
+            return
+        self._stream(specs)
+
+    def _stream(self, specs: list[dict]):
+        """Submit the jobs as slots free up and stream their results as JSON lines, in completion order."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pending: dict[concurrent.futures.Future, Job] = {}
+
+        def flush(futures):
+            for future in futures:
+                self._write_chunk(json.dumps(pending.pop(future).describe(), ensure_ascii=False).encode() + b"\n")
+
+        try:
+            for spec in specs:
+                job = self.service.submit(spec)
+                pending[job.future] = job
+                flush([future for future in pending if future.done()])
+            flush(concurrent.futures.as_completed(list(pending)))
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            for job in pending.values():
+                self.service.cancel(job.id)
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve deck generation jobs from warm worker processes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="maximum queued and running jobs")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("build/service"))
+    parser.add_argument(
+        "--template-dir", type=Path, default=Path("."), help="directory of the mail-merge templates jobs may use"
+    )
+    parser.add_argument("--no-warm-up", action="store_true", help="skip the warm-up build of each worker")
+    args = parser.parse_args(argv)
+
+    service = DeckService(
+        args.workers, args.queue_size, args.output_dir, warm_up=not args.no_warm_up, template_dir=args.template_dir
+    )
+    service.start()
+    handler = type("DeckHandler", (Handler,), {"service": service})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Serving {args.workers} worker(s) on http://{args.host}:{args.port} (queue size {args.queue_size}).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())